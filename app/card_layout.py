@@ -0,0 +1,98 @@
+"""
+Aadhaar card layout analysis
+Locates the card in a preprocessed image and cuts it into the regions that hold
+the fields we need, so Tesseract only sees the number band and the detail lines
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# ID-1 card is 85.6mm x 54mm
+CARD_ASPECT_RATIO = 85.6 / 54.0
+CARD_ASPECT_TOLERANCE = 0.25
+
+# Regions as (left, top, right, bottom) fractions of the card bounding box.
+# The front of the card has the photo on the left, name/DOB/gender to its
+# right and the 12 digit number in a band near the bottom.
+DETAILS_REGION = (0.25, 0.18, 1.00, 0.70)
+NUMBER_REGION = (0.15, 0.66, 0.85, 0.92)
+
+# Minimum share of dark pixels for a row/column to count as content
+INK_THRESHOLD = 0.01
+MIN_LINE_HEIGHT = 8
+LINE_PADDING = 3
+
+BBox = Tuple[int, int, int, int]
+
+def _ink_mask(gray: np.ndarray) -> np.ndarray:
+    return gray < 128
+
+def _span(profile: np.ndarray, threshold: float) -> Optional[Tuple[int, int]]:
+    """First and last index where the profile exceeds the threshold"""
+    hits = np.flatnonzero(profile > threshold)
+    if len(hits) == 0:
+        return None
+    return int(hits[0]), int(hits[-1]) + 1
+
+def find_card_bbox(gray: np.ndarray) -> Optional[BBox]:
+    """Find the bounding box of the card; None if the content does not look like a card"""
+    ink = _ink_mask(gray)
+    rows = _span(ink.mean(axis=1), INK_THRESHOLD)
+    cols = _span(ink.mean(axis=0), INK_THRESHOLD)
+    if rows is None or cols is None:
+        return None
+
+    top, bottom = rows
+    left, right = cols
+    aspect = (right - left) / max(1, bottom - top)
+    if abs(aspect - CARD_ASPECT_RATIO) > CARD_ASPECT_TOLERANCE * CARD_ASPECT_RATIO:
+        logger.debug(f"Content aspect {aspect:.2f} does not match an Aadhaar card")
+        return None
+    return left, top, right, bottom
+
+def _region(card: BBox, fractions: Tuple[float, float, float, float]) -> BBox:
+    left, top, right, bottom = card
+    width, height = right - left, bottom - top
+    return (
+        left + int(width * fractions[0]),
+        top + int(height * fractions[1]),
+        left + int(width * fractions[2]),
+        top + int(height * fractions[3]),
+    )
+
+def split_text_lines(gray: np.ndarray) -> List[Tuple[int, int]]:
+    """Split a region into text line bands using its horizontal ink profile"""
+    has_ink = _ink_mask(gray).mean(axis=1) > INK_THRESHOLD
+    # Rising/falling edges of the boolean profile delimit the lines
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], has_ink.astype(np.int8), [0]))))
+    lines = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start >= MIN_LINE_HEIGHT:
+            lines.append((max(0, int(start) - LINE_PADDING), min(len(has_ink), int(end) + LINE_PADDING)))
+    return lines
+
+def find_card_regions(image: Image.Image) -> Optional[Dict[str, object]]:
+    """Locate the card once and return the number band and the detail line crops"""
+    gray = np.asarray(image.convert("L"), dtype=np.uint8)
+    card = find_card_bbox(gray)
+    if card is None:
+        return None
+
+    number_box = _region(card, NUMBER_REGION)
+    details_box = _region(card, DETAILS_REGION)
+
+    left, top, right, bottom = details_box
+    details = gray[top:bottom, left:right]
+    detail_lines = [
+        image.crop((left, top + line_top, right, top + line_bottom))
+        for line_top, line_bottom in split_text_lines(details)
+    ]
+
+    return {
+        "number": image.crop(number_box),
+        "details": detail_lines,
+    }
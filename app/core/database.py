@@ -1,38 +1,51 @@
-from supabase import create_client, Client
 from app.core.config import settings
 from app.core.local_database import get_local_database, LocalDatabase
+from app.core.sql_database import SQLDatabase
+from app.core.supabase_client import SupabaseRestClient
 import logging
 
 logger = logging.getLogger(__name__)
 
 class HybridDatabaseClient:
     def __init__(self):
-        self.supabase_client: Client = None
+        self.supabase_client: SupabaseRestClient = None
+        self.sql_db: SQLDatabase = None
         self.local_db: LocalDatabase = get_local_database()
         self.use_supabase = False
         self.connect()
 
     def connect(self):
-        """Initialize database connections - try Supabase first, fallback to local"""
-        # Try Supabase first
-        if settings.supabase_url and settings.supabase_key:
-            try:
-                self.supabase_client = create_client(settings.supabase_url, settings.supabase_key)
-                # Test connection
-                result = self.supabase_client.table('aadhaar_forms').select("count", count="exact").execute()
-                self.use_supabase = True
-                logger.info("✅ Successfully connected to Supabase database")
-                return
-            except Exception as e:
-                logger.warning(f"⚠️  Supabase connection failed: {str(e)}")
-                logger.info("🔄 Falling back to local SQLite database")
-
-        # Use local database as fallback
+        """Initialize the SQL backend if configured; Supabase is connected in startup()"""
+        if settings.database_url:
+            self.sql_db = SQLDatabase(settings.database_url)
+            logger.info("✅ Using async SQLAlchemy database")
+            return
+
+        # Used until startup() reaches Supabase, and as the fallback afterwards
         self.use_supabase = False
         logger.info("✅ Using local SQLite database")
 
+    async def connect_supabase(self):
+        """Open this worker's pooled Supabase client - fallback to local if unreachable"""
+        if not (settings.supabase_url and settings.supabase_key):
+            return
+
+        client = SupabaseRestClient(settings.supabase_url, settings.supabase_key)
+        try:
+            # Test connection
+            await client.ping()
+            self.supabase_client = client
+            self.use_supabase = True
+            logger.info("✅ Successfully connected to Supabase database")
+        except Exception as e:
+            await client.aclose()
+            logger.warning(f"⚠️  Supabase connection failed: {str(e)}")
+            logger.info("🔄 Falling back to local SQLite database")
+
     def get_client(self):
         """Get the appropriate database client"""
+        if self.sql_db is not None:
+            return self.sql_db
         if self.use_supabase:
             return self.supabase_client
         return self.local_db
@@ -41,6 +54,23 @@ class HybridDatabaseClient:
         """Check if currently using Supabase"""
         return self.use_supabase
 
+    async def startup(self):
+        """Create the SQL schema, or connect to Supabase, inside the serving process"""
+        if self.sql_db is not None:
+            await self.sql_db.init_database()
+        else:
+            await self.connect_supabase()
+
+    async def shutdown(self):
+        """Close pooled connections"""
+        if self.sql_db is not None:
+            await self.sql_db.close()
+        if self.supabase_client is not None:
+            await self.supabase_client.aclose()
+            self.supabase_client = None
+            self.use_supabase = False
+        self.local_db.close()
+
 # Global database client instance
 db_client = HybridDatabaseClient()
 
@@ -48,6 +78,6 @@ def get_database():
     """Dependency to get database client"""
     return db_client.get_client()
 
-def get_supabase() -> Client:
+def get_supabase() -> SupabaseRestClient:
     """Dependency to get Supabase client (for backward compatibility)"""
     return db_client.get_client()
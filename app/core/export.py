@@ -0,0 +1,192 @@
+"""
+Streaming export of stored Aadhaar records
+Encodes batches of rows as NDJSON, CSV or Parquet (one row group per batch), optionally
+zstd-compressed, and hands back the encoded bytes after every batch, so an export of
+any size only ever holds one batch in memory
+"""
+
+import io
+import csv
+import json
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from app.core.local_database import RECORD_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for Parquet
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is only needed to compress NDJSON and CSV
+    zstandard = None
+
+EXPORT_COLUMNS = ["id"] + RECORD_FIELDS + ["created_at", "updated_at"]
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+EXPORT_COMPRESSIONS = ("none", "zstd")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated column names, or None for every column; raises ValueError for unknown ones"""
+    if not columns:
+        return None
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return names
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    """Stored timestamps as UTC datetimes; SQLite keeps them as naive UTC text"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _text(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that keeps what was written until drained"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class RecordExporter:
+    """Encodes batches of records; call write() per batch and finish() once at the end"""
+
+    def __init__(self, export_format: str = "ndjson", columns: Optional[List[str]] = None,
+                 compression: str = "none"):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        if compression not in EXPORT_COMPRESSIONS:
+            raise ValueError(f"Unknown export compression: {compression}")
+        if export_format == "parquet" and pa is None:
+            raise ValueError("Parquet export requires the 'pyarrow' package")
+        if export_format != "parquet" and compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+
+        self.export_format = export_format
+        self.columns = columns or list(EXPORT_COLUMNS)
+        self.compression = compression
+        self._started = False
+
+        # Parquet compresses its column chunks itself; text formats are compressed as a stream
+        self._compressor = None
+        if export_format != "parquet" and compression == "zstd":
+            self._compressor = zstandard.ZstdCompressor().compressobj()
+
+        self._sink = None
+        self._parquet_writer = None
+        if export_format == "parquet":
+            self._schema = pa.schema([(column, self._arrow_type(column)) for column in self.columns])
+            self._sink = _ChunkSink()
+            self._parquet_writer = pq.ParquetWriter(
+                self._sink, self._schema, compression="zstd" if compression == "zstd" else "none"
+            )
+
+    @staticmethod
+    def _arrow_type(column: str):
+        if column == "id":
+            return pa.int64()
+        if column in ("created_at", "updated_at"):
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    @property
+    def media_type(self) -> str:
+        if self._compressor is not None:
+            return "application/zstd"
+        return MEDIA_TYPES[self.export_format]
+
+    @property
+    def file_extension(self) -> str:
+        return f".{self.export_format}" + (".zst" if self._compressor is not None else "")
+
+    def _output(self, data: bytes) -> bytes:
+        if self._compressor is None or not data:
+            return data
+        return self._compressor.compress(data)
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> bytes:
+        """Encode one batch; returns the bytes ready to send"""
+        if self.export_format == "parquet":
+            rows = {column: [] for column in self.columns}
+            for record in records:
+                for column in self.columns:
+                    value = record.get(column)
+                    rows[column].append(_timestamp(value) if column in ("created_at", "updated_at") else value)
+            # Each batch becomes one row group
+            self._parquet_writer.write_table(pa.table(rows, schema=self._schema))
+            return self._sink.drain()
+
+        if self.export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not self._started:
+                writer.writerow(self.columns)
+            for record in records:
+                writer.writerow([_text(record.get(column)) for column in self.columns])
+            data = buffer.getvalue()
+        else:
+            data = "".join(
+                json.dumps({column: _text(record.get(column)) for column in self.columns},
+                           ensure_ascii=False, default=str) + "\n"
+                for record in records
+            )
+
+        self._started = True
+        return self._output(data.encode("utf-8"))
+
+    def finish(self) -> bytes:
+        """Trailing bytes: the CSV header of an empty export, the Parquet footer, the zstd frame end"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            return self._sink.drain()
+
+        data = self.write([]) if self.export_format == "csv" and not self._started else b""
+        if self._compressor is not None:
+            data += self._compressor.flush()
+        return data
+
+async def stream_export(batches: AsyncIterator[List[Dict[str, Any]]], exporter: RecordExporter) -> AsyncIterator[bytes]:
+    """Encoded export bytes, one chunk per batch of records"""
+    async for batch in batches:
+        # Encoding a batch is CPU-bound, keep it off the event loop
+        data = await asyncio.to_thread(exporter.write, batch)
+        if data:
+            yield data
+    data = exporter.finish()
+    if data:
+        yield data
@@ -31,6 +31,7 @@ CREATE TABLE IF NOT EXISTS aadhaar_forms (
 CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_aadhaar_number ON aadhaar_forms(aadhaar_number);
 CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_vid ON aadhaar_forms(vid);
 CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_created_at ON aadhaar_forms(created_at);
+CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_created_at_id ON aadhaar_forms(created_at, id);
 
 -- Create a function to automatically update the updated_at column
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -56,12 +57,91 @@ CREATE TRIGGER update_aadhaar_forms_updated_at
 --     FOR ALL USING (auth.role() = 'authenticated');
 """
 
+# Full-text search (GET /api/form/search): a GIN index on the weighted tsvector of the
+# names and address, and a ranked, keyset-paginated search function callable over RPC.
+# The 'simple' configuration lowercases without stemming, which suits names in any script.
+POSTGRES_SEARCH_SCHEMA = [
+    """CREATE OR REPLACE FUNCTION aadhaar_search_vector(name TEXT, name_tamil TEXT, guardian_name TEXT, address TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(name_tamil, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(guardian_name, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(address, '')), 'C')
+$$ LANGUAGE sql IMMUTABLE""",
+    """CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_search ON aadhaar_forms
+    USING GIN (aadhaar_search_vector(name, name_tamil, guardian_name, address))""",
+    """CREATE OR REPLACE FUNCTION search_aadhaar_forms(
+    query TEXT, max_rows INTEGER, after_score REAL DEFAULT NULL, after_id INTEGER DEFAULT NULL,
+    max_candidates INTEGER DEFAULT 1000
+)
+RETURNS TABLE (record JSONB, score REAL) AS $$
+    -- Only the newest max_candidates matches are ranked, so common words stay fast
+    WITH q AS (
+        SELECT to_tsquery('simple', query) AS tsq
+    ), candidates AS (
+        SELECT f.* FROM aadhaar_forms f, q
+        WHERE aadhaar_search_vector(f.name, f.name_tamil, f.guardian_name, f.address) @@ q.tsq
+        ORDER BY f.id DESC
+        LIMIT max_candidates
+    ), matches AS (
+        SELECT to_jsonb(c) AS record, c.id,
+               ts_rank_cd(aadhaar_search_vector(c.name, c.name_tamil, c.guardian_name, c.address), q.tsq) AS score
+        FROM candidates c, q
+    )
+    SELECT matches.record, matches.score FROM matches
+    WHERE after_score IS NULL
+       OR matches.score < after_score
+       OR (matches.score = after_score AND matches.id > after_id)
+    ORDER BY matches.score DESC, matches.id
+    LIMIT max_rows
+$$ LANGUAGE sql STABLE""",
+]
+
+CREATE_SEARCH_INDEX = """
+-- Full-text search over name, name_tamil, guardian_name and address
+""" + "".join(f"{statement};\n\n" for statement in POSTGRES_SEARCH_SCHEMA)
+
+# Bulk upsert over RPC (HybridAadhaarCRUD.bulk_upsert on Supabase). PostgREST's own upsert
+# overwrites every column it is sent, so fields missing from a record would be nulled;
+# this keeps their stored value like the local and SQL backends do, and reports inserts.
+CREATE_BULK_UPSERT_FUNCTION = """
+-- Insert or update many records; fields missing from a record keep their stored value
+CREATE OR REPLACE FUNCTION bulk_upsert_aadhaar_forms(records JSONB)
+RETURNS TABLE (record JSONB, inserted BOOLEAN) AS $$
+    INSERT INTO aadhaar_forms AS f (
+        vid, aadhaar_number, name_tamil, name, guardian_name, dob, gender, address,
+        vtc, po, sub_district, district, state, pincode, phone
+    )
+    SELECT r.vid, r.aadhaar_number, r.name_tamil, r.name, r.guardian_name, r.dob, r.gender, r.address,
+           r.vtc, r.po, r.sub_district, r.district, r.state, r.pincode, r.phone
+    FROM jsonb_populate_recordset(NULL::aadhaar_forms, records) AS r
+    ON CONFLICT (aadhaar_number) DO UPDATE SET
+        vid = COALESCE(EXCLUDED.vid, f.vid),
+        name_tamil = COALESCE(EXCLUDED.name_tamil, f.name_tamil),
+        name = COALESCE(EXCLUDED.name, f.name),
+        guardian_name = COALESCE(EXCLUDED.guardian_name, f.guardian_name),
+        dob = COALESCE(EXCLUDED.dob, f.dob),
+        gender = COALESCE(EXCLUDED.gender, f.gender),
+        address = COALESCE(EXCLUDED.address, f.address),
+        vtc = COALESCE(EXCLUDED.vtc, f.vtc),
+        po = COALESCE(EXCLUDED.po, f.po),
+        sub_district = COALESCE(EXCLUDED.sub_district, f.sub_district),
+        district = COALESCE(EXCLUDED.district, f.district),
+        state = COALESCE(EXCLUDED.state, f.state),
+        pincode = COALESCE(EXCLUDED.pincode, f.pincode),
+        phone = COALESCE(EXCLUDED.phone, f.phone)
+    RETURNING to_jsonb(f), (xmax = 0)
+$$ LANGUAGE sql;
+"""
+
 def print_sql_commands():
     """Print the SQL commands to create the database schema"""
     print("=== Supabase Database Initialization ===")
     print("Copy and paste the following SQL commands into your Supabase SQL editor:")
     print("\n" + "="*60 + "\n")
     print(CREATE_AADHAAR_FORMS_TABLE)
+    print(CREATE_SEARCH_INDEX)
+    print(CREATE_BULK_UPSERT_FUNCTION)
     print("\n" + "="*60 + "\n")
     print("After running these commands, your database will be ready to use with the API.")
 
@@ -0,0 +1,407 @@
+"""
+Job queue for asynchronous OCR submissions
+Durable local SQLite table by default, or a Redis-protocol server so several
+API nodes can share one pool of OCR workers
+
+A claimed job is leased to one worker, which renews the lease while it runs; only the
+lease holder can finish the job. PDF passwords are stored encrypted and deleted as soon
+as a worker claims the job.
+"""
+
+import os
+import json
+import time
+import uuid
+import base64
+import hashlib
+import secrets
+import sqlite3
+import asyncio
+import logging
+import tempfile
+from typing import Optional, Dict, Any
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only needed for the redis backend
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+def password_cipher(secret_key: str) -> Fernet:
+    """Cipher for queued PDF passwords, derived from any secret string"""
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret_key.encode("utf-8")).digest()))
+
+def load_key_file(path: str) -> str:
+    """Secret shared by the processes of one host, created on first use and readable by its owner only"""
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(secrets.token_urlsafe(32))
+        # Fails if another process created the key first; everyone then reads that one
+        os.link(tmp_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+    with open(path, "r", encoding="ascii") as f:
+        return f.read().strip()
+
+def seal_password(cipher: Fernet, password: Optional[str]) -> Optional[str]:
+    """Encrypt a PDF password for storage in the queue"""
+    if password is None:
+        return None
+    return cipher.encrypt(password.encode("utf-8")).decode("ascii")
+
+def open_password(cipher: Fernet, secret: str) -> str:
+    """Decrypt a password sealed by seal_password; raises ValueError without the key it was sealed with"""
+    try:
+        return cipher.decrypt(secret.encode("ascii")).decode("utf-8")
+    except InvalidToken:
+        raise ValueError("The document password cannot be decrypted by this worker; "
+                         "set the same JOB_SECRET_KEY on every API node and worker")
+
+class SQLiteJobQueue:
+    """Jobs stored in a local SQLite table; claims are atomic across processes"""
+
+    def __init__(self, db_path: str = "aadhaar_jobs.db"):
+        self.db_path = db_path
+        # Every process on this host shares the key file, so any of them can run any job
+        self.cipher = password_cipher(settings.job_secret_key or load_key_file(f"{db_path}.key"))
+        self.init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_database(self):
+        """Initialize the jobs table"""
+        try:
+            conn = self._connect()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ocr_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    content BLOB,
+                    options TEXT,
+                    secret TEXT,
+                    lease TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(ocr_jobs)")}
+            for column in ("secret", "lease"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE ocr_jobs ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_jobs_status ON ocr_jobs(status, created_at)")
+            conn.commit()
+            conn.close()
+            logger.info("Job queue database initialized successfully")
+        except Exception as e:
+            logger.error(f"Error initializing job queue database: {e}")
+            raise
+
+    def _enqueue(self, job_id: str, filename: str, content: bytes, options: Dict[str, Any], secret: Optional[str]):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO ocr_jobs (id, status, filename, content, options, secret, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, JOB_PENDING, filename, content, json.dumps(options), secret, now, now)
+        )
+        conn.commit()
+        conn.close()
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        lease = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            # Jobs whose worker died are picked up again once their lease expires
+            row = conn.execute("""
+                UPDATE ocr_jobs SET status = ?, lease = ?, updated_at = ?
+                WHERE id = (
+                    SELECT id FROM ocr_jobs
+                    WHERE status = ? OR (status = ? AND updated_at < ?)
+                    ORDER BY created_at LIMIT 1
+                )
+                RETURNING id, filename, content, options, secret
+            """, (JOB_PROCESSING, lease, now, JOB_PENDING, JOB_PROCESSING, now - settings.job_lease_seconds)).fetchone()
+            if row is not None:
+                # The password only lives in the claiming worker's memory from now on
+                conn.execute("UPDATE ocr_jobs SET secret = NULL WHERE id = ?", (row["id"],))
+            conn.commit()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return {"id": row["id"], "lease": lease, "filename": row["filename"], "content": row["content"],
+                "options": json.loads(row["options"] or "{}"), "secret": row["secret"]}
+
+    def _renew(self, job_id: str, lease: str) -> bool:
+        conn = self._connect()
+        cursor = conn.execute(
+            "UPDATE ocr_jobs SET updated_at = ? WHERE id = ? AND lease = ? AND status = ?",
+            (time.time(), job_id, lease, JOB_PROCESSING)
+        )
+        conn.commit()
+        conn.close()
+        return cursor.rowcount == 1
+
+    def _finish(self, job_id: str, lease: str, status: str, result: Optional[Dict[str, Any]],
+                error: Optional[str]) -> bool:
+        conn = self._connect()
+        # Drop the upload once the job is finished; a worker that lost its lease changes nothing
+        cursor = conn.execute(
+            "UPDATE ocr_jobs SET status = ?, result = ?, error = ?, content = NULL, options = NULL, "
+            "secret = NULL, lease = NULL, updated_at = ? WHERE id = ? AND lease = ? AND status = ?",
+            (status, json.dumps(result, default=str) if result is not None else None, error, time.time(),
+             job_id, lease, JOB_PROCESSING)
+        )
+        conn.commit()
+        conn.close()
+        return cursor.rowcount == 1
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT id, status, filename, result, error, created_at, updated_at FROM ocr_jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        conn.close()
+
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _purge(self, older_than: float) -> int:
+        conn = self._connect()
+        cursor = conn.execute(
+            "DELETE FROM ocr_jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (JOB_DONE, JOB_FAILED, older_than)
+        )
+        conn.commit()
+        conn.close()
+        return cursor.rowcount
+
+    async def enqueue(self, filename: str, content: bytes, options: Dict[str, Any],
+                      password: Optional[str] = None) -> str:
+        """Add a job and return its id"""
+        job_id = uuid.uuid4().hex
+        options = {**options, "has_password": password is not None}
+        await asyncio.to_thread(self._enqueue, job_id, filename, content, options, seal_password(self.cipher, password))
+        return job_id
+
+    def open_password(self, secret: str) -> str:
+        """The PDF password of a claimed job"""
+        return open_password(self.cipher, secret)
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest pending job, or None when the queue is empty"""
+        job = await asyncio.to_thread(self._claim)
+        if job is None:
+            await asyncio.sleep(settings.job_poll_interval)
+        return job
+
+    async def renew(self, job_id: str, lease: str) -> bool:
+        """Extend the lease of a running job; False if another worker has taken it over"""
+        return await asyncio.to_thread(self._renew, job_id, lease)
+
+    async def complete(self, job_id: str, lease: str, result: Dict[str, Any]) -> bool:
+        return await asyncio.to_thread(self._finish, job_id, lease, JOB_DONE, result, None)
+
+    async def fail(self, job_id: str, lease: str, error: str) -> bool:
+        return await asyncio.to_thread(self._finish, job_id, lease, JOB_FAILED, None, error)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status and result, without the uploaded content"""
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def housekeeping(self) -> int:
+        """Delete finished jobs older than the result TTL"""
+        return await asyncio.to_thread(self._purge, time.time() - settings.job_result_ttl_seconds)
+
+# KEYS: job hash. ARGV: lease, updated_at
+RENEW_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'lease') ~= ARGV[1] then return 0 end
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[2])
+return 1
+"""
+
+# KEYS: job hash, processing list. ARGV: lease, job id, status, outcome field, outcome, updated_at, ttl
+FINISH_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'lease') ~= ARGV[1] then return 0 end
+redis.call('HSET', KEYS[1], 'status', ARGV[3], ARGV[4], ARGV[5], 'updated_at', ARGV[6])
+redis.call('HDEL', KEYS[1], 'content', 'options', 'secret', 'lease')
+redis.call('LREM', KEYS[2], 1, ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[7])
+return 1
+"""
+
+# KEYS: job hash, processing list, pending list. ARGV: job id, cutoff
+REQUEUE_SCRIPT = """
+local updated_at = redis.call('HGET', KEYS[1], 'updated_at')
+if updated_at and tonumber(updated_at) >= tonumber(ARGV[2]) then return 0 end
+if redis.call('LREM', KEYS[2], 1, ARGV[1]) == 0 then return 0 end
+redis.call('RPUSH', KEYS[3], ARGV[1])
+if updated_at then
+    redis.call('HSET', KEYS[1], 'status', 'pending')
+    redis.call('HDEL', KEYS[1], 'lease')
+end
+return 1
+"""
+
+class RedisJobQueue:
+    """Jobs stored in a Redis-protocol server, shared by every API node and worker"""
+
+    def __init__(self, url: str, prefix: str = "aadhaar:jobs"):
+        if aioredis is None:
+            raise RuntimeError("The redis job queue backend requires the 'redis' package")
+        # Jobs move between nodes and outlive restarts, so a per-process key would
+        # leave queued passwords undecryptable
+        if not settings.job_secret_key:
+            raise RuntimeError("The redis job queue backend requires JOB_SECRET_KEY, "
+                               "set to the same value on every API node and worker")
+        self.client = aioredis.from_url(url)
+        self.pending_key = f"{prefix}:pending"
+        self.processing_key = f"{prefix}:processing"
+        self.job_prefix = f"{prefix}:job:"
+        self.cipher = password_cipher(settings.job_secret_key)
+        # Lease checks and their writes run as one atomic script on the server
+        self._renew_script = self.client.register_script(RENEW_SCRIPT)
+        self._finish_script = self.client.register_script(FINISH_SCRIPT)
+        self._requeue_script = self.client.register_script(REQUEUE_SCRIPT)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.job_prefix}{job_id}"
+
+    async def enqueue(self, filename: str, content: bytes, options: Dict[str, Any],
+                      password: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        mapping = {
+            "status": JOB_PENDING, "filename": filename, "content": content,
+            "options": json.dumps({**options, "has_password": password is not None}),
+            "created_at": now, "updated_at": now,
+        }
+        if password is not None:
+            mapping["secret"] = seal_password(self.cipher, password)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job_id), mapping=mapping)
+            pipe.lpush(self.pending_key, job_id)
+            await pipe.execute()
+        return job_id
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        job_id = await self.client.blmove(
+            self.pending_key, self.processing_key, settings.job_poll_interval, "RIGHT", "LEFT"
+        )
+        if job_id is None:
+            return None
+
+        job_id = job_id.decode()
+        key = self._job_key(job_id)
+        lease = uuid.uuid4().hex
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hmget(key, "filename", "content", "options", "secret")
+            pipe.hset(key, mapping={"status": JOB_PROCESSING, "lease": lease, "updated_at": time.time()})
+            # The password only lives in the claiming worker's memory from now on
+            pipe.hdel(key, "secret")
+            (filename, content, options, secret), _, _ = await pipe.execute()
+        if filename is None:
+            # Job expired before it was picked up
+            await self.client.delete(key)
+            await self.client.lrem(self.processing_key, 1, job_id)
+            return None
+        return {"id": job_id, "lease": lease, "filename": filename.decode(), "content": content,
+                "options": json.loads(options or "{}"), "secret": secret.decode() if secret else None}
+
+    def open_password(self, secret: str) -> str:
+        """The PDF password of a claimed job"""
+        return open_password(self.cipher, secret)
+
+    async def renew(self, job_id: str, lease: str) -> bool:
+        """Extend the lease of a running job; False if another worker has taken it over"""
+        return bool(await self._renew_script(keys=[self._job_key(job_id)], args=[lease, time.time()]))
+
+    async def _finish(self, job_id: str, lease: str, status: str, field: str, value: str) -> bool:
+        return bool(await self._finish_script(
+            keys=[self._job_key(job_id), self.processing_key],
+            args=[lease, job_id, status, field, value, time.time(), settings.job_result_ttl_seconds]
+        ))
+
+    async def complete(self, job_id: str, lease: str, result: Dict[str, Any]) -> bool:
+        return await self._finish(job_id, lease, JOB_DONE, "result", json.dumps(result, default=str))
+
+    async def fail(self, job_id: str, lease: str, error: str) -> bool:
+        return await self._finish(job_id, lease, JOB_FAILED, "error", error)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        fields = ["status", "filename", "result", "error", "created_at", "updated_at"]
+        values = await self.client.hmget(self._job_key(job_id), *fields)
+        if values[0] is None:
+            return None
+
+        job = {"id": job_id}
+        for field, value in zip(fields, values):
+            job[field] = value.decode() if value is not None else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["created_at"] = float(job["created_at"])
+        job["updated_at"] = float(job["updated_at"])
+        return job
+
+    async def requeue_stale(self) -> int:
+        """Move jobs whose worker died back to the pending list"""
+        requeued = 0
+        cutoff = time.time() - settings.job_lease_seconds
+        for job_id in await self.client.lrange(self.processing_key, 0, -1):
+            job_id = job_id.decode()
+            # Checked and moved atomically, so a lease renewed meanwhile is kept
+            requeued += await self._requeue_script(
+                keys=[self._job_key(job_id), self.processing_key, self.pending_key], args=[job_id, cutoff]
+            )
+        return requeued
+
+    async def housekeeping(self) -> int:
+        """Recover stale jobs (finished jobs expire on their own)"""
+        return await self.requeue_stale()
+
+_job_queue = None
+
+def get_job_queue():
+    """Get the configured job queue instance"""
+    global _job_queue
+
+    if _job_queue is None:
+        backend = settings.job_queue_backend.lower()
+        if backend == "sqlite":
+            _job_queue = SQLiteJobQueue(settings.job_queue_path)
+        elif backend == "redis":
+            _job_queue = RedisJobQueue(settings.job_queue_url)
+        else:
+            raise ValueError(f"Unknown job queue backend: {settings.job_queue_backend}")
+        logger.info(f"Using {backend} job queue")
+    return _job_queue
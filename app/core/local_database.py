@@ -1,27 +1,191 @@
 """
 Local SQLite database implementation as fallback
 This allows the application to work immediately without Supabase setup
+
+Connections are persistent: one per thread for reads and one serialized writer
+per process, all in WAL mode so readers never wait for the writer
 """
 
 import sqlite3
 import os
-import json
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from datetime import datetime, timezone
 import logging
 
+from app.core.config import settings
+from app.core.search import FTS5_WEIGHTS, fts5_match
+
 logger = logging.getLogger(__name__)
 
+# Columns written from Aadhaar data (id and timestamps are managed by the database)
+RECORD_FIELDS = [
+    'vid', 'aadhaar_number', 'name_tamil', 'name', 'guardian_name',
+    'dob', 'gender', 'address', 'vtc', 'po', 'sub_district',
+    'district', 'state', 'pincode', 'phone'
+]
+
+# Keep IN (...) lists under SQLite's bound parameter limit
+SQLITE_MAX_IN_PARAMS = 500
+
+SQLITE_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+# Full-text index of the names and address, kept in sync with aadhaar_forms by triggers. unicode61
+# only treats letters and digits as part of a word by default, which splits Tamil words at
+# every vowel sign; adding the mark categories (M*) keeps them whole.
+SQLITE_SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS aadhaar_forms_fts USING fts5(
+        name, name_tamil, guardian_name, address,
+        content='aadhaar_forms', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS aadhaar_forms_fts_insert AFTER INSERT ON aadhaar_forms BEGIN
+        INSERT INTO aadhaar_forms_fts(rowid, name, name_tamil, guardian_name, address)
+        VALUES (new.id, new.name, new.name_tamil, new.guardian_name, new.address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS aadhaar_forms_fts_delete AFTER DELETE ON aadhaar_forms BEGIN
+        INSERT INTO aadhaar_forms_fts(aadhaar_forms_fts, rowid, name, name_tamil, guardian_name, address)
+        VALUES ('delete', old.id, old.name, old.name_tamil, old.guardian_name, old.address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS aadhaar_forms_fts_update
+    AFTER UPDATE OF name, name_tamil, guardian_name, address ON aadhaar_forms BEGIN
+        INSERT INTO aadhaar_forms_fts(aadhaar_forms_fts, rowid, name, name_tamil, guardian_name, address)
+        VALUES ('delete', old.id, old.name, old.name_tamil, old.guardian_name, old.address);
+        INSERT INTO aadhaar_forms_fts(rowid, name, name_tamil, guardian_name, address)
+        VALUES (new.id, new.name, new.name_tamil, new.guardian_name, new.address);
+    END
+    """,
+]
+
+# Indexes the rows of a table that existed before the search index did
+SQLITE_SEARCH_REBUILD = "INSERT INTO aadhaar_forms_fts(aadhaar_forms_fts) VALUES ('rebuild')"
+
+def sqlite_search_query(after: bool) -> str:
+    """Ranked FTS5 search over the newest :candidates matches; bm25 is lower for better
+    matches, so the score is its negation"""
+    weights = ", ".join(str(weight) for weight in FTS5_WEIGHTS)
+    keyset = "WHERE m.score < :after_score OR (m.score = :after_score AND f.id > :after_id)" if after else ""
+    return f"""
+        SELECT f.*, m.score FROM (
+            SELECT rowid, -bm25(aadhaar_forms_fts, {weights}) AS score
+            FROM aadhaar_forms_fts
+            WHERE aadhaar_forms_fts MATCH :match
+            ORDER BY rowid DESC
+            LIMIT :candidates
+        ) m
+        JOIN aadhaar_forms f ON f.id = m.rowid
+        {keyset}
+        ORDER BY m.score DESC, f.id
+        LIMIT :limit
+    """
+
+def sqlite_timestamp(value: datetime) -> str:
+    """A datetime in the UTC 'YYYY-MM-DD HH:MM:SS' text CURRENT_TIMESTAMP stores"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
 class LocalDatabase:
     def __init__(self, db_path: str = "aadhaar_data.db"):
         self.db_path = db_path
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self.init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the tuned PRAGMAs"""
+        synchronous = settings.sqlite_synchronous.upper()
+        if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+            raise ValueError(f"Unknown SQLite synchronous mode: {settings.sqlite_synchronous}")
+
+        # Autocommit mode: writes open their own BEGIN IMMEDIATE transactions
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=settings.sqlite_busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+        conn.execute(f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _check_fork(self):
+        """SQLite connections must not cross a fork: a forked worker opens its own"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._write_lock = threading.Lock()
+            self._writer = None
+            self._connections = []
+            self._connections_lock = threading.Lock()
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's persistent read connection"""
+        self._check_fork()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Run writes on the process-wide writer connection, one transaction at a time
+
+        BEGIN IMMEDIATE takes SQLite's write lock up front, so writers from other
+        processes queue on busy_timeout instead of failing with "database is locked"
+        when a read transaction tries to upgrade.
+        """
+        self._check_fork()
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn.cursor()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """Close every connection opened by this process"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+        self._writer = None
+
     def init_database(self):
         """Initialize the local SQLite database"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            # Short-lived connection: nothing persistent is opened before a fork
+            conn = sqlite3.connect(self.db_path, timeout=settings.sqlite_busy_timeout_ms / 1000)
             cursor = conn.cursor()
+
+            # WAL is stored in the database file, so this only needs to happen once
+            cursor.execute("PRAGMA journal_mode = WAL")
             
             # Create the aadhaar_forms table
             cursor.execute("""
@@ -52,6 +216,15 @@ class LocalDatabase:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_vid ON aadhaar_forms(vid)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON aadhaar_forms(created_at)")
             
+            # Full-text search index, backfilled once for databases created before it
+            search_index_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'aadhaar_forms_fts'"
+            ).fetchone() is not None
+            for statement in SQLITE_SEARCH_SCHEMA:
+                cursor.execute(statement)
+            if not search_index_exists:
+                cursor.execute(SQLITE_SEARCH_REBUILD)
+            
             conn.commit()
             conn.close()
             logger.info("Local SQLite database initialized successfully")
@@ -63,34 +236,20 @@ class LocalDatabase:
     def create_record(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new record in the local database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
-            cursor = conn.cursor()
-            
             # Prepare the data
-            fields = [
-                'vid', 'aadhaar_number', 'name_tamil', 'name', 'guardian_name',
-                'dob', 'gender', 'address', 'vtc', 'po', 'sub_district',
-                'district', 'state', 'pincode', 'phone'
-            ]
+            fields = RECORD_FIELDS
             
             values = [data.get(field) for field in fields]
             placeholders = ', '.join(['?' for _ in fields])
             field_names = ', '.join(fields)
             
-            # Insert the record
-            cursor.execute(f"""
-                INSERT INTO aadhaar_forms ({field_names}, created_at, updated_at)
-                VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            """, values)
-            
-            # Get the inserted record
-            record_id = cursor.lastrowid
-            cursor.execute("SELECT * FROM aadhaar_forms WHERE id = ?", (record_id,))
-            record = dict(cursor.fetchone())
-            
-            conn.commit()
-            conn.close()
+            with self._write_transaction() as cursor:
+                cursor.execute(f"""
+                    INSERT INTO aadhaar_forms ({field_names}, created_at, updated_at)
+                    VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    RETURNING *
+                """, values)
+                record = dict(cursor.fetchone())
             
             logger.info(f"Created local record for Aadhaar: {data.get('aadhaar_number')}")
             return record
@@ -105,15 +264,11 @@ class LocalDatabase:
     def get_by_aadhaar_number(self, aadhaar_number: str) -> Optional[Dict[str, Any]]:
         """Get a record by Aadhaar number"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM aadhaar_forms WHERE aadhaar_number = ?", (aadhaar_number,))
+            cursor = self._reader().execute(
+                "SELECT * FROM aadhaar_forms WHERE aadhaar_number = ?", (aadhaar_number,)
+            )
             record = cursor.fetchone()
             
-            conn.close()
-            
             if record:
                 return dict(record)
             return None
@@ -125,10 +280,6 @@ class LocalDatabase:
     def update_record(self, aadhaar_number: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update an existing record"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
             # Build update query
             fields = [f"{key} = ?" for key in data.keys() if key != 'aadhaar_number']
             values = [value for key, value in data.items() if key != 'aadhaar_number']
@@ -141,60 +292,199 @@ class LocalDatabase:
                 UPDATE aadhaar_forms 
                 SET {', '.join(fields)}, updated_at = CURRENT_TIMESTAMP
                 WHERE aadhaar_number = ?
+                RETURNING *
             """
             
-            cursor.execute(query, values)
+            with self._write_transaction() as cursor:
+                cursor.execute(query, values)
+                record = cursor.fetchone()
+                return dict(record) if record else None
+            
+        except Exception as e:
+            logger.error(f"Error updating record: {e}")
+            raise
+    
+    def upsert_record(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Insert a record or update the given fields of the existing one in one statement;
+        returns (record, created)"""
+        try:
+            fields = [field for field in RECORD_FIELDS if field in data]
+            field_names = ', '.join(fields)
+            placeholders = ', '.join(['?' for _ in fields])
+            updates = ', '.join(f"{field} = excluded.{field}" for field in fields if field != 'aadhaar_number')
             
-            if cursor.rowcount > 0:
-                # Get the updated record
-                cursor.execute("SELECT * FROM aadhaar_forms WHERE aadhaar_number = ?", (aadhaar_number,))
+            with self._write_transaction() as cursor:
+                # AUTOINCREMENT ids only grow, so the connection's last rowid changes iff a row was inserted
+                last_rowid = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+                cursor.execute(f"""
+                    INSERT INTO aadhaar_forms ({field_names}, created_at, updated_at)
+                    VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ON CONFLICT(aadhaar_number) DO UPDATE SET {updates + ', ' if updates else ''}updated_at = CURRENT_TIMESTAMP
+                    RETURNING *
+                """, [data[field] for field in fields])
                 record = dict(cursor.fetchone())
-                conn.commit()
-                conn.close()
-                return record
+                created = cursor.execute("SELECT last_insert_rowid()").fetchone()[0] != last_rowid
             
-            conn.close()
-            return None
+            logger.info(f"{'Created' if created else 'Updated'} local record for Aadhaar: {data.get('aadhaar_number')}")
+            return record, created
             
         except Exception as e:
-            logger.error(f"Error updating record: {e}")
+            logger.error(f"Error upserting local record: {e}")
             raise
     
-    def list_records(self, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
-        """List all records with pagination"""
+    def _select_in(self, cursor: sqlite3.Cursor, columns: str, numbers: List[str]) -> List[sqlite3.Row]:
+        """Rows for many Aadhaar numbers, in IN (...) lists under the bound parameter limit"""
+        rows = []
+        for start in range(0, len(numbers), SQLITE_MAX_IN_PARAMS):
+            chunk = numbers[start:start + SQLITE_MAX_IN_PARAMS]
+            cursor.execute(
+                f"SELECT {columns} FROM aadhaar_forms WHERE aadhaar_number IN ({', '.join(['?' for _ in chunk])})",
+                chunk
+            )
+            rows.extend(cursor.fetchall())
+        return rows
+    
+    def bulk_upsert_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert or update many records with one executemany in a single transaction;
+        returns an outcome per record: created, updated or failed"""
+        if not records:
+            return []
+
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            field_names = ', '.join(RECORD_FIELDS)
+            placeholders = ', '.join(['?' for _ in RECORD_FIELDS])
+            # Fields missing from an update keep their stored value
+            updates = ', '.join(
+                f"{field} = COALESCE(excluded.{field}, {field})"
+                for field in RECORD_FIELDS if field != 'aadhaar_number'
+            )
+            query = f"""
+                INSERT INTO aadhaar_forms ({field_names}, created_at, updated_at)
+                VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT(aadhaar_number) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP
+            """
+            numbers = [record['aadhaar_number'] for record in records]
+            errors: Dict[str, str] = {}
             
-            cursor.execute("""
-                SELECT * FROM aadhaar_forms 
-                ORDER BY created_at DESC 
-                LIMIT ? OFFSET ?
-            """, (limit, offset))
+            with self._write_transaction() as cursor:
+                # The writer holds the lock, so this tells inserts from updates exactly
+                existing = {row[0] for row in self._select_in(cursor, "aadhaar_number", numbers)}
+                
+                cursor.execute("SAVEPOINT bulk_upsert")
+                try:
+                    cursor.executemany(query, [[record.get(field) for field in RECORD_FIELDS] for record in records])
+                    cursor.execute("RELEASE bulk_upsert")
+                except sqlite3.Error:
+                    # Redo row by row so one bad record does not fail the others
+                    cursor.execute("ROLLBACK TO bulk_upsert")
+                    for record in records:
+                        cursor.execute("SAVEPOINT bulk_upsert_row")
+                        try:
+                            cursor.execute(query, [record.get(field) for field in RECORD_FIELDS])
+                        except sqlite3.Error as e:
+                            cursor.execute("ROLLBACK TO bulk_upsert_row")
+                            errors[record['aadhaar_number']] = str(e)
+                        cursor.execute("RELEASE bulk_upsert_row")
+                    cursor.execute("RELEASE bulk_upsert")
+                
+                # Read back the stored rows
+                saved = {row['aadhaar_number']: dict(row) for row in self._select_in(cursor, "*", numbers)}
             
-            records = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            outcomes = []
+            for number in numbers:
+                if number in errors:
+                    outcomes.append({"aadhaar_number": number, "status": "failed", "error": errors[number]})
+                else:
+                    outcomes.append({"aadhaar_number": number, "status": "updated" if number in existing else "created",
+                                     "record": saved[number]})
+            
+            logger.info(f"Upserted {len(records) - len(errors)} of {len(records)} local records")
+            return outcomes
+            
+        except Exception as e:
+            logger.error(f"Error bulk upserting records: {e}")
+            raise
+    
+    def list_records(self, limit: int = 10, after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """List records newest first, starting after the (created_at, id) of the previous page's last row"""
+        try:
+            # Keyset pagination: idx_created_at (which ends in the rowid id) seeks straight to the page
+            if after is None:
+                cursor = self._reader().execute("""
+                    SELECT * FROM aadhaar_forms 
+                    ORDER BY created_at DESC, id DESC 
+                    LIMIT ?
+                """, (limit,))
+            else:
+                cursor = self._reader().execute("""
+                    SELECT * FROM aadhaar_forms 
+                    WHERE (created_at, id) < (?, ?)
+                    ORDER BY created_at DESC, id DESC 
+                    LIMIT ?
+                """, (after[0], after[1], limit))
             
-            return records
+            return [dict(row) for row in cursor.fetchall()]
             
         except Exception as e:
             logger.error(f"Error listing records: {e}")
             raise
     
-    def delete_record(self, aadhaar_number: str) -> bool:
-        """Delete a record by Aadhaar number"""
+    def export_batch(self, limit: int, after: Optional[Tuple[str, int]] = None,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Next batch of an export, oldest first, after the (created_at, id) of the previous batch"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conditions, params = [], []
+            if after is not None:
+                conditions.append("(created_at, id) > (?, ?)")
+                params.extend(after)
+            if since is not None:
+                conditions.append("created_at >= ?")
+                params.append(sqlite_timestamp(since))
+            if until is not None:
+                conditions.append("created_at < ?")
+                params.append(sqlite_timestamp(until))
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            cursor = self._reader().execute(f"""
+                SELECT * FROM aadhaar_forms {where}
+                ORDER BY created_at, id
+                LIMIT ?
+            """, (*params, limit))
+            return [dict(row) for row in cursor.fetchall()]
             
-            cursor.execute("DELETE FROM aadhaar_forms WHERE aadhaar_number = ?", (aadhaar_number,))
-            deleted = cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error exporting records: {e}")
+            raise
+    
+    def search_records(self, terms: List[str], limit: int = 10,
+                       after: Optional[Tuple[float, int]] = None) -> List[Dict[str, Any]]:
+        """Records matching every search term, best match first, with their score"""
+        try:
+            params = {"match": fts5_match(terms), "candidates": settings.search_max_candidates, "limit": limit}
+            if after is not None:
+                params["after_score"], params["after_id"] = after
+            cursor = self._reader().execute(sqlite_search_query(after is not None), params)
+            return [dict(row) for row in cursor.fetchall()]
             
-            conn.commit()
-            conn.close()
+        except Exception as e:
+            logger.error(f"Error searching records: {e}")
+            raise
+    
+    def count_records(self) -> int:
+        """Count every record"""
+        try:
+            return self._reader().execute("SELECT COUNT(*) FROM aadhaar_forms").fetchone()[0]
             
-            return deleted
+        except Exception as e:
+            logger.error(f"Error counting records: {e}")
+            raise
+    
+    def delete_record(self, aadhaar_number: str) -> bool:
+        """Delete a record by Aadhaar number"""
+        try:
+            with self._write_transaction() as cursor:
+                cursor.execute("DELETE FROM aadhaar_forms WHERE aadhaar_number = ?", (aadhaar_number,))
+                return cursor.rowcount > 0
             
         except Exception as e:
             logger.error(f"Error deleting record: {e}")
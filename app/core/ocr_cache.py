@@ -0,0 +1,236 @@
+"""
+Content-addressed cache for OCR results
+Keyed by a hash of the uploaded bytes, the PDF password and the OCR configuration,
+with a bounded in-memory LRU tier and an optional size-capped on-disk tier that
+can be shared by several uvicorn workers
+
+Lookups and stores do file I/O, so async callers run them in a thread.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from app.core.config import settings
+from app.schemas.aadhaar import AadhaarDataCreate
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the shape of a cached entry changes, so older disk entries are never read
+CACHE_FORMAT_VERSION = 2
+
+def hash_content(file_content: bytes) -> str:
+    """SHA-256 of uploaded bytes (spooled uploads are hashed while they are written)"""
+    return hashlib.sha256(file_content).hexdigest()
+
+def make_cache_key(content_sha256: str, password: Optional[str], ocr_config: str) -> str:
+    """Build the content address for an upload"""
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}".encode("ascii"))
+    digest.update(b"\0")
+    digest.update(content_sha256.encode("ascii"))
+    digest.update(b"\0")
+    digest.update((password or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(ocr_config.encode("utf-8"))
+    return digest.hexdigest()
+
+class OCRResultCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 86400,
+                 cache_dir: str = "", max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Running total of the disk tier; None until the cache directory has been scanned.
+        # Entries written by other workers only show up at the next scan.
+        self._disk_bytes: Optional[int] = None
+        self._evict_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+        }
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[str, AadhaarDataCreate]]:
+        """Look up a cached (text, parsed data) pair"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_expired(entry[0]):
+                    del self._memory[key]
+                    self._stats["expired"] += 1
+                else:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1], AadhaarDataCreate(**entry[2])
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            with self._lock:
+                self._stats["disk_hits"] += 1
+                self._put_memory(key, entry)
+            return entry[1], AadhaarDataCreate(**entry[2])
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, text: str, data: AadhaarDataCreate):
+        """Store an OCR result in both tiers"""
+        # Only the fields the parser found: a hit must rebuild the same set of fields as a miss,
+        # or the upsert would overwrite stored values with the defaults of unset ones
+        entry = (time.time(), text, data.model_dump(exclude_unset=True))
+        with self._lock:
+            self._put_memory(key, entry)
+        self._write_disk(key, entry)
+
+    def _put_memory(self, key: str, entry: Tuple[float, str, Dict[str, Any]]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str, Dict[str, Any]]]:
+        if not self.cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable OCR cache entry {key}: {e}")
+            self._remove_disk(path)
+            return None
+
+        if self._is_expired(payload["created_at"]):
+            self._remove_disk(path)
+            with self._lock:
+                self._stats["expired"] += 1
+            return None
+
+        # Touch the file so disk eviction is least-recently-used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return payload["created_at"], payload["text"], payload["data"]
+
+    def _write_disk(self, key: str, entry: Tuple[float, str, Dict[str, Any]]):
+        if not self.cache_dir:
+            return
+
+        payload = {"created_at": entry[0], "text": entry[1], "data": entry[2]}
+        encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(encoded)
+            # Atomic rename so other workers never see a partial entry
+            os.replace(tmp_path, self._disk_path(key))
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(encoded)
+                over_budget = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+            # The directory is only scanned once the running total says it may be over the cap
+            if over_budget:
+                self._enforce_disk_budget()
+        except OSError as e:
+            logger.warning(f"Failed to write OCR cache entry {key}: {e}")
+
+    def _remove_disk(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _enforce_disk_budget(self):
+        """Rescan the disk tier and evict least-recently-used entries until under the size cap"""
+        # One scan at a time; a write that lands during a scan is picked up by the next one
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            self._evict_to_budget()
+        finally:
+            self._evict_lock.release()
+
+    def _evict_to_budget(self):
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            self._remove_disk(path)
+            total -= size
+            with self._lock:
+                self._stats["disk_evictions"] += 1
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        """Drop every cached entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = None
+        if self.cache_dir:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        self._remove_disk(entry.path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and eviction counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        stats["disk_enabled"] = bool(self.cache_dir)
+        return stats
+
+# Global instance
+ocr_cache = OCRResultCache(
+    max_entries=settings.ocr_cache_max_entries,
+    ttl_seconds=settings.ocr_cache_ttl_seconds,
+    cache_dir=settings.ocr_cache_dir,
+    max_disk_bytes=settings.ocr_cache_max_disk_mb * 1024 * 1024
+)
+
+def get_ocr_cache() -> OCRResultCache:
+    """Get the OCR result cache instance"""
+    return ocr_cache
@@ -0,0 +1,125 @@
+"""
+Executor for CPU-bound OCR work
+Runs Tesseract and PyMuPDF outside the event loop so reads stay responsive
+"""
+
+import asyncio
+import os
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[Executor] = None
+_thread_pools: Dict[str, ThreadPoolExecutor] = {}
+_thread_pools_lock = threading.Lock()
+
+def _init_ocr_worker(omp_thread_limit: int):
+    """Limit OpenMP threads before Tesseract is loaded in the worker process"""
+    os.environ["OMP_THREAD_LIMIT"] = str(omp_thread_limit)
+
+@contextmanager
+def _omp_thread_limit(omp_thread_limit: int):
+    """Set OMP_THREAD_LIMIT only for the processes started inside the block"""
+    previous = os.environ.get("OMP_THREAD_LIMIT")
+    os.environ["OMP_THREAD_LIMIT"] = str(omp_thread_limit)
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["OMP_THREAD_LIMIT"]
+        else:
+            os.environ["OMP_THREAD_LIMIT"] = previous
+
+def _get_process_context() -> multiprocessing.context.BaseContext:
+    """Multiprocessing context for the OCR workers
+
+    With forkserver the OCR modules are imported once in the fork server and every
+    worker is forked from it, sharing those pages instead of re-importing them.
+    """
+    method = settings.ocr_start_method.lower()
+    if method not in multiprocessing.get_all_start_methods():
+        logger.warning(f"Start method {method} is not available, using spawn")
+        method = "spawn"
+
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        from multiprocessing import forkserver  # not available on Windows
+
+        context.set_forkserver_preload(["app.ocr_parser"])
+        # The fork server loads Tesseract, so OpenMP must see the limit when it starts;
+        # the API process and its other subprocesses keep their own environment
+        with _omp_thread_limit(settings.ocr_omp_thread_limit):
+            forkserver.ensure_running()
+    return context
+
+def start_ocr_pool() -> Optional[Executor]:
+    """Start the OCR executor according to the configured execution mode"""
+    global _executor
+
+    if _executor is not None:
+        return _executor
+
+    mode = settings.ocr_execution_mode.lower()
+    pool_size = settings.get_ocr_pool_size()
+
+    if mode == "process":
+        _executor = ProcessPoolExecutor(
+            max_workers=pool_size,
+            mp_context=_get_process_context(),
+            initializer=_init_ocr_worker,
+            initargs=(settings.ocr_omp_thread_limit,)
+        )
+    elif mode == "thread":
+        # OCR runs in this process, whose environment is left alone: set OMP_THREAD_LIMIT
+        # for the API process itself to limit OpenMP in thread mode
+        _executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="ocr")
+    elif mode == "inline":
+        logger.info("OCR running inline on the event loop")
+        return None
+    else:
+        raise ValueError(f"Unknown OCR execution mode: {settings.ocr_execution_mode}")
+
+    omp_thread_limit = (settings.ocr_omp_thread_limit if mode == "process"
+                        else os.environ.get("OMP_THREAD_LIMIT", "unset"))
+    logger.info(f"Started OCR {mode} pool with {pool_size} workers (OMP_THREAD_LIMIT={omp_thread_limit})")
+    return _executor
+
+def shutdown_ocr_pool():
+    """Stop the OCR executor and wait for running jobs"""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        logger.info("OCR pool shut down")
+
+async def run_ocr_task(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking OCR function in the pool and await its result"""
+    executor = start_ocr_pool()
+
+    if executor is None:
+        return func(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+def get_ocr_thread_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Get a long-lived thread pool inside the current OCR worker process
+
+    Threads are reused across jobs so their Tesseract handles stay initialized.
+    Tasks running in one pool must only submit work to a different pool.
+    """
+    with _thread_pools_lock:
+        pool = _thread_pools.get(name)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"ocr-{name}")
+            _thread_pools[name] = pool
+        return pool
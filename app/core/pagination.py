@@ -0,0 +1,61 @@
+"""
+Opaque cursors for keyset pagination
+A cursor carries the (created_at, id) of the last row of a page, or the (score, id) of
+the last search result; the next page starts strictly after it, so every page costs
+the same as the first
+"""
+
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, Tuple, Union
+
+def encode_cursor(record: Dict[str, Any]) -> str:
+    """Cursor pointing after this record"""
+    created_at: Union[str, datetime] = record["created_at"]
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps([created_at, record["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def cursor_timestamp(created_at: str) -> str:
+    """Re-serialize a created_at taken from a cursor, so only a timestamp ever reaches a query filter
+
+    Uses the "YYYY-MM-DD HH:MM:SS" form that SQLite's CURRENT_TIMESTAMP stores; raises
+    ValueError for anything that is not an ISO 8601 timestamp.
+    """
+    if not isinstance(created_at, str):
+        raise ValueError("Invalid cursor")
+    try:
+        return datetime.fromisoformat(created_at).isoformat(sep=" ")
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """(created_at, id) of a cursor; raises ValueError for anything not made by encode_cursor"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, record_id = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(record_id, int) or isinstance(record_id, bool):
+        raise ValueError("Invalid cursor")
+    return cursor_timestamp(created_at), record_id
+
+def encode_search_cursor(record: Dict[str, Any]) -> str:
+    """Cursor pointing after this search result (results are ordered by score, then id)"""
+    payload = json.dumps([record["score"], record["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    """(score, id) of a search cursor; raises ValueError for anything not made by encode_search_cursor"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, record_id = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(score, (int, float)) or isinstance(score, bool) or not isinstance(record_id, int):
+        raise ValueError("Invalid cursor")
+    return float(score), record_id
@@ -0,0 +1,222 @@
+"""
+Read-through cache for stored Aadhaar records
+Keyed by Aadhaar number, with a bounded in-memory LRU tier per worker and an optional
+Redis tier shared by every uvicorn worker. Misses are cached briefly so repeated
+lookups of unknown numbers do not reach the database either. Writes through
+HybridAadhaarCRUD refresh or drop the cached entry.
+
+Every write bumps a per-key generation in the shared tier, and a lookup only stores
+what it read if the generation is still the one it saw before reading the database,
+so a worker that raced another worker's write cannot publish its stale copy.
+"""
+
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Union
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only needed for the shared tier
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Returned by get() when nothing is cached; None means a cached miss
+MISSING = object()
+
+# KEYS: record, generation. ARGV: generation seen before the read, payload, ttl
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then return 0 end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS: record, generation. ARGV: generation ttl
+BUMP_GENERATION_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+class RecordCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 60, negative_ttl_seconds: int = 5,
+                 shared_url: str = "", shared_ttl_seconds: int = 600, prefix: str = "aadhaar:records"):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self.prefix = prefix
+        self._memory: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every write, so a lookup that raced a write does not cache what it read
+        self._writes = 0
+        self._stats = {
+            "hits": 0,
+            "negative_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "invalidations": 0,
+            "shared_errors": 0,
+        }
+
+        self.shared = None
+        if shared_url:
+            if aioredis is None:
+                raise RuntimeError("The shared record cache requires the 'redis' package")
+            self.shared = aioredis.from_url(shared_url)
+            self._set_if_generation = self.shared.register_script(SET_IF_GENERATION_SCRIPT)
+            self._bump_generation = self.shared.register_script(BUMP_GENERATION_SCRIPT)
+
+    def _shared_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.prefix}:gen:{key}"
+
+    def _ttl(self, record: Optional[Dict[str, Any]]) -> int:
+        return self.ttl_seconds if record is not None else self.negative_ttl_seconds
+
+    async def write_token(self, key: str) -> Tuple[int, Optional[str]]:
+        """Take before reading the database; pass to set() so stale reads are not cached"""
+        with self._lock:
+            writes = self._writes
+
+        generation = None
+        if self.shared is not None:
+            try:
+                generation = await self.shared.get(self._generation_key(key))
+                generation = generation.decode() if generation is not None else "0"
+            except Exception as e:
+                self._shared_error("read", e)
+        return writes, generation
+
+    async def get(self, key: str) -> Union[Dict[str, Any], None, object]:
+        """Cached record, None for a cached miss, or MISSING"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] <= time.monotonic():
+                    del self._memory[key]
+                    self._stats["expired"] += 1
+                else:
+                    self._memory.move_to_end(key)
+                    self._stats["hits" if entry[1] is not None else "negative_hits"] += 1
+                    return entry[1]
+
+        if self.shared is not None:
+            try:
+                payload = await self.shared.get(self._shared_key(key))
+            except Exception as e:
+                payload = None
+                self._shared_error("read", e)
+            if payload is not None:
+                record = json.loads(payload)["record"]
+                with self._lock:
+                    self._stats["shared_hits"] += 1
+                    self._put_memory(key, record)
+                return record
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return MISSING
+
+    async def set(self, key: str, record: Optional[Dict[str, Any]], token: Optional[Tuple[int, Optional[str]]] = None):
+        """Cache a record (or a miss, as None) read with a token, only if no write happened since;
+        without a token, cache a record that was just written"""
+        with self._lock:
+            if token is not None and token[0] != self._writes:
+                return
+            if token is None:
+                self._writes += 1
+            self._put_memory(key, record)
+
+        if self.shared is None:
+            return
+        try:
+            if token is None:
+                # Concurrent writers in other workers could publish in any order; let the next read fill it
+                await self._bump_generation(
+                    keys=[self._shared_key(key), self._generation_key(key)], args=[self._generation_ttl()]
+                )
+            elif token[1] is not None:
+                ttl = self.shared_ttl_seconds if record is not None else self.negative_ttl_seconds
+                await self._set_if_generation(
+                    keys=[self._shared_key(key), self._generation_key(key)],
+                    args=[token[1], json.dumps({"record": record}, default=str), ttl]
+                )
+        except Exception as e:
+            self._shared_error("write", e)
+
+    async def invalidate(self, key: str):
+        """Drop a record from both tiers"""
+        with self._lock:
+            self._writes += 1
+            self._memory.pop(key, None)
+            self._stats["invalidations"] += 1
+
+        if self.shared is not None:
+            try:
+                await self._bump_generation(
+                    keys=[self._shared_key(key), self._generation_key(key)], args=[self._generation_ttl()]
+                )
+            except Exception as e:
+                self._shared_error("invalidate", e)
+
+    def _generation_ttl(self) -> int:
+        # Outlives any lookup in flight, so a generation never resets under a token
+        return max(self.shared_ttl_seconds, self.negative_ttl_seconds) * 2
+
+    def _put_memory(self, key: str, record: Optional[Dict[str, Any]]):
+        self._memory[key] = (time.monotonic() + self._ttl(record), record)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _shared_error(self, action: str, error: Exception):
+        # The cache must never fail a request; fall through to the database
+        with self._lock:
+            self._stats["shared_errors"] += 1
+        logger.warning(f"Shared record cache {action} failed: {error}")
+
+    def clear(self):
+        """Drop every entry of the in-memory tier"""
+        with self._lock:
+            self._writes += 1
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and eviction counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else None
+        stats["shared_enabled"] = self.shared is not None
+        return stats
+
+    async def close(self):
+        """Close the shared tier's connections"""
+        if self.shared is not None:
+            await self.shared.aclose()
+
+# Global instance (None when disabled)
+record_cache = RecordCache(
+    max_entries=settings.record_cache_max_entries,
+    ttl_seconds=settings.record_cache_ttl_seconds,
+    negative_ttl_seconds=settings.record_cache_negative_ttl_seconds,
+    shared_url=settings.record_cache_url,
+    shared_ttl_seconds=settings.record_cache_shared_ttl_seconds
+) if settings.record_cache_enabled else None
+
+def get_record_cache() -> Optional[RecordCache]:
+    """Get the record cache instance, or None if record caching is disabled"""
+    return record_cache
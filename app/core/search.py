@@ -0,0 +1,36 @@
+"""
+Full-text search over names, guardian name and address
+Builds the backend queries from the words of a search box: every word must match, the
+last one may be cut off (prefix match, as while typing), and nothing the user types is
+interpreted as query syntax
+
+Ranking every match of a very common word costs ~2 us per row, so only the newest
+SEARCH_MAX_CANDIDATES matches are ranked; queries with fewer matches are ranked exactly
+"""
+
+from typing import List
+
+# Words beyond this are ignored; each one adds an index lookup
+MAX_SEARCH_TERMS = 8
+
+# bm25 weights of name, name_tamil, guardian_name and address (Postgres uses setweight A, A, B, C)
+FTS5_WEIGHTS = (10.0, 10.0, 5.0, 1.0)
+
+def search_terms(q: str) -> List[str]:
+    """The words of a search query; raises ValueError if there are none"""
+    terms = q.split()[:MAX_SEARCH_TERMS]
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return terms
+
+def fts5_match(terms: List[str]) -> str:
+    """SQLite FTS5 MATCH expression: each term as a quoted string, the last one a prefix"""
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def tsquery(terms: List[str]) -> str:
+    """Postgres to_tsquery() text: each term as a quoted lexeme, the last one a prefix, all required"""
+    quoted = ["'" + term.replace("\\", "\\\\").replace("'", "''") + "'" for term in terms]
+    quoted[-1] += ":*"
+    return " & ".join(quoted)
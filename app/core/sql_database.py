@@ -0,0 +1,416 @@
+"""
+Async SQLAlchemy database backend
+Stores AadhaarForm rows through a pooled async engine: aiosqlite for a local file
+or asyncpg for a Postgres URL, so storage I/O never blocks the event loop and
+Postgres can be used directly without PostgREST's HTTP overhead
+"""
+
+import json
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+from sqlalchemy import String, delete, event, func, literal, literal_column, select, text, tuple_, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from app.core.config import settings
+from app.core.init_db import POSTGRES_SEARCH_SCHEMA
+from app.core.local_database import (
+    RECORD_FIELDS, SQLITE_SEARCH_REBUILD, SQLITE_SEARCH_SCHEMA, SQLITE_SYNCHRONOUS_MODES,
+    sqlite_search_query, sqlite_timestamp
+)
+from app.core.search import fts5_match, tsquery
+from app.models.aadhaar import Base, AadhaarForm
+
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+except ImportError:  # needs greenlet
+    create_async_engine = None
+
+logger = logging.getLogger(__name__)
+
+# Rows per savepoint of a bulk upsert; a failing chunk is redone row by row
+UPSERT_CHUNK_SIZE = 500
+
+# Postgres tables with more rows than this report the planner's estimate as their size
+ESTIMATED_COUNT_THRESHOLD = 100000
+
+aadhaar_forms = AadhaarForm.__table__
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the same PRAGMAs as LocalDatabase to each new aiosqlite connection"""
+    synchronous = settings.sqlite_synchronous.upper()
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Unknown SQLite synchronous mode: {settings.sqlite_synchronous}")
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA synchronous = {synchronous}")
+    cursor.execute(f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+    cursor.close()
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs nest inside the transaction
+    dbapi_connection.isolation_level = None
+
+def _begin_sqlite_transaction(conn):
+    conn.exec_driver_sql("BEGIN")
+
+class SQLDatabase:
+    def __init__(self, database_url: str):
+        if create_async_engine is None:
+            raise RuntimeError("The SQLAlchemy backend requires the 'greenlet' package")
+
+        url = make_url(database_url)
+        self.dialect = url.get_backend_name()
+        if self.dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif self.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            raise ValueError(f"Unsupported database URL: {url.drivername} (use sqlite+aiosqlite or postgresql+asyncpg)")
+        self._insert = insert
+
+        # aiosqlite defaults to NullPool for files; keep connections open like LocalDatabase
+        self.engine = create_async_engine(
+            url,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_pre_ping=True
+        )
+        # SQLite has a single writer; queue writes here instead of on busy_timeout
+        self._write_lock: Optional[asyncio.Lock] = None
+        if self.dialect == "sqlite":
+            event.listen(self.engine.sync_engine, "connect", _set_sqlite_pragmas)
+            event.listen(self.engine.sync_engine, "begin", _begin_sqlite_transaction)
+            self._write_lock = asyncio.Lock()
+
+        logger.info(f"Using SQLAlchemy {url.drivername} database at {url.render_as_string(hide_password=True)}")
+
+    async def init_database(self):
+        """Create the aadhaar_forms table and its indexes if they do not exist"""
+        try:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+                # Full-text search index, backfilled once for databases created before it
+                if self.dialect == "sqlite":
+                    search_index_exists = (await conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE name = 'aadhaar_forms_fts'")
+                    )).first() is not None
+                    for statement in SQLITE_SEARCH_SCHEMA:
+                        await conn.execute(text(statement))
+                    if not search_index_exists:
+                        await conn.execute(text(SQLITE_SEARCH_REBUILD))
+                elif self.dialect == "postgresql":
+                    for statement in POSTGRES_SEARCH_SCHEMA:
+                        await conn.execute(text(statement))
+            logger.info("SQLAlchemy database initialized successfully")
+        except Exception as e:
+            logger.error(f"Error initializing SQLAlchemy database: {e}")
+            raise
+
+    async def close(self):
+        """Close every pooled connection"""
+        await self.engine.dispose()
+
+    async def _write(self, statement) -> List[Dict[str, Any]]:
+        """Run a write statement in its own transaction and return the RETURNING rows"""
+        if self._write_lock is None:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(statement)
+                return [dict(row._mapping) for row in result]
+
+        async with self._write_lock:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(statement)
+                return [dict(row._mapping) for row in result]
+
+    async def _read(self, statement) -> List[Dict[str, Any]]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(statement)
+            return [dict(row._mapping) for row in result]
+
+    async def create_record(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new record"""
+        try:
+            values = {field: data.get(field) for field in RECORD_FIELDS}
+            rows = await self._write(
+                aadhaar_forms.insert()
+                .values(**values, created_at=func.now(), updated_at=func.now())
+                .returning(aadhaar_forms)
+            )
+            logger.info(f"Created SQL record for Aadhaar: {data.get('aadhaar_number')}")
+            return rows[0]
+
+        except IntegrityError as e:
+            logger.error(f"Integrity error creating record: {e}")
+            raise ValueError("Aadhaar number already exists")
+        except Exception as e:
+            logger.error(f"Error creating SQL record: {e}")
+            raise
+
+    async def get_by_aadhaar_number(self, aadhaar_number: str) -> Optional[Dict[str, Any]]:
+        """Get a record by Aadhaar number"""
+        try:
+            rows = await self._read(
+                select(aadhaar_forms).where(aadhaar_forms.c.aadhaar_number == aadhaar_number)
+            )
+            return rows[0] if rows else None
+
+        except Exception as e:
+            logger.error(f"Error retrieving record: {e}")
+            raise
+
+    async def update_record(self, aadhaar_number: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an existing record"""
+        try:
+            values = {key: value for key, value in data.items() if key in RECORD_FIELDS and key != 'aadhaar_number'}
+            if not values:
+                return None
+
+            rows = await self._write(
+                update(aadhaar_forms)
+                .where(aadhaar_forms.c.aadhaar_number == aadhaar_number)
+                .values(**values, updated_at=func.now())
+                .returning(aadhaar_forms)
+            )
+            return rows[0] if rows else None
+
+        except Exception as e:
+            logger.error(f"Error updating record: {e}")
+            raise
+
+    async def upsert_record(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Insert a record or update the given fields of the existing one in one statement;
+        returns (record, created)"""
+        try:
+            values = {field: data[field] for field in RECORD_FIELDS if field in data}
+            statement = self._insert(aadhaar_forms).values(**values, created_at=func.now(), updated_at=func.now())
+            statement = statement.on_conflict_do_update(
+                index_elements=[aadhaar_forms.c.aadhaar_number],
+                set_={
+                    **{field: statement.excluded[field] for field in values if field != 'aadhaar_number'},
+                    "updated_at": func.now()
+                }
+            )
+
+            if self._write_lock is None:
+                # xmax is only set on the row version an update produced
+                statement = statement.returning(aadhaar_forms, literal_column("xmax = 0").label("inserted"))
+                async with self.engine.begin() as conn:
+                    row = dict((await conn.execute(statement)).one()._mapping)
+                created = row.pop("inserted")
+            else:
+                # AUTOINCREMENT ids only grow, so the connection's last rowid changes iff a row was inserted
+                async with self._write_lock:
+                    async with self.engine.begin() as conn:
+                        last_rowid = (await conn.execute(text("SELECT last_insert_rowid()"))).scalar()
+                        row = dict((await conn.execute(statement.returning(aadhaar_forms))).one()._mapping)
+                        created = (await conn.execute(text("SELECT last_insert_rowid()"))).scalar() != last_rowid
+
+            logger.info(f"{'Created' if created else 'Updated'} SQL record for Aadhaar: {data.get('aadhaar_number')}")
+            return row, created
+
+        except Exception as e:
+            logger.error(f"Error upserting SQL record: {e}")
+            raise
+
+    def _bulk_upsert_statement(self):
+        """Single-row upsert; executed with a list of rows it is batched into multi-row
+        INSERT ... VALUES statements (insertmanyvalues) and compiled only once"""
+        statement = self._insert(aadhaar_forms).values(created_at=func.now(), updated_at=func.now())
+        # Fields missing from an update keep their stored value
+        statement = statement.on_conflict_do_update(
+            index_elements=[aadhaar_forms.c.aadhaar_number],
+            set_={
+                **{field: func.coalesce(statement.excluded[field], aadhaar_forms.c[field])
+                   for field in RECORD_FIELDS if field != 'aadhaar_number'},
+                "updated_at": func.now()
+            }
+        )
+        if self.dialect == "postgresql":
+            return statement.returning(aadhaar_forms, literal_column("xmax = 0").label("inserted"))
+        return statement.returning(aadhaar_forms)
+
+    async def _bulk_upsert(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        numbers = [record['aadhaar_number'] for record in records]
+        saved: Dict[str, Dict[str, Any]] = {}
+        inserted = set()
+        errors: Dict[str, str] = {}
+
+        statement = self._bulk_upsert_statement()
+
+        async with self.engine.begin() as conn:
+            if self.dialect == "sqlite":
+                # Writes are serialized, so rows missing now are the ones this upsert inserts
+                existing = set()
+                for start in range(0, len(numbers), UPSERT_CHUNK_SIZE):
+                    existing.update(await conn.scalars(
+                        select(aadhaar_forms.c.aadhaar_number)
+                        .where(aadhaar_forms.c.aadhaar_number.in_(numbers[start:start + UPSERT_CHUNK_SIZE]))
+                    ))
+                inserted = set(numbers) - existing
+
+            for start in range(0, len(records), UPSERT_CHUNK_SIZE):
+                chunk = [{field: record.get(field) for field in RECORD_FIELDS}
+                         for record in records[start:start + UPSERT_CHUNK_SIZE]]
+                try:
+                    async with conn.begin_nested():
+                        rows = (await conn.execute(statement, chunk)).all()
+                except DBAPIError:
+                    # Redo row by row so one bad record does not fail the others
+                    rows = []
+                    for record in chunk:
+                        try:
+                            async with conn.begin_nested():
+                                rows.extend((await conn.execute(statement, record)).all())
+                        except DBAPIError as e:
+                            errors[record['aadhaar_number']] = str(e.orig)
+
+                for row in rows:
+                    record = dict(row._mapping)
+                    if record.pop("inserted", False):
+                        inserted.add(record['aadhaar_number'])
+                    saved[record['aadhaar_number']] = record
+
+        outcomes = []
+        for number in numbers:
+            if number in errors:
+                outcomes.append({"aadhaar_number": number, "status": "failed", "error": errors[number]})
+            else:
+                outcomes.append({"aadhaar_number": number, "status": "created" if number in inserted else "updated",
+                                 "record": saved[number]})
+        return outcomes
+
+    async def bulk_upsert_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert or update many records in one transaction, one statement per chunk;
+        returns an outcome per record: created, updated or failed"""
+        if not records:
+            return []
+
+        try:
+            if self._write_lock is None:
+                outcomes = await self._bulk_upsert(records)
+            else:
+                async with self._write_lock:
+                    outcomes = await self._bulk_upsert(records)
+
+            failed = sum(1 for outcome in outcomes if outcome["status"] == "failed")
+            logger.info(f"Upserted {len(records) - failed} of {len(records)} SQL records")
+            return outcomes
+
+        except Exception as e:
+            logger.error(f"Error bulk upserting records: {e}")
+            raise
+
+    async def list_records(self, limit: int = 10, after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """List records newest first, starting after the (created_at, id) of the previous page's last row"""
+        try:
+            statement = select(aadhaar_forms)
+            if after is not None:
+                created_at = datetime.fromisoformat(after[0])
+                if self.dialect == "sqlite":
+                    # Compare with the stored CURRENT_TIMESTAMP text, not SQLAlchemy's microsecond format
+                    created_at = literal(str(created_at), String)
+                statement = statement.where(
+                    tuple_(aadhaar_forms.c.created_at, aadhaar_forms.c.id) < tuple_(created_at, after[1])
+                )
+            return await self._read(
+                statement
+                .order_by(aadhaar_forms.c.created_at.desc(), aadhaar_forms.c.id.desc())
+                .limit(limit)
+            )
+
+        except Exception as e:
+            logger.error(f"Error listing records: {e}")
+            raise
+
+    async def export_batch(self, limit: int, after: Optional[Tuple[Any, int]] = None,
+                           since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Next batch of an export, oldest first, after the (created_at, id) of the previous batch"""
+        try:
+            def timestamp(value: datetime):
+                # Compare with the stored CURRENT_TIMESTAMP text, not SQLAlchemy's microsecond format
+                return literal(sqlite_timestamp(value), String) if self.dialect == "sqlite" else value
+
+            statement = select(aadhaar_forms)
+            if after is not None:
+                statement = statement.where(
+                    tuple_(aadhaar_forms.c.created_at, aadhaar_forms.c.id) > tuple_(timestamp(after[0]), after[1])
+                )
+            if since is not None:
+                statement = statement.where(aadhaar_forms.c.created_at >= timestamp(since))
+            if until is not None:
+                statement = statement.where(aadhaar_forms.c.created_at < timestamp(until))
+            return await self._read(
+                statement
+                .order_by(aadhaar_forms.c.created_at, aadhaar_forms.c.id)
+                .limit(limit)
+            )
+
+        except Exception as e:
+            logger.error(f"Error exporting records: {e}")
+            raise
+
+    async def search_records(self, terms: List[str], limit: int = 10,
+                             after: Optional[Tuple[float, int]] = None) -> List[Dict[str, Any]]:
+        """Records matching every search term, best match first, with their score"""
+        try:
+            after_score, after_id = after if after is not None else (None, None)
+            if self.dialect == "postgresql":
+                rows = await self._read(
+                    text("SELECT record, score FROM search_aadhaar_forms("
+                         ":query, :max_rows, :after_score, :after_id, :max_candidates)")
+                    .bindparams(query=tsquery(terms), max_rows=limit, after_score=after_score, after_id=after_id,
+                                max_candidates=settings.search_max_candidates)
+                )
+                return [
+                    {**(json.loads(row["record"]) if isinstance(row["record"], str) else row["record"]),
+                     "score": row["score"]}
+                    for row in rows
+                ]
+
+            params = {"match": fts5_match(terms), "candidates": settings.search_max_candidates, "limit": limit}
+            if after is not None:
+                params.update(after_score=after_score, after_id=after_id)
+            return await self._read(text(sqlite_search_query(after is not None)).bindparams(**params))
+
+        except Exception as e:
+            logger.error(f"Error searching records: {e}")
+            raise
+
+    async def count_records(self) -> int:
+        """Count every record; large Postgres tables use the planner's estimate"""
+        try:
+            if self.dialect == "postgresql":
+                estimate = (await self._read(
+                    text("SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = 'aadhaar_forms'::regclass")
+                ))[0]["estimate"]
+                # -1 until the table was first analyzed
+                if estimate >= ESTIMATED_COUNT_THRESHOLD:
+                    return estimate
+
+            return (await self._read(select(func.count().label("total")).select_from(aadhaar_forms)))[0]["total"]
+
+        except Exception as e:
+            logger.error(f"Error counting records: {e}")
+            raise
+
+    async def delete_record(self, aadhaar_number: str) -> bool:
+        """Delete a record by Aadhaar number"""
+        try:
+            rows = await self._write(
+                delete(aadhaar_forms)
+                .where(aadhaar_forms.c.aadhaar_number == aadhaar_number)
+                .returning(aadhaar_forms.c.id)
+            )
+            return len(rows) > 0
+
+        except Exception as e:
+            logger.error(f"Error deleting record: {e}")
+            raise
@@ -0,0 +1,65 @@
+"""
+Async Supabase REST client
+A PostgREST client whose httpx session keeps connections alive (HTTP/2 when the
+'h2' package is installed), created once per worker process and awaited from the
+async CRUD methods instead of blocking the event loop like supabase-py's Client
+"""
+
+import logging
+from typing import Dict, Union
+
+import httpx
+from postgrest import AsyncPostgrestClient
+
+from app.core.config import settings
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class SupabaseRestClient(AsyncPostgrestClient):
+    def __init__(self, supabase_url: str, supabase_key: str):
+        super().__init__(
+            f"{supabase_url.rstrip('/')}/rest/v1",
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "apikey": supabase_key,
+                "Authorization": f"Bearer {supabase_key}",
+            },
+            timeout=httpx.Timeout(
+                settings.supabase_timeout_seconds,
+                connect=settings.supabase_connect_timeout_seconds
+            )
+        )
+
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+    ) -> httpx.AsyncClient:
+        """One pooled keep-alive session shared by every request of this worker"""
+        http2 = settings.supabase_http2 and HTTP2_AVAILABLE
+        if settings.supabase_http2 and not HTTP2_AVAILABLE:
+            logger.warning("SUPABASE_HTTP2 is enabled but the 'h2' package is not installed, using HTTP/1.1")
+
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.supabase_max_connections,
+                max_keepalive_connections=settings.supabase_max_keepalive_connections,
+                keepalive_expiry=settings.supabase_keepalive_expiry_seconds
+            )
+        )
+
+    async def ping(self, table_name: str = "aadhaar_forms"):
+        """Cheap request that fails when the project or table is unreachable"""
+        await self.from_(table_name).select("id").limit(1).execute()
@@ -0,0 +1,141 @@
+"""
+Spooled document uploads
+Uploads are written to a temporary file chunk by chunk with a size cap, and
+hashed on the way, so a document is never held in memory as a whole. Small
+uploads stay in memory until they are finished; once an upload rolls over to
+its file, chunks are written from a thread instead of the event loop.
+"""
+
+import os
+import asyncio
+import hashlib
+import tempfile
+import logging
+from typing import AsyncIterator, BinaryIO, Callable, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes handed to the head inspector before the rest of the upload is read
+HEAD_BYTES = 64 * 1024
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"File too large. Maximum size is {max_bytes / (1024 * 1024):.1f} MB")
+
+class SpooledUpload:
+    """An upload spooled to a temporary file, with its size and SHA-256 digest"""
+
+    def __init__(self, max_bytes: int = 0, memory_bytes: Optional[int] = None):
+        fd, self.path = tempfile.mkstemp(prefix="aadhaar-upload-", dir=settings.upload_spool_dir or None)
+        self._file = os.fdopen(fd, "wb")
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self.max_bytes = max_bytes
+        self.memory_bytes = settings.upload_spool_memory_bytes if memory_bytes is None else memory_bytes
+        self.size = 0
+        self.sha256: Optional[str] = None
+
+    def rolls_over(self, chunk: bytes) -> bool:
+        """Whether writing this chunk goes to the file rather than the memory buffer"""
+        return self.size + len(chunk) > self.memory_bytes
+
+    def write(self, chunk: bytes):
+        """Append a chunk (blocking file I/O once the upload has rolled over, see rolls_over)"""
+        rolls_over = self.rolls_over(chunk)
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise UploadTooLargeError(self.max_bytes)
+        self._digest.update(chunk)
+        if not rolls_over:
+            self._buffer += chunk
+            return
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        self._file.write(chunk)
+
+    def finish(self):
+        """Flush the file once the whole upload has been written"""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        self._file.close()
+        self.sha256 = self._digest.hexdigest()
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self):
+        """Delete the spooled file"""
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+def read_bounded(stream: BinaryIO, max_bytes: Optional[int] = None) -> bytes:
+    """Read a file object chunk by chunk, stopping as soon as it exceeds the size cap"""
+    max_bytes = settings.upload_max_bytes if max_bytes is None else max_bytes
+    content = bytearray()
+    while True:
+        chunk = stream.read(settings.upload_chunk_size)
+        if not chunk:
+            break
+        content += chunk
+        if max_bytes and len(content) > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+    return bytes(content)
+
+async def spool_stream(chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None,
+                       inspect_head: Optional[Callable[[bytes], None]] = None) -> SpooledUpload:
+    """Write an async stream of chunks to a temporary file, enforcing the size cap
+
+    `inspect_head` is called with the first HEAD_BYTES bytes as soon as they have
+    arrived; an exception it raises aborts the upload before the rest is read.
+    """
+    max_bytes = settings.upload_max_bytes if max_bytes is None else max_bytes
+    upload = SpooledUpload(max_bytes)
+    head = b""
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if inspect_head is not None and len(head) < HEAD_BYTES:
+                head += chunk[:HEAD_BYTES - len(head)]
+                if len(head) >= HEAD_BYTES:
+                    inspect_head(head)
+            if upload.rolls_over(chunk):
+                await asyncio.to_thread(upload.write, chunk)
+            else:
+                upload.write(chunk)
+        if inspect_head is not None and 0 < len(head) < HEAD_BYTES:
+            inspect_head(head)
+        await asyncio.to_thread(upload.finish)
+    except BaseException:
+        upload.close()
+        raise
+    logger.debug(f"Spooled {upload.size} bytes to {upload.path}")
+    return upload
+
+async def _iter_upload_file(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(settings.upload_chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+async def spool_upload(file: UploadFile, max_bytes: Optional[int] = None,
+                       inspect_head: Optional[Callable[[bytes], None]] = None) -> SpooledUpload:
+    """Spool a multipart upload, rejecting it early when its size is already known"""
+    max_bytes = settings.upload_max_bytes if max_bytes is None else max_bytes
+    if max_bytes and file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+    return await spool_stream(_iter_upload_file(file), max_bytes, inspect_head)
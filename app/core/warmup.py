@@ -0,0 +1,138 @@
+"""
+OCR stack warm-up
+Imports and initializes PyMuPDF, Pillow, NumPy and the Tesseract models once per
+process, so the first request does not pay for it. In preload mode this runs in
+the parent process before the API workers are forked and share it copy-on-write.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.ocr_pool import run_ocr_task
+
+logger = logging.getLogger(__name__)
+
+_state: Dict[str, Any] = {
+    "ready": False,
+    "preloaded": False,
+    "duration_seconds": None,
+    "rss_before_mb": None,
+    "rss_after_mb": None,
+    "worker_rss_mb": None,
+    "ocr_workers_warmed": 0,
+    "error": None,
+}
+
+def process_memory_mb(pid: str = "self") -> Dict[str, Optional[float]]:
+    """RSS and PSS of a process in MB (PSS splits shared pages between the processes using them)"""
+    memory: Dict[str, Optional[float]] = {"rss": None, "pss": None}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss"] = int(line.split()[1]) / 1024
+                    break
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    memory["pss"] = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        if pid == "self" and memory["rss"] is None:
+            import resource
+            # Peak rather than current RSS where /proc is not available (kB on Linux)
+            memory["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return memory
+
+def _warm_tesseract():
+    """Load the configured language models (tesserocr keeps this thread's handles)"""
+    from PIL import Image
+    from app.ocr_engine import ocr_image
+    from app.script_router import SINGLE_LINE_PSM
+
+    image = Image.new("L", (64, 32), 255)
+    languages = [settings.ocr_primary_language]
+    indic = settings.get_ocr_indic_languages()
+    if indic:
+        languages.append(f"{'+'.join(indic)}+{settings.ocr_primary_language}")
+
+    for lang in languages:
+        for psm in (6, SINGLE_LINE_PSM):
+            try:
+                ocr_image(image, lang=lang, psm=psm)
+            except Exception as e:
+                logger.warning(f"Tesseract warm-up failed for {lang}: {e}")
+                return
+
+def warm_ocr_stack() -> int:
+    """Import and initialize the OCR stack in the current process; returns the pid"""
+    import numpy as np
+    import fitz
+    from PIL import Image
+
+    # Register every Pillow plugin now instead of on the first upload
+    Image.init()
+
+    # MuPDF context, base fonts and the rasterizer
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=100)
+    page.insert_text((10, 50), "warm up")
+    page.get_text("text")
+    page.get_pixmap(dpi=36, colorspace=fitz.csGRAY)
+    doc.close()
+
+    np.cumsum(np.zeros((8, 8), dtype=np.uint32), axis=0)
+
+    import app.ocr_parser  # noqa: F401  (whole import chain of the OCR pipeline)
+    _warm_tesseract()
+    return os.getpid()
+
+def preload_ocr_stack():
+    """Warm the OCR stack in a parent process before workers are forked"""
+    start = time.perf_counter()
+    _state["rss_before_mb"] = process_memory_mb()["rss"]
+    warm_ocr_stack()
+    _state["rss_after_mb"] = process_memory_mb()["rss"]
+    _state["duration_seconds"] = round(time.perf_counter() - start, 3)
+    _state["preloaded"] = True
+    logger.info(f"Preloaded OCR stack in {_state['duration_seconds']}s "
+                f"(RSS {_state['rss_before_mb']:.0f} -> {_state['rss_after_mb']:.0f} MB)")
+
+async def warm_up_application():
+    """Warm this API process (unless a preload parent did) and every OCR pool worker"""
+    start = time.perf_counter()
+    try:
+        if not _state["preloaded"]:
+            _state["rss_before_mb"] = process_memory_mb()["rss"]
+            await asyncio.to_thread(warm_ocr_stack)
+
+        # Submitted together so the pool starts all of its workers, each warming itself
+        if settings.ocr_execution_mode.lower() != "inline":
+            pids: List[int] = await asyncio.gather(
+                *(run_ocr_task(warm_ocr_stack) for _ in range(settings.get_ocr_pool_size()))
+            )
+            _state["ocr_workers_warmed"] = len(set(pids))
+
+        _state["worker_rss_mb"] = process_memory_mb()["rss"]
+        if not _state["preloaded"]:
+            _state["rss_after_mb"] = _state["worker_rss_mb"]
+            _state["duration_seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"OCR warm-up completed in {time.perf_counter() - start:.2f}s "
+                    f"({_state['ocr_workers_warmed']} OCR worker(s))")
+    except Exception as e:
+        _state["error"] = str(e)
+        logger.error(f"OCR warm-up failed, continuing cold: {e}")
+    finally:
+        _state["ready"] = True
+
+def mark_ready():
+    """Report ready without warming up (warm-up disabled)"""
+    _state["ready"] = True
+
+def get_warmup_state() -> Dict[str, Any]:
+    """Current warm-up status for the readiness endpoint"""
+    return dict(_state, pid=os.getpid())
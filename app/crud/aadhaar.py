@@ -1,16 +1,65 @@
-from typing import Optional, Dict, Any, Union
-from supabase import Client
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple, Union
+from postgrest.exceptions import APIError
 from app.schemas.aadhaar import AadhaarDataCreate, AadhaarDataUpdate
 from app.core.local_database import LocalDatabase
+from app.core.sql_database import SQLDatabase
+from app.core.supabase_client import SupabaseRestClient
+from app.core.record_cache import get_record_cache, MISSING
+from app.core.pagination import (
+    encode_cursor, decode_cursor, cursor_timestamp, encode_search_cursor, decode_search_cursor
+)
+from app.core.search import search_terms, tsquery
+from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Total record count per backend: (expires_at, count), refreshed at most every LIST_COUNT_TTL_SECONDS
+_total_counts: Dict[str, Tuple[float, int]] = {}
+
+def _cached_total_count(storage_key: str) -> Optional[int]:
+    entry = _total_counts.get(storage_key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def _store_total_count(storage_key: str, count: int) -> int:
+    _total_counts[storage_key] = (time.monotonic() + settings.list_count_ttl_seconds, count)
+    return count
+
+def _keyset_filter(after: Tuple[str, int], op: str) -> str:
+    """PostgREST or= filter for the rows past (created_at, id) in a keyset ordered by both; op is lt or gt
+
+    postgrest-py has no or_(), so the filter is written in PostgREST's syntax; created_at
+    must come from decode_cursor or cursor_timestamp, which only let a timestamp through.
+    """
+    created_at, record_id = after
+    return f'(created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}.{record_id}))'
+
 class HybridAadhaarCRUD:
-    def __init__(self, database_client: Union[Client, LocalDatabase]):
+    def __init__(self, database_client: Union[SupabaseRestClient, SQLDatabase, LocalDatabase]):
         self.db_client = database_client
         self.table_name = "aadhaar_forms"
-        self.is_supabase = isinstance(database_client, Client)
+        self.is_supabase = isinstance(database_client, SupabaseRestClient)
+        self.is_sql = isinstance(database_client, SQLDatabase)
+        self.storage_name = "SQL database" if self.is_sql else "local DB"
+        self.storage_key = "supabase" if self.is_supabase else "sql" if self.is_sql else "local"
+        self.cache = get_record_cache()
+
+    async def _storage_call(self, method: str, *args):
+        """Call a SQL or local database method without blocking the event loop"""
+        if self.is_sql:
+            return await getattr(self.db_client, method)(*args)
+        return await asyncio.to_thread(getattr(self.db_client, method), *args)
+
+    async def _remember(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Refresh the cached copy of a record that was just written"""
+        if self.cache is not None:
+            await self.cache.set(record["aadhaar_number"], record)
+        return record
     
     async def create_aadhaar_record(self, aadhaar_data: AadhaarDataCreate) -> Dict[str, Any]:
         """Create a new Aadhaar record"""
@@ -20,29 +69,141 @@ class HybridAadhaarCRUD:
 
             if self.is_supabase:
                 # Insert data into Supabase
-                result = self.db_client.table(self.table_name).insert(data_dict).execute()
+                result = await self.db_client.table(self.table_name).insert(data_dict).execute()
 
                 if result.data:
                     logger.info(f"Successfully created Aadhaar record in Supabase for: {aadhaar_data.aadhaar_number}")
-                    return result.data[0]
+                    return await self._remember(result.data[0])
                 else:
                     logger.error(f"Failed to create Aadhaar record: {result}")
                     raise Exception("Failed to insert data into Supabase")
             else:
                 # Insert data into local database
-                record = self.db_client.create_record(data_dict)
-                logger.info(f"Successfully created Aadhaar record in local DB for: {aadhaar_data.aadhaar_number}")
-                return record
+                record = await self._storage_call("create_record", data_dict)
+                logger.info(f"Successfully created Aadhaar record in {self.storage_name} for: {aadhaar_data.aadhaar_number}")
+                return await self._remember(record)
 
         except Exception as e:
             logger.error(f"Error creating Aadhaar record: {str(e)}")
             raise
     
+    async def upsert_aadhaar_record(self, aadhaar_data: AadhaarDataCreate) -> Tuple[Dict[str, Any], bool]:
+        """Create the record or update the existing one in a single round trip; returns (record, created)"""
+        try:
+            data_dict = aadhaar_data.model_dump(exclude_unset=True)
+
+            if self.is_supabase:
+                result = await self.db_client.table(self.table_name).upsert(data_dict, on_conflict="aadhaar_number").execute()
+
+                if not result.data:
+                    logger.error(f"Failed to upsert Aadhaar record: {result}")
+                    raise Exception("Failed to upsert data into Supabase")
+                record = result.data[0]
+                # Both timestamps default to the same NOW() on insert; the update trigger moves updated_at
+                created = record.get("created_at") == record.get("updated_at")
+            else:
+                record, created = await self._storage_call("upsert_record", data_dict)
+
+            action = "created" if created else "updated"
+            logger.info(f"Successfully {action} Aadhaar record in "
+                        f"{'Supabase' if self.is_supabase else self.storage_name} for: {aadhaar_data.aadhaar_number}")
+            return await self._remember(record), created
+
+        except Exception as e:
+            logger.error(f"Error upserting Aadhaar record: {str(e)}")
+            raise
+
+    async def _supabase_upsert_chunk(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One bulk_upsert_aadhaar_forms call; returns an outcome per record of the chunk"""
+        try:
+            result = await self.db_client.rpc("bulk_upsert_aadhaar_forms", {"records": chunk}).execute()
+        except Exception as e:
+            # A data or constraint violation (SQLSTATE class 22/23) is caused by one of the records
+            if len(chunk) > 1 and isinstance(e, APIError) and str(e.code or "")[:2] in ("22", "23"):
+                # Redo record by record so one bad record does not fail the others
+                return [outcome for data in chunk for outcome in await self._supabase_upsert_chunk([data])]
+            logger.error(f"Error upserting a chunk of {len(chunk)} Aadhaar records in Supabase: {str(e)}")
+            return [{"aadhaar_number": data["aadhaar_number"], "status": "failed", "error": str(e)} for data in chunk]
+
+        saved = {row["record"]["aadhaar_number"]: row for row in result.data}
+        outcomes = []
+        for data in chunk:
+            row = saved.get(data["aadhaar_number"])
+            if row is None:
+                outcomes.append({"aadhaar_number": data["aadhaar_number"], "status": "failed",
+                                 "error": "Record missing from the upsert response"})
+            else:
+                outcomes.append({"aadhaar_number": data["aadhaar_number"],
+                                 "status": "created" if row["inserted"] else "updated", "record": row["record"]})
+        return outcomes
+
+    async def bulk_upsert(self, records: List[AadhaarDataCreate]) -> Dict[str, Any]:
+        """Create or update many Aadhaar records with batched writes; returns an outcome per
+        record (created, updated or failed) and the throughput"""
+        start = time.perf_counter()
+        try:
+            # Postgres rejects an upsert that touches the same row twice, keep the last one
+            unique = {record.aadhaar_number: record for record in records}
+            # Fields a record does not set keep their stored value on every backend
+            data = [record.model_dump(exclude_unset=True) for record in unique.values()]
+
+            if self.is_supabase:
+                chunk_size = settings.bulk_upsert_chunk_size
+                semaphore = asyncio.Semaphore(settings.bulk_upsert_concurrency)
+
+                async def send(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                    async with semaphore:
+                        return await self._supabase_upsert_chunk(chunk)
+
+                chunk_outcomes = await asyncio.gather(
+                    *(send(data[i:i + chunk_size]) for i in range(0, len(data), chunk_size))
+                )
+                outcomes = [outcome for chunk in chunk_outcomes for outcome in chunk]
+            else:
+                outcomes = await self._storage_call("bulk_upsert_records", data)
+
+            for outcome in outcomes:
+                if outcome["status"] != "failed":
+                    await self._remember(outcome["record"])
+
+            seconds = time.perf_counter() - start
+            counts = {status: sum(1 for outcome in outcomes if outcome["status"] == status)
+                      for status in ("created", "updated", "failed")}
+            rows_per_second = round(len(outcomes) / seconds, 1) if seconds > 0 else None
+            logger.info(f"Bulk upserted {len(outcomes)} Aadhaar records in "
+                        f"{'Supabase' if self.is_supabase else self.storage_name}: {counts['created']} created, "
+                        f"{counts['updated']} updated, {counts['failed']} failed ({rows_per_second} rows/s)")
+            return {
+                "results": outcomes,
+                **counts,
+                "seconds": round(seconds, 4),
+                "rows_per_second": rows_per_second
+            }
+
+        except Exception as e:
+            logger.error(f"Error bulk upserting Aadhaar records: {str(e)}")
+            raise
+    
     async def get_aadhaar_by_number(self, aadhaar_number: str) -> Optional[Dict[str, Any]]:
-        """Retrieve Aadhaar record by Aadhaar number"""
+        """Retrieve Aadhaar record by Aadhaar number, through the record cache"""
+        if self.cache is None:
+            return await self._fetch_aadhaar_by_number(aadhaar_number)
+
+        record = await self.cache.get(aadhaar_number)
+        if record is not MISSING:
+            return record
+
+        token = await self.cache.write_token(aadhaar_number)
+        record = await self._fetch_aadhaar_by_number(aadhaar_number)
+        # Misses are cached too, for a shorter time
+        await self.cache.set(aadhaar_number, record, token)
+        return record
+
+    async def _fetch_aadhaar_by_number(self, aadhaar_number: str) -> Optional[Dict[str, Any]]:
+        """Read an Aadhaar record from the database"""
         try:
             if self.is_supabase:
-                result = self.db_client.table(self.table_name).select("*").eq("aadhaar_number", aadhaar_number).execute()
+                result = await self.db_client.table(self.table_name).select("*").eq("aadhaar_number", aadhaar_number).execute()
 
                 if result.data:
                     logger.info(f"Successfully retrieved Aadhaar record from Supabase for: {aadhaar_number}")
@@ -51,11 +212,11 @@ class HybridAadhaarCRUD:
                     logger.info(f"No Aadhaar record found in Supabase for: {aadhaar_number}")
                     return None
             else:
-                record = self.db_client.get_by_aadhaar_number(aadhaar_number)
+                record = await self._storage_call("get_by_aadhaar_number", aadhaar_number)
                 if record:
-                    logger.info(f"Successfully retrieved Aadhaar record from local DB for: {aadhaar_number}")
+                    logger.info(f"Successfully retrieved Aadhaar record from {self.storage_name} for: {aadhaar_number}")
                 else:
-                    logger.info(f"No Aadhaar record found in local DB for: {aadhaar_number}")
+                    logger.info(f"No Aadhaar record found in {self.storage_name} for: {aadhaar_number}")
                 return record
 
         except Exception as e:
@@ -73,20 +234,21 @@ class HybridAadhaarCRUD:
                 return None
 
             if self.is_supabase:
-                result = self.db_client.table(self.table_name).update(update_data).eq("aadhaar_number", aadhaar_number).execute()
+                result = await self.db_client.table(self.table_name).update(update_data).eq("aadhaar_number", aadhaar_number).execute()
 
                 if result.data:
                     logger.info(f"Successfully updated Aadhaar record in Supabase for: {aadhaar_number}")
-                    return result.data[0]
+                    return await self._remember(result.data[0])
                 else:
                     logger.warning(f"No Aadhaar record found to update in Supabase for: {aadhaar_number}")
                     return None
             else:
-                record = self.db_client.update_record(aadhaar_number, update_data)
+                record = await self._storage_call("update_record", aadhaar_number, update_data)
                 if record:
-                    logger.info(f"Successfully updated Aadhaar record in local DB for: {aadhaar_number}")
+                    logger.info(f"Successfully updated Aadhaar record in {self.storage_name} for: {aadhaar_number}")
+                    await self._remember(record)
                 else:
-                    logger.warning(f"No Aadhaar record found to update in local DB for: {aadhaar_number}")
+                    logger.warning(f"No Aadhaar record found to update in {self.storage_name} for: {aadhaar_number}")
                 return record
 
         except Exception as e:
@@ -97,21 +259,20 @@ class HybridAadhaarCRUD:
         """Delete an Aadhaar record by Aadhaar number"""
         try:
             if self.is_supabase:
-                result = self.db_client.table(self.table_name).delete().eq("aadhaar_number", aadhaar_number).execute()
+                result = await self.db_client.table(self.table_name).delete().eq("aadhaar_number", aadhaar_number).execute()
+                deleted = bool(result.data)
+            else:
+                deleted = await self._storage_call("delete_record", aadhaar_number)
 
-                if result.data:
-                    logger.info(f"Successfully deleted Aadhaar record from Supabase for: {aadhaar_number}")
-                    return True
-                else:
-                    logger.warning(f"No Aadhaar record found to delete in Supabase for: {aadhaar_number}")
-                    return False
+            if self.cache is not None:
+                await self.cache.invalidate(aadhaar_number)
+
+            storage_name = "Supabase" if self.is_supabase else self.storage_name
+            if deleted:
+                logger.info(f"Successfully deleted Aadhaar record from {storage_name} for: {aadhaar_number}")
             else:
-                deleted = self.db_client.delete_record(aadhaar_number)
-                if deleted:
-                    logger.info(f"Successfully deleted Aadhaar record from local DB for: {aadhaar_number}")
-                else:
-                    logger.warning(f"No Aadhaar record found to delete in local DB for: {aadhaar_number}")
-                return deleted
+                logger.warning(f"No Aadhaar record found to delete in {storage_name} for: {aadhaar_number}")
+            return deleted
 
         except Exception as e:
             logger.error(f"Error deleting Aadhaar record: {str(e)}")
@@ -121,36 +282,106 @@ class HybridAadhaarCRUD:
         """Check if an Aadhaar record exists"""
         try:
             if self.is_supabase:
-                result = self.db_client.table(self.table_name).select("aadhaar_number").eq("aadhaar_number", aadhaar_number).execute()
+                result = await self.db_client.table(self.table_name).select("aadhaar_number").eq("aadhaar_number", aadhaar_number).execute()
                 return len(result.data) > 0
             else:
-                record = self.db_client.get_by_aadhaar_number(aadhaar_number)
+                record = await self._storage_call("get_by_aadhaar_number", aadhaar_number)
                 return record is not None
         except Exception as e:
             logger.error(f"Error checking Aadhaar existence: {str(e)}")
             raise
 
-    async def list_all_records(self, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
-        """List all Aadhaar records with pagination"""
+    async def list_all_records(self, limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List Aadhaar records newest first, one keyset page at a time"""
+        after = decode_cursor(cursor) if cursor else None
         try:
+            total_count = _cached_total_count(self.storage_key)
+
             if self.is_supabase:
-                result = self.db_client.table(self.table_name).select("*").range(offset, offset + limit - 1).execute()
-                return {
-                    "success": True,
-                    "data": result.data,
-                    "total_count": len(result.data)
-                }
+                query = self.db_client.table(self.table_name).select(
+                    "*", count="estimated" if total_count is None else None
+                )
+                # postgrest-py repeats order=, so use PostgREST's syntax directly
+                query.params = query.params.set("order", "created_at.desc,id.desc")
+                if after is not None:
+                    query.params = query.params.add("or", _keyset_filter(after, "lt"))
+                # One extra row tells whether there is a next page
+                result = await query.limit(limit + 1).execute()
+                records = result.data
+                if total_count is None and result.count is not None:
+                    total_count = _store_total_count(self.storage_key, result.count)
             else:
-                records = self.db_client.list_records(limit, offset)
-                return {
-                    "success": True,
-                    "data": records,
-                    "total_count": len(records)
-                }
+                records = await self._storage_call("list_records", limit + 1, after)
+                if total_count is None:
+                    total_count = _store_total_count(self.storage_key, await self._storage_call("count_records"))
+
+            has_more = len(records) > limit
+            records = records[:limit]
+            return {
+                "success": True,
+                "data": records,
+                "total_count": total_count,
+                "next_cursor": encode_cursor(records[-1]) if has_more else None
+            }
         except Exception as e:
             logger.error(f"Error listing Aadhaar records: {str(e)}")
             raise
 
+    async def search_records(self, q: str, limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Full-text search over name, name_tamil, guardian_name and address, best match first"""
+        terms = search_terms(q)
+        after = decode_search_cursor(cursor) if cursor else None
+        try:
+            if self.is_supabase:
+                params = {"query": tsquery(terms), "max_rows": limit + 1,
+                          "max_candidates": settings.search_max_candidates}
+                if after is not None:
+                    params["after_score"], params["after_id"] = after
+                result = await self.db_client.rpc("search_aadhaar_forms", params).execute()
+                records = [{**row["record"], "score": row["score"]} for row in result.data]
+            else:
+                # One extra row tells whether there is a next page
+                records = await self._storage_call("search_records", terms, limit + 1, after)
+
+            has_more = len(records) > limit
+            records = records[:limit]
+            return {
+                "success": True,
+                "data": records,
+                "next_cursor": encode_search_cursor(records[-1]) if has_more else None
+            }
+        except Exception as e:
+            logger.error(f"Error searching Aadhaar records: {str(e)}")
+            raise
+
+    async def iter_export_batches(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                  batch_size: int = 5000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Every record created in [since, until), oldest first, one keyset batch at a time"""
+        after = None
+        while True:
+            if self.is_supabase:
+                query = self.db_client.table(self.table_name).select("*")
+                # postgrest-py repeats order=, so use PostgREST's syntax directly
+                query.params = query.params.set("order", "created_at.asc,id.asc")
+                if after is not None:
+                    query.params = query.params.add("or", _keyset_filter(after, "gt"))
+                if since is not None:
+                    query = query.gte("created_at", since.isoformat())
+                if until is not None:
+                    query = query.lt("created_at", until.isoformat())
+                batch = (await query.limit(batch_size).execute()).data
+            else:
+                batch = await self._storage_call("export_batch", batch_size, after, since, until)
+
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            after = (batch[-1]["created_at"], batch[-1]["id"])
+            if self.is_supabase:
+                # Stored text goes into a PostgREST filter too, so it is validated like a cursor
+                after = (cursor_timestamp(after[0]), int(after[1]))
+
 def get_aadhaar_crud(database_client) -> HybridAadhaarCRUD:
     """Factory function to create HybridAadhaarCRUD instance"""
     return HybridAadhaarCRUD(database_client)
@@ -0,0 +1,125 @@
+"""
+Upload validation from the first bytes of a document
+Sniffs the real file type from its magic bytes, rejects images whose header
+dimensions exceed the pixel limit (decompression bombs) and PDFs with too many
+pages, before any decoding or OCR work is done
+"""
+
+import io
+import logging
+import warnings
+from typing import Optional, Tuple, Union
+
+import fitz
+from PIL import Image
+
+from app.core.config import settings
+from app.core.uploads import HEAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+# PDF readers accept the header anywhere in the first kilobyte
+PDF_HEADER_WINDOW = 1024
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"BM", "bmp"),
+)
+
+def sniff_file_type(head: bytes) -> Optional[str]:
+    """Detect the document type from its leading bytes: pdf, jpeg, png, tiff, bmp or None"""
+    if b"%PDF-" in head[:PDF_HEADER_WINDOW]:
+        return "pdf"
+    for signature, file_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return file_type
+    return None
+
+def check_image_pixels(width: int, height: int):
+    """Reject images above the configured pixel limit"""
+    if settings.upload_max_image_pixels and width * height > settings.upload_max_image_pixels:
+        raise ValueError(f"Image too large: {width}x{height} pixels "
+                         f"(maximum {settings.upload_max_image_pixels} pixels)")
+
+def read_image_size(source: Union[bytes, str]) -> Optional[Tuple[int, int]]:
+    """Image dimensions from the header only; None when the header is incomplete"""
+    try:
+        with warnings.catch_warnings():
+            # The configured pixel limit is applied below instead of Pillow's warning
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+                return image.size
+    except Image.DecompressionBombError:
+        raise ValueError("Image too large: possible decompression bomb")
+    except Exception:
+        return None
+
+def inspect_document_head(head: bytes, filename: str) -> str:
+    """Validate an upload from its first bytes, returning the sniffed file type"""
+    file_type = sniff_file_type(head)
+    if file_type is None:
+        raise ValueError("File content is not a supported PDF or image")
+
+    is_pdf_name = filename.lower().endswith(".pdf")
+    if (file_type == "pdf") != is_pdf_name:
+        raise ValueError(f"File content ({file_type}) does not match the file extension")
+
+    if file_type != "pdf":
+        size = read_image_size(head)
+        if size is not None:
+            check_image_pixels(*size)
+    return file_type
+
+def count_pdf_pages(source: Union[bytes, str]) -> Optional[int]:
+    """Page count from the PDF page tree, without loading any page; None for encrypted files"""
+    if isinstance(source, bytes):
+        doc = fitz.open(stream=source, filetype="pdf")
+    else:
+        doc = fitz.open(source, filetype="pdf")
+    try:
+        if doc.needs_pass:
+            return None
+        return doc.page_count
+    finally:
+        doc.close()
+
+def count_tiff_frames(source: Union[bytes, str]) -> int:
+    """Frame count from the chain of TIFF directories, without decoding any frame"""
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+        return getattr(image, "n_frames", 1)
+
+def validate_document(source: Union[bytes, str], filename: str):
+    """Full validation of a complete upload (bytes or a spooled file)
+
+    Checks that need more than the first bytes run here: the page count of a PDF
+    (its xref is at the end of the file), the frame count of a TIFF and image
+    headers that did not fit the head.
+    """
+    if isinstance(source, bytes):
+        head = source[:HEAD_BYTES]
+    else:
+        with open(source, "rb") as f:
+            head = f.read(HEAD_BYTES)
+
+    file_type = inspect_document_head(head, filename)
+
+    if file_type == "pdf":
+        try:
+            pages = count_pdf_pages(source)
+        except Exception as e:
+            raise ValueError(f"Invalid PDF file: {e}")
+        if pages is not None and settings.upload_max_pdf_pages and pages > settings.upload_max_pdf_pages:
+            raise ValueError(f"PDF has too many pages: {pages} (maximum {settings.upload_max_pdf_pages})")
+    else:
+        if read_image_size(head) is None:
+            size = read_image_size(source)
+            if size is None:
+                raise ValueError("Invalid or unreadable image file")
+            check_image_pixels(*size)
+        if file_type == "tiff":
+            frames = count_tiff_frames(source)
+            if settings.upload_max_pdf_pages and frames > settings.upload_max_pdf_pages:
+                raise ValueError(f"TIFF has too many pages: {frames} (maximum {settings.upload_max_pdf_pages})")
@@ -0,0 +1,132 @@
+"""
+Worker for asynchronous OCR jobs
+Runs inside the API process (JOB_WORKERS > 0) or standalone with
+`python run.py worker`, so OCR capacity can be scaled apart from the API nodes
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import db_client, get_database
+from app.core.job_queue import get_job_queue
+from app.core.ocr_pool import start_ocr_pool, shutdown_ocr_pool
+from app.routers.form import process_and_store
+
+logger = logging.getLogger(__name__)
+
+HOUSEKEEPING_INTERVAL = 60.0
+
+_worker_tasks: List[asyncio.Task] = []
+
+async def keep_lease(job: Dict[str, Any]):
+    """Renew the lease of a running job, so no other worker picks it up while OCR runs"""
+    queue = get_job_queue()
+    interval = max(1.0, settings.job_lease_seconds / 3)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if not await queue.renew(job["id"], job["lease"]):
+                logger.warning(f"Job {job['id']} was taken over by another worker")
+                return
+        except Exception as e:
+            # The lease is only lost if renewals keep failing until it expires
+            logger.error(f"Failed to renew the lease of job {job['id']}: {str(e)}")
+
+def job_password(job: Dict[str, Any]) -> Optional[str]:
+    """PDF password of a claimed job; it was removed from the queue when the job was first claimed"""
+    if job["secret"] is not None:
+        return get_job_queue().open_password(job["secret"])
+    if job["options"].get("has_password"):
+        raise ValueError("The document password was discarded when an earlier attempt of this job "
+                         "was interrupted; submit the document again")
+    return None
+
+async def run_job(job: Dict[str, Any]):
+    """Process one claimed job and record its outcome"""
+    queue = get_job_queue()
+    heartbeat = asyncio.create_task(keep_lease(job))
+    try:
+        response = await process_and_store(
+            job["content"], job["filename"], job_password(job), job["options"].get("fields"), get_database()
+        )
+        outcome, recorded = "completed", await queue.complete(job["id"], job["lease"], response.model_dump())
+    except ValueError as e:
+        outcome, recorded = f"failed: {str(e)}", await queue.fail(job["id"], job["lease"], str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in job {job['id']}: {str(e)}")
+        outcome, recorded = "failed", await queue.fail(job["id"], job["lease"], "Internal error while processing the file")
+    finally:
+        heartbeat.cancel()
+
+    if recorded:
+        logger.info(f"Job {job['id']} {outcome} for {job['filename']}")
+    else:
+        logger.warning(f"Job {job['id']} {outcome}, not recorded: its lease has passed to another worker")
+
+async def worker_loop(worker_id: int):
+    """Claim and process jobs until cancelled"""
+    queue = get_job_queue()
+    last_housekeeping = 0.0
+    logger.info(f"Job worker {worker_id} started")
+
+    while True:
+        try:
+            job = await queue.claim()
+            if job is not None:
+                await run_job(job)
+            elif time.monotonic() - last_housekeeping > HOUSEKEEPING_INTERVAL:
+                last_housekeeping = time.monotonic()
+                cleaned = await queue.housekeeping()
+                if cleaned:
+                    logger.info(f"Job queue housekeeping handled {cleaned} job(s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep the worker alive when the queue backend is briefly unavailable
+            logger.error(f"Job worker {worker_id} error: {str(e)}")
+            await asyncio.sleep(settings.job_poll_interval)
+
+def start_job_workers(count: int = None) -> List[asyncio.Task]:
+    """Start the job workers on the running event loop"""
+    count = settings.job_workers if count is None else count
+    for worker_id in range(len(_worker_tasks), count):
+        _worker_tasks.append(asyncio.create_task(worker_loop(worker_id)))
+    return _worker_tasks
+
+async def stop_job_workers():
+    """Cancel the job workers; interrupted jobs are picked up again after their lease expires"""
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
+
+async def run_worker(count: int):
+    await db_client.startup()
+    start_ocr_pool()
+    try:
+        await asyncio.gather(*start_job_workers(count))
+    finally:
+        await stop_job_workers()
+        shutdown_ocr_pool()
+        await db_client.shutdown()
+
+def main():
+    """Run job workers without the API"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    count = max(1, settings.job_workers)
+    logger.info(f"Starting {count} job worker(s) on the {settings.job_queue_backend} queue")
+    try:
+        asyncio.run(run_worker(count))
+    except KeyboardInterrupt:
+        logger.info("Job workers stopped")
+
+if __name__ == "__main__":
+    main()
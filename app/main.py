@@ -2,13 +2,20 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
+import asyncio
 import logging
 import sys
 from pathlib import Path
 
 from app.core.config import settings
-from app.routers import form
+from app.core.ocr_pool import start_ocr_pool, shutdown_ocr_pool
+from app.core.database import db_client
+from app.core.ocr_cache import get_ocr_cache
+from app.core.record_cache import get_record_cache
+from app.core.warmup import warm_up_application, mark_ready, get_warmup_state
+from app.job_worker import start_job_workers, stop_job_workers
+from app.routers import form, jobs
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +55,7 @@ templates = Jinja2Templates(directory="templates")
 
 # Include routers
 app.include_router(form.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
@@ -63,6 +71,15 @@ async def health_check():
         "version": settings.app_version
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until the OCR stack has been warmed up"""
+    state = get_warmup_state()
+    return JSONResponse(
+        status_code=200 if state["ready"] else 503,
+        content={"status": "ready" if state["ready"] else "warming_up", "warmup": state}
+    )
+
 @app.get("/info")
 async def app_info():
     """Application information endpoint"""
@@ -72,13 +89,27 @@ async def app_info():
         "debug": settings.debug,
         "endpoints": {
             "submit_form": "/api/form/submit",
+            "submit_raw": "/api/form/submit-raw",
+            "submit_batch": "/api/form/submit-batch",
+            "job_status": "/api/jobs/{job_id}",
             "get_aadhaar": "/api/form/{aadhaar_number}",
             "list_records": "/api/form/",
             "docs": "/docs",
-            "health": "/health"
+            "health": "/health",
+            "ready": "/ready",
+            "stats": "/stats"
         }
     }
 
+@app.get("/stats")
+async def app_stats():
+    """Cache statistics endpoint"""
+    record_cache = get_record_cache()
+    return {
+        "ocr_cache": get_ocr_cache().stats(),
+        "record_cache": record_cache.stats() if record_cache is not None else None
+    }
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
     """Custom 404 handler"""
@@ -104,12 +135,26 @@ async def startup_event():
     """Application startup event"""
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"Debug mode: {settings.debug}")
+    await db_client.startup()
+    start_ocr_pool()
+    if settings.ocr_warmup:
+        # Warm up in the background; /ready reports when it is done
+        app.state.warmup_task = asyncio.create_task(warm_up_application())
+    else:
+        mark_ready()
+    if settings.job_workers > 0:
+        start_job_workers()
     logger.info("Application startup completed")
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event"""
+    await stop_job_workers()
+    shutdown_ocr_pool()
+    await db_client.shutdown()
+    if get_record_cache() is not None:
+        await get_record_cache().close()
     logger.info("Application shutdown completed")
 
 if __name__ == "__main__":
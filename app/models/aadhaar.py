@@ -1,11 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Index, Integer, String, DateTime, Text
+from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
 class AadhaarForm(Base):
     __tablename__ = "aadhaar_forms"
+    # Keyset pagination of the record list
+    __table_args__ = (Index("idx_aadhaar_forms_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     vid = Column(String(20), nullable=True, index=True)
@@ -24,7 +26,7 @@ class AadhaarForm(Base):
     pincode = Column(String(10), nullable=True)
     phone = Column(String(15), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
         return f"<AadhaarForm(aadhaar_number='{self.aadhaar_number}', name='{self.name}')>"
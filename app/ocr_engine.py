@@ -0,0 +1,160 @@
+"""
+Tesseract OCR backends
+Keeps initialized Tesseract API handles alive per worker thread and reuses them,
+falling back to the pytesseract subprocess wrapper when tesserocr is unavailable
+"""
+
+import threading
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from PIL import Image
+import pytesseract
+
+from app.core.config import settings
+
+try:
+    from tesserocr import PyTessBaseAPI, OEM, PSM, RIL, iterate_level
+except ImportError:  # tesserocr is optional
+    PyTessBaseAPI = None
+    OEM = PSM = RIL = iterate_level = None
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+class OCRLine(NamedTuple):
+    text: str
+    confidence: float
+    bbox: Tuple[int, int, int, int]  # left, top, right, bottom
+
+def tesserocr_available() -> bool:
+    """Check whether the in-process Tesseract backend can be used"""
+    return PyTessBaseAPI is not None
+
+def get_active_backend() -> str:
+    """Resolve the configured OCR backend, honouring the fallback"""
+    backend = settings.ocr_backend.lower()
+    if backend == "tesserocr" and not tesserocr_available():
+        return "pytesseract"
+    return backend
+
+def _get_api(lang: str, psm: int):
+    """Get (or lazily create) this thread's Tesseract handle for lang/psm"""
+    handles: Optional[Dict[Tuple[str, int], object]] = getattr(_local, "handles", None)
+    if handles is None:
+        handles = _local.handles = {}
+
+    api = handles.get((lang, psm))
+    if api is None:
+        api = PyTessBaseAPI(lang=lang, psm=psm, oem=OEM.DEFAULT)
+        handles[(lang, psm)] = api
+        logger.info(f"Initialized Tesseract API handle (lang={lang}, psm={psm})")
+    return api
+
+def _ocr_tesserocr(image: Image.Image, lang: str, psm: int, whitelist: Optional[str]) -> str:
+    """OCR an in-memory image using a persistent Tesseract handle"""
+    api = _get_api(lang, psm)
+    api.SetVariable("tessedit_char_whitelist", whitelist or "")
+    try:
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    finally:
+        api.Clear()
+
+def _ocr_pytesseract(image: Image.Image, lang: str, psm: int, whitelist: Optional[str]) -> str:
+    """OCR an image by spawning the tesseract binary through pytesseract"""
+    config = f'--oem 3 --psm {psm}'
+    if whitelist:
+        config += f' -c tessedit_char_whitelist={whitelist}'
+    return pytesseract.image_to_string(image, config=config, lang=lang)
+
+def ocr_image(image: Image.Image, lang: str = "eng+tam", psm: int = 6,
+              whitelist: Optional[str] = None, backend: Optional[str] = None) -> str:
+    """Run OCR on a PIL image with the configured backend"""
+    backend = (backend or get_active_backend()).lower()
+
+    if backend == "tesserocr":
+        return _ocr_tesserocr(image, lang, psm, whitelist)
+    if backend == "pytesseract":
+        return _ocr_pytesseract(image, lang, psm, whitelist)
+    raise ValueError(f"Unknown OCR backend: {backend}")
+
+def _lines_tesserocr(image: Image.Image, lang: str, psm: int) -> List[OCRLine]:
+    api = _get_api(lang, psm)
+    api.SetVariable("tessedit_char_whitelist", "")
+    try:
+        api.SetImage(image)
+        api.Recognize()
+        iterator = api.GetIterator()
+        lines = []
+        if iterator is None:
+            return lines
+        for line in iterate_level(iterator, RIL.TEXTLINE):
+            text = line.GetUTF8Text(RIL.TEXTLINE) or ""
+            if text.strip():
+                lines.append(OCRLine(text.strip(), line.Confidence(RIL.TEXTLINE), line.BoundingBox(RIL.TEXTLINE)))
+        return lines
+    finally:
+        api.Clear()
+
+def _lines_pytesseract(image: Image.Image, lang: str, psm: int) -> List[OCRLine]:
+    data = pytesseract.image_to_data(
+        image, lang=lang, config=f'--oem 3 --psm {psm}', output_type=pytesseract.Output.DICT
+    )
+    grouped: Dict[Tuple[int, int, int], list] = {}
+    for i, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        grouped.setdefault(key, []).append(i)
+
+    lines = []
+    for indexes in grouped.values():
+        confs = [float(data["conf"][i]) for i in indexes if float(data["conf"][i]) >= 0]
+        lines.append(OCRLine(
+            " ".join(data["text"][i] for i in indexes),
+            sum(confs) / len(confs) if confs else 0.0,
+            (
+                min(data["left"][i] for i in indexes),
+                min(data["top"][i] for i in indexes),
+                max(data["left"][i] + data["width"][i] for i in indexes),
+                max(data["top"][i] + data["height"][i] for i in indexes),
+            )
+        ))
+    return lines
+
+def ocr_image_lines(image: Image.Image, lang: str = "eng", psm: int = 6,
+                    backend: Optional[str] = None) -> List[OCRLine]:
+    """Run OCR and return each recognized text line with its confidence and bounding box"""
+    backend = (backend or get_active_backend()).lower()
+
+    if backend == "tesserocr":
+        return _lines_tesserocr(image, lang, psm)
+    if backend == "pytesseract":
+        return _lines_pytesseract(image, lang, psm)
+    raise ValueError(f"Unknown OCR backend: {backend}")
+
+def detect_script(image: Image.Image) -> Optional[str]:
+    """Detect the dominant script of an image with Tesseract OSD; None if undetermined"""
+    try:
+        if get_active_backend() == "tesserocr":
+            api = _get_api("osd", PSM.OSD_ONLY)
+            try:
+                api.SetImage(image)
+                result = api.DetectOrientationScript()
+            finally:
+                api.Clear()
+            return result["script_name"] if result else None
+
+        result = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        return result.get("script")
+    except Exception as e:
+        logger.debug(f"Script detection failed: {e}")
+        return None
+
+def close_engines():
+    """Release this thread's Tesseract handles"""
+    handles = getattr(_local, "handles", None) or {}
+    for api in handles.values():
+        api.End()
+    handles.clear()
@@ -1,80 +1,348 @@
-import pytesseract
-from pdf2image import convert_from_bytes
-from PIL import Image
+from PIL import Image, ImageSequence
 import io
+import asyncio
 import fitz
 import re
 import logging
-from typing import Optional
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from app.schemas.aadhaar import AadhaarDataCreate
+from app.core.config import settings
+from app.core.ocr_pool import run_ocr_task, get_ocr_thread_pool
+from app.core.ocr_cache import ocr_cache, make_cache_key, hash_content
+from app.core.uploads import SpooledUpload
+from app.ocr_engine import ocr_image, get_active_backend
+from app.script_router import ocr_image_routed, ocr_regions_routed, SINGLE_LINE_PSM
+from app.image_preprocess import decode_image, preprocess_image
+from app.card_layout import find_card_regions
+from app.file_validation import check_image_pixels
 
 logger = logging.getLogger(__name__)
 
+AADHAAR_DIGITS = "0123456789"
+REQUIRED_FIELDS = ("aadhaar_number", "name")
+TIFF_EXTENSIONS = (".tif", ".tiff")
+
+# Raw document bytes, or the path of a spooled upload
+DocumentSource = Union[bytes, str]
+
+def prepare_image_for_ocr(image: Image.Image) -> Image.Image:
+    """Apply the configured preprocessing stage before OCR"""
+    if settings.ocr_preprocess_enabled:
+        return preprocess_image(image)
+    return image
+
 def extract_text_from_image(image: Image.Image) -> str:
     """Extract text from PIL Image using OCR"""
     try:
-        custom_config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(image, config=custom_config, lang='eng+tam')
+        text = ocr_image_routed(image, psm=6)
         logger.info("Successfully extracted text from image")
         return text
     except Exception as e:
         logger.error(f"Error extracting text from image: {str(e)}")
         raise
 
-def extract_text_from_pdf(pdf_bytes: bytes, password: Optional[str] = None) -> str:
-    """Extract text from PDF bytes using PyMuPDF"""
+def _render_page_image(doc: fitz.Document, page: fitz.Page, dpi: int) -> Image.Image:
+    """Get an OCR-ready image for a page without a text layer"""
+    images = page.get_images(full=True)
+
+    # A scanned page is usually a single image covering the whole page:
+    # use the embedded image directly instead of rendering
+    if len(images) == 1:
+        try:
+            bbox = page.get_image_bbox(images[0])
+            if abs(bbox & page.rect) >= 0.9 * abs(page.rect):
+                extracted = doc.extract_image(images[0][0])
+                image = Image.open(io.BytesIO(extracted["image"]))
+                image.load()
+                return image
+        except Exception as e:
+            logger.debug(f"Falling back to rendering page {page.number}: {e}")
+
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+def _ocr_scanned_page(image: Image.Image) -> str:
+    """Preprocess and OCR one scanned PDF page"""
+    text = extract_text_from_image(prepare_image_for_ocr(image))
+    return text if text.endswith("\n") else text + "\n"
+
+def _open_pdf(pdf_source: DocumentSource, password: Optional[str] = None) -> fitz.Document:
+    """Open a PDF from bytes or a file, authenticating password-protected documents"""
+    if isinstance(pdf_source, bytes):
+        doc = fitz.open(stream=pdf_source, filetype="pdf")
+    else:
+        # MuPDF reads a file on demand instead of needing the whole document in memory
+        doc = fitz.open(pdf_source, filetype="pdf")
+    
+    # Handle password-protected PDFs
+    if doc.needs_pass:
+        if password:
+            if not doc.authenticate(password):
+                doc.close()
+                raise ValueError("Invalid password for PDF")
+        else:
+            doc.close()
+            raise ValueError("PDF is password protected but no password provided")
+
+    # Encrypted documents only reveal their page count once authenticated
+    if settings.upload_max_pdf_pages and doc.page_count > settings.upload_max_pdf_pages:
+        page_count = doc.page_count
+        doc.close()
+        raise ValueError(f"PDF has too many pages: {page_count} (maximum {settings.upload_max_pdf_pages})")
+    return doc
+
+def _yield_in_order(items: Iterable[Union[str, Future]], window: int) -> Iterator[str]:
+    """Yield page texts in document order while OCR of upcoming pages runs ahead
+
+    Items are page texts or futures of pages being OCRed. At most `window` of
+    them are pulled ahead of the consumer; closing the generator early cancels
+    OCR that has not started yet.
+    """
+    pending: Deque[Union[str, Future]] = deque()
     try:
-        text = ""
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        
-        # Handle password-protected PDFs
-        if doc.needs_pass:
-            if password:
-                if not doc.authenticate(password):
-                    raise ValueError("Invalid password for PDF")
-            else:
-                raise ValueError("PDF is password protected but no password provided")
-        
-        # Extract text from all pages
+        for item in items:
+            pending.append(item)
+
+            # Hand out pages in order as soon as they are ready, or once the
+            # lookahead window is full
+            while pending and (isinstance(pending[0], str) or pending[0].done()
+                               or len(pending) > window):
+                head = pending.popleft()
+                yield head if isinstance(head, str) else head.result()
+
+        while pending:
+            head = pending.popleft()
+            yield head if isinstance(head, str) else head.result()
+    finally:
+        for item in pending:
+            if isinstance(item, Future):
+                item.cancel()
+
+def iter_pdf_page_texts(pdf_source: DocumentSource, password: Optional[str] = None) -> Iterator[str]:
+    """Yield the text of each PDF page in order, OCRing pages that have no text layer
+
+    Up to `pdf_ocr_max_workers` upcoming scanned pages are OCRed ahead in parallel.
+    """
+    doc = _open_pdf(pdf_source, password)
+    pool = get_ocr_thread_pool("pages", settings.pdf_ocr_max_workers)
+
+    def pages() -> Iterator[Union[str, Future]]:
         for page in doc:
-            text += page.get_text("text")
-        
+            page_text = page.get_text("text")
+            if len(page_text.strip()) >= settings.pdf_min_text_chars:
+                yield page_text
+            else:
+                logger.info(f"OCRing PDF page {page.number + 1} (no text layer)")
+                image = _render_page_image(doc, page, settings.pdf_ocr_dpi)
+                yield pool.submit(_ocr_scanned_page, image)
+
+    try:
+        yield from _yield_in_order(pages(), settings.pdf_ocr_max_workers)
+    finally:
         doc.close()
+
+def extract_text_from_pdf(pdf_source: DocumentSource, password: Optional[str] = None) -> str:
+    """Extract text from a PDF using PyMuPDF, OCRing pages that have no text layer"""
+    try:
+        text = "".join(iter_pdf_page_texts(pdf_source, password))
         logger.info("Successfully extracted text from PDF")
         return text
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         raise
 
+def has_fields(data: AadhaarDataCreate, fields: Iterable[str]) -> bool:
+    """Check that every listed field has been extracted"""
+    return all(getattr(data, field) for field in fields)
+
+def parse_pages_incrementally(pages: Iterator[str], fields: Sequence[str] = REQUIRED_FIELDS,
+                              unit: str = "page") -> Tuple[str, AadhaarDataCreate]:
+    """Parse page texts one by one, stopping once the wanted fields are filled"""
+    text = ""
+    aadhaar_data = None
+    try:
+        for page_number, page_text in enumerate(pages, start=1):
+            text += page_text
+            aadhaar_data = parse_aadhaar_details(text)
+            if has_fields(aadhaar_data, fields):
+                logger.info(f"Found all wanted fields after {page_number} {unit}(s)")
+                break
+    finally:
+        pages.close()
+
+    if aadhaar_data is None:
+        aadhaar_data = parse_aadhaar_details(text)
+    return text, aadhaar_data
+
+def parse_pdf_incrementally(pdf_source: DocumentSource, password: Optional[str] = None,
+                            fields: Sequence[str] = REQUIRED_FIELDS) -> Tuple[str, AadhaarDataCreate]:
+    """Parse a PDF page by page, stopping once the wanted fields are filled"""
+    return parse_pages_incrementally(iter_pdf_page_texts(pdf_source, password), fields, unit="PDF page")
+
+def iter_tiff_frame_texts(image: Image.Image) -> Iterator[str]:
+    """Yield the OCR text of each frame of a multi-page TIFF in order
+
+    Frames are decoded one at a time as the lookahead window advances and up
+    to `pdf_ocr_max_workers` of them are OCRed in parallel.
+    """
+    pool = get_ocr_thread_pool("pages", settings.pdf_ocr_max_workers)
+
+    def frames() -> Iterator[Future]:
+        for index, frame in enumerate(ImageSequence.Iterator(image), start=1):
+            check_image_pixels(*frame.size)
+            logger.info(f"OCRing TIFF frame {index}")
+            # Copy the frame: the shared image object moves on to the next one
+            yield pool.submit(_ocr_scanned_page, frame.copy())
+
+    return _yield_in_order(frames(), settings.pdf_ocr_max_workers)
+
+def parse_tiff_incrementally(image: Image.Image,
+                             fields: Sequence[str] = REQUIRED_FIELDS) -> Tuple[str, AadhaarDataCreate]:
+    """Parse a multi-page TIFF frame by frame, stopping once the wanted fields are filled"""
+    return parse_pages_incrementally(iter_tiff_frame_texts(image), fields, unit="TIFF frame")
+
+# Precompiled patterns for the field extractor. Each one either has a literal
+# label in front of a single run of separators or matches characters of one
+# class, so no search can backtrack further than that run and parsing is
+# linear in the size of the text.
+AADHAAR_NUMBER_RE = re.compile(r'\b(\d{4}\s\d{4}\s\d{4})\b')
+# The unlabelled fields cannot overlap each other, so one alternation finds the
+# first occurrence of each of them in a single scan of the text
+UNLABELLED_FIELDS_RE = re.compile(
+    r'\b(?P<aadhaar_number>\d{4}\s\d{4}\s\d{4})\b'
+    r'|\b(?P<phone>\d{10})\b'
+    r'|\b(?P<pincode>\d{6})\b'
+    r'|\b(?P<gender>(?i:Male|Female|Transgender|M|F|T))\b'
+)
+TAMIL_RUN_RE = re.compile(r'[\u0B80-\u0BFF\s]+')
+ENGLISH_NAME_RE = re.compile(r"[A-Za-z\s'-]+")
+GUARDIAN_SPLIT_RE = re.compile(r'\s*(?:S/O|C/O|W/O|D/O)\s*', re.IGNORECASE)
+TRAILING_INITIAL_RE = re.compile(r'\s+[CWSD]\s*$')
+WHITESPACE_RE = re.compile(r'\s+')
+ADDRESS_RE = re.compile(r'address[:\s]*(.*?)(?=\nDistrict|\nState|\n\d{6}|\nVID|\nDigitally|$)',
+                        re.IGNORECASE | re.DOTALL)
+ADDRESS_GUARDIAN_RE = re.compile(r"(S/o|C/o|D/o|W/o)[.:]?\s*[A-Za-z\s'-]+", re.IGNORECASE)
+ADDRESS_PO_RE = re.compile(r'PO:[^,\n]*,')
+ADDRESS_DIST_STATE_RE = re.compile(r'\b(dist|state)\b.*', re.IGNORECASE)
+NEWLINES_RE = re.compile(r'\n+')
+
+# Unwanted phrases are lowercased once instead of for every line
+UNWANTED_NAME_PHRASES = tuple(phrase.lower() for phrase in (
+    "Digitally signed by DS Unique",
+    "Identification Authority of India",
+    "Government of India",
+    "Signature Not Verified",
+    "Date of Issue",
+    "Download Date"
+))
+
+# "Label: value" fields as (field, pattern). The first label followed by a value
+# wins; the separators after a label may run onto the following lines.
+LABELLED_FIELDS = [
+    ("vid", re.compile(r'VID[:\s]*(\d{4}\s\d{4}\s\d{4}\s\d{4})')),
+    ("guardian_name", re.compile(r"(?:S/o|C/o|D/o|W/o)[.:]?\s*([A-Za-z\s'-]+)", re.IGNORECASE)),
+    ("dob", re.compile(r'(?:DOB|Date of Birth|D\.O\.B)[:\s]*?(\d{1,2}[-/]\d{1,2}[-/]\d{4})', re.IGNORECASE)),
+    ("vtc", re.compile(r'VTC[:\s]*(.*)', re.IGNORECASE)),
+    ("po", re.compile(r'PO[:\s]*(.*)', re.IGNORECASE)),
+    ("sub_district", re.compile(r'Sub District[:\s]*(.*)', re.IGNORECASE)),
+    ("district", re.compile(r'District[:\s]*(.*)', re.IGNORECASE)),
+    ("state", re.compile(r'State[:\s]*(.*)', re.IGNORECASE)),
+]
+
+def clean_person_name(name: str) -> str:
+    """Drop guardian prefixes, trailing relation initials and extra spaces from a name"""
+    # Split on guardian prefixes (S/O, C/O, etc.) and take the first part
+    name = GUARDIAN_SPLIT_RE.split(name, maxsplit=1)[0].strip()
+    # Remove trailing single letters (C, W, S, D) followed by whitespace
+    name = TRAILING_INITIAL_RE.sub('', name).strip()
+    # Clean any extra spaces
+    return WHITESPACE_RE.sub(' ', name)
+
 def extract_name_from_text(lines):
     """Extract name from text lines with filtering"""
-    unwanted_phrases = [
-        "Digitally signed by DS Unique",
-        "Identification Authority of India",
-        "Government of India",
-        "Signature Not Verified",
-        "Date of Issue",
-        "Download Date"
-    ]
-
     for line in lines:
         clean_line = line.strip()
         # Allow common characters in names (alphabets, spaces, apostrophes, hyphens)
-        if (
-            re.match(r'^[A-Za-z\s\'-]+$', clean_line)
-            and len(clean_line.split()) > 1
-            and all(phrase.lower() not in clean_line.lower() for phrase in unwanted_phrases)
-        ):
-            # Split on guardian prefixes (S/O, C/O, etc.) and take the first part
-            name_part = re.split(r'\s*(?:S/O|C/O|W/O|D/O)\s*', clean_line, flags=re.IGNORECASE)[0]
-            # Remove trailing single letters (C, W, S, D) followed by whitespace
-            name_part = re.sub(r'\s+[CWSD]\s*$', '', name_part).strip()
-            # Clean any extra spaces
-            name_part = re.sub(r'\s+', ' ', name_part)
-            if len(name_part) > 2:  # Ensure name is meaningful
-                return name_part
+        if not ENGLISH_NAME_RE.fullmatch(clean_line) or len(clean_line.split()) <= 1:
+            continue
+        lowered = clean_line.lower()
+        if any(phrase in lowered for phrase in UNWANTED_NAME_PHRASES):
+            continue
+        name_part = clean_person_name(clean_line)
+        if len(name_part) > 2:  # Ensure name is meaningful
+            return name_part
     return ""
 
+def find_tamil_name(text: str) -> Optional[Tuple[str, str]]:
+    r"""Find the Tamil name and the English line(s) after it
+    
+    Gives the groups of re.search(r'([\u0B80-\u0BFF\s]+)\n([A-Za-z\s'-]+)', text)
+    without its quadratic backtracking: that match starts at the first run of
+    Tamil characters and whitespace holding a newline that is followed by an
+    English character, and the Tamil group ends at the last such newline.
+    """
+    for run in TAMIL_RUN_RE.finditer(text):
+        start, end = run.span()
+        newline = text.rfind("\n", start + 1, end)
+        while newline > start:
+            english = ENGLISH_NAME_RE.match(text, newline + 1)
+            if english:
+                return text[start:newline], english.group(0)
+            newline = text.rfind("\n", start + 1, newline)
+    return None
+
+def _remove_po(line: str) -> str:
+    """Remove "PO:...," segments; text after the last comma cannot match, so it is
+    skipped instead of rescanned from every "PO:" (keeps this linear)"""
+    last_comma = line.rfind(',')
+    if last_comma < 0:
+        return line
+    return ADDRESS_PO_RE.sub('', line[:last_comma + 1]) + line[last_comma + 1:]
+
+def _clean_address(address_text: str) -> str:
+    address_text = ADDRESS_GUARDIAN_RE.sub('', address_text.strip())
+    address_text = AADHAAR_NUMBER_RE.sub('', address_text)
+    address_text = "\n".join(_remove_po(line) for line in address_text.split("\n"))
+    address_text = ADDRESS_DIST_STATE_RE.sub('', address_text)
+    address_text = NEWLINES_RE.sub(' ', address_text).strip()
+    address_text = WHITESPACE_RE.sub(' ', address_text).strip()
+    return address_text.lstrip(',').strip()
+
+def _normalize_gender(gender: str) -> str:
+    gender = gender.capitalize()
+    return {'M': 'Male', 'F': 'Female', 'T': 'Transgender'}.get(gender, gender)
+
+def extract_fields(text: str) -> Tuple[Dict[str, str], List[str]]:
+    """Find the raw value of each field in OCR text
+
+    Returns the raw value of each field found and the stripped non-blank lines.
+    Each field keeps its first match in reading order. The address runs until a
+    line starting with District/State/PIN/VID/Digitally.
+    """
+    found = {}
+    for match in UNLABELLED_FIELDS_RE.finditer(text):
+        found.setdefault(match.lastgroup, match.group(match.lastgroup))
+        if len(found) == 4:
+            break
+
+    for field, pattern in LABELLED_FIELDS:
+        match = pattern.search(text)
+        if match:
+            found[field] = match.group(1)
+
+    tamil_name = find_tamil_name(text)
+    if tamil_name:
+        found["name_tamil"], found["name"] = tamil_name
+
+    match = ADDRESS_RE.search(text)
+    if match:
+        found["address"] = match.group(1)
+
+    stripped_lines = [line.strip() for line in text.split("\n") if line.strip()]
+    return found, stripped_lines
+
 def parse_aadhaar_details(text: str) -> AadhaarDataCreate:
     """Parse Aadhaar details from extracted text"""
     try:
@@ -82,100 +350,44 @@ def parse_aadhaar_details(text: str) -> AadhaarDataCreate:
             aadhaar_number="",
             name=""
         )
-        lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-        # Extract Aadhaar Number
-        aadhaar_match = re.search(r'\b(\d{4}\s\d{4}\s\d{4})\b', text)
-        if aadhaar_match:
-            data.aadhaar_number = aadhaar_match.group(1)
-        
-        # Extract VID (Virtual ID)
-        vid_match = re.search(r'VID[:\s]*(\d{4}\s\d{4}\s\d{4}\s\d{4})', text)
-        if vid_match:
-            data.vid = vid_match.group(1)
-
-        # Extract Name (Tamil and English)
-        tamil_name_match = re.search(r'([\u0B80-\u0BFF\s]+)\n([A-Za-z\s\'-]+)', text)
-        if tamil_name_match:
-            data.name_tamil = tamil_name_match.group(1).strip()
-            data.name = tamil_name_match.group(2).strip().replace("\n", " ")
-            # Process to remove guardian prefixes and trailing letters
-            data.name = re.split(r'\s*(?:S/O|C/O|W/O|D/O)\s*', data.name, flags=re.IGNORECASE)[0].strip()
-            data.name = re.sub(r'\s+[CWSD]\s*$', '', data.name).strip()
-            data.name = re.sub(r'\s+', ' ', data.name)
-        
+        found, lines = extract_fields(text)
+
+        if "aadhaar_number" in found:
+            data.aadhaar_number = found["aadhaar_number"]
+        if "vid" in found:
+            data.vid = found["vid"]
+
+        # Name (Tamil and English)
+        if "name_tamil" in found:
+            data.name_tamil = found["name_tamil"].strip()
+            data.name = clean_person_name(found["name"].strip().replace("\n", " "))
+
         # **Backup:** If English name is still missing, find the first proper English name
         if not data.name:
             data.name = extract_name_from_text(lines)
 
-        # Extract Guardian Name (S/O, W/O, C/O, D/O)
-        guardian_match = re.search(r'(S/o|C/o|D/o|W/o)[.:]?\s*([A-Za-z\s\'-]+)', text, re.IGNORECASE)
-        if guardian_match:
-            data.guardian_name = guardian_match.group(2).strip()
-
-        # Extract DOB
-        dob_match = re.search(r'(DOB|Date of Birth|D\.O\.B)[:\s]*?(\d{1,2}[-/]\d{1,2}[-/]\d{4})', text, re.IGNORECASE)
-        if dob_match:
-            data.dob = dob_match.group(2).replace('-', '/')
-
-        # Extract Gender
-        gender_match = re.search(r'\b(Male|Female|Transgender|M|F|T)\b', text, re.IGNORECASE)
-        if gender_match:
-            gender = gender_match.group(1).capitalize()
-            if gender in ['M']:
-                data.gender = 'Male'
-            elif gender in ['F']:
-                data.gender = 'Female'
-            elif gender in ['T']:
-                data.gender = 'Transgender'
-            else:
-                data.gender = gender
-
-        # Extract Address
-        address_match = re.search(r'(?i)address[:\s]*(.*?)(?=\nDistrict|\nState|\n\d{6}|\nVID|\nDigitally|$)', text, re.DOTALL)
-        if address_match:
-            address_text = re.sub(r'(S/o|C/o|D/o|W/o)[.:]?\s*[A-Za-z\s\'-]+', '', address_match.group(1).strip(), flags=re.IGNORECASE)
-            address_text = re.sub(r'\b\d{4}\s\d{4}\s\d{4}\b', '', address_text)
-            address_text = re.sub(r'PO:.*?,', '', address_text)
-            address_text = re.sub(r'(?i)\b(dist|state)\b.*', '', address_text)
-            address_text = re.sub(r'\n+', ' ', address_text).strip()
-            address_text = re.sub(r'\s+', ' ', address_text).strip()
-            data.address = address_text.lstrip(',').strip()
-
-        # Extract VTC (Village/Town/City)
-        vtc_match = re.search(r'VTC[:\s]*(.*)', text, re.IGNORECASE)
-        if vtc_match:
-            data.vtc = vtc_match.group(1).strip()
-        
-        # Extract PO (Post Office)
-        po_match = re.search(r'PO[:\s]*(.*)', text, re.IGNORECASE)
-        if po_match:
-            data.po = po_match.group(1).strip()
-        
-        # Extract Sub District
-        sub_district_match = re.search(r'Sub District[:\s]*(.*)', text, re.IGNORECASE)
-        if sub_district_match:
-            data.sub_district = sub_district_match.group(1).strip()
-
-        # Extract District
-        district_match = re.search(r'District[:\s]*(.*)', text, re.IGNORECASE)
-        if district_match:
-            data.district = district_match.group(1).strip().replace(',', '')
-        
-        # Extract State
-        state_match = re.search(r'State[:\s]*(.*)', text, re.IGNORECASE)
-        if state_match:
-            data.state = state_match.group(1).strip()
-
-        # Extract Pincode
-        pincode_match = re.search(r'\b(\d{6})\b', text)
-        if pincode_match:
-            data.pincode = pincode_match.group(1)
-
-        # Extract Phone Number
-        phone_match = re.search(r'\b(\d{10})\b', text)
-        if phone_match:
-            data.phone = phone_match.group(1)
+        if "guardian_name" in found:
+            data.guardian_name = found["guardian_name"].strip()
+        if "dob" in found:
+            data.dob = found["dob"].replace('-', '/')
+        if "gender" in found:
+            data.gender = _normalize_gender(found["gender"])
+        if "address" in found:
+            data.address = _clean_address(found["address"])
+        if "vtc" in found:
+            data.vtc = found["vtc"].strip()
+        if "po" in found:
+            data.po = found["po"].strip()
+        if "sub_district" in found:
+            data.sub_district = found["sub_district"].strip()
+        if "district" in found:
+            data.district = found["district"].strip().replace(',', '')
+        if "state" in found:
+            data.state = found["state"].strip()
+        if "pincode" in found:
+            data.pincode = found["pincode"]
+        if "phone" in found:
+            data.phone = found["phone"]
 
         logger.info(f"Successfully parsed Aadhaar details for: {data.aadhaar_number}")
         return data
@@ -184,27 +396,118 @@ def parse_aadhaar_details(text: str) -> AadhaarDataCreate:
         logger.error(f"Error parsing Aadhaar details: {str(e)}")
         raise
 
-async def process_aadhaar_file(file_content: bytes, filename: str, password: Optional[str] = None) -> AadhaarDataCreate:
-    """Process uploaded file and extract Aadhaar details"""
+def get_ocr_config_fingerprint() -> str:
+    """Describe the OCR settings that affect the extracted result (part of the cache key)"""
+    return (f"v1|backend={get_active_backend()}|lang={settings.ocr_primary_language}+{settings.ocr_indic_languages}"
+            f"@{settings.ocr_script_confidence}|pdf_dpi={settings.pdf_ocr_dpi}"
+            f"|preprocess={settings.ocr_preprocess_enabled},{settings.ocr_pixel_budget},"
+            f"{settings.ocr_deskew},{settings.ocr_binarize}|layout={settings.ocr_layout_mode}")
+
+def load_image_for_ocr(source: DocumentSource) -> Image.Image:
+    """Decode an uploaded image and run the preprocessing stage"""
+    if settings.ocr_preprocess_enabled:
+        return prepare_image_for_ocr(decode_image(source))
+    return Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+def extract_text_from_card_regions(image: Image.Image) -> Optional[str]:
+    """OCR only the Aadhaar card regions, returning one line of text per field"""
+    regions = find_card_regions(image)
+    if regions is None:
+        return None
+
+    number_text = ocr_image(regions["number"], lang='eng', psm=SINGLE_LINE_PSM, whitelist=AADHAAR_DIGITS)
+    digits = re.sub(r'\D', '', number_text)
+    lines = [line.strip() for line in ocr_regions_routed(regions["details"])]
+    if len(digits) >= 12:
+        lines.append(f"{digits[:4]} {digits[4:8]} {digits[8:12]}")
+
+    logger.info(f"Extracted text from {len(regions['details'])} card line(s) and the number band")
+    return "\n".join(line for line in lines if line)
+
+def extract_image_details(image: Image.Image, fields: Sequence[str] = REQUIRED_FIELDS) -> Tuple[str, AadhaarDataCreate]:
+    """OCR a card image, trying the card regions before the full page"""
+    if settings.ocr_layout_mode == "roi":
+        text = extract_text_from_card_regions(image)
+        if text:
+            aadhaar_data = parse_aadhaar_details(text)
+            if has_fields(aadhaar_data, fields):
+                return text, aadhaar_data
+        logger.info("Card region OCR incomplete, falling back to full page OCR")
+
+    text = extract_text_from_image(image)
+    return text, parse_aadhaar_details(text)
+
+def extract_tiff_details(source: DocumentSource, fields: Sequence[str] = REQUIRED_FIELDS) -> Tuple[str, AadhaarDataCreate]:
+    """OCR a TIFF; scanner output often holds the front and back of the card as separate frames"""
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+        frame_count = getattr(image, "n_frames", 1)
+        if frame_count > 1:
+            logger.info(f"Processing multi-page TIFF with {frame_count} frame(s)")
+            return parse_tiff_incrementally(image, fields)
+    return extract_image_details(load_image_for_ocr(source), fields)
+
+def resolve_wanted_fields(optional_fields: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    """Combine the required fields with the optional fields a caller asks for"""
+    wanted = list(REQUIRED_FIELDS)
+    for field in optional_fields or ():
+        if field not in AadhaarDataCreate.model_fields:
+            raise ValueError(f"Unknown Aadhaar field: {field}")
+        if field not in wanted:
+            wanted.append(field)
+    return tuple(wanted)
+
+def extract_aadhaar_details(source: DocumentSource, filename: str, password: Optional[str] = None,
+                            optional_fields: Optional[Iterable[str]] = None) -> Tuple[str, AadhaarDataCreate]:
+    """Extract text and Aadhaar details from file bytes or a spooled file (blocking, runs in the OCR pool)"""
+    fields = resolve_wanted_fields(optional_fields)
+    if filename.lower().endswith('.pdf'):
+        text, aadhaar_data = parse_pdf_incrementally(source, password, fields)
+    elif filename.lower().endswith(TIFF_EXTENSIONS):
+        text, aadhaar_data = extract_tiff_details(source, fields)
+    else:
+        # Assume it's an image
+        text, aadhaar_data = extract_image_details(load_image_for_ocr(source), fields)
+    
+    # Validate that we have minimum required data
+    if not aadhaar_data.aadhaar_number:
+        raise ValueError("Could not extract Aadhaar number from the document")
+    
+    if not aadhaar_data.name:
+        raise ValueError("Could not extract name from the document")
+    
+    return text, aadhaar_data
+
+async def process_aadhaar_file(file_content: Union[bytes, SpooledUpload], filename: str, password: Optional[str] = None,
+                               optional_fields: Optional[Iterable[str]] = None) -> AadhaarDataCreate:
+    """Process uploaded file and extract Aadhaar details
+
+    Multi-page PDFs stop being read once the Aadhaar number, the name and any
+    `optional_fields` the caller asks for have been found. Spooled uploads are
+    passed to the OCR pool by path, so the document is never copied into memory.
+    """
     try:
-        # Determine file type and extract text
-        if filename.lower().endswith('.pdf'):
-            text = extract_text_from_pdf(file_content, password)
+        fields = resolve_wanted_fields(optional_fields)
+        if isinstance(file_content, SpooledUpload):
+            source, content_sha256 = file_content.path, file_content.sha256
         else:
-            # Assume it's an image
-            image = Image.open(io.BytesIO(file_content))
-            text = extract_text_from_image(image)
-        
-        # Parse the extracted text
-        aadhaar_data = parse_aadhaar_details(text)
-        
-        # Validate that we have minimum required data
-        if not aadhaar_data.aadhaar_number:
-            raise ValueError("Could not extract Aadhaar number from the document")
-        
-        if not aadhaar_data.name:
-            raise ValueError("Could not extract name from the document")
-        
+            source, content_sha256 = file_content, None
+
+        cache_key = None
+        if settings.ocr_cache_enabled:
+            ocr_config = f"{get_ocr_config_fingerprint()}|fields={','.join(fields)}"
+            # Hashing and the disk tier are blocking I/O; keep them off the event loop
+            content_sha256 = content_sha256 or await asyncio.to_thread(hash_content, source)
+            cache_key = make_cache_key(content_sha256, password, ocr_config)
+            cached = await asyncio.to_thread(ocr_cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"OCR cache hit for: {filename}")
+                return cached[1]
+
+        text, aadhaar_data = await run_ocr_task(extract_aadhaar_details, source, filename, password, fields)
+
+        if cache_key is not None:
+            await asyncio.to_thread(ocr_cache.set, cache_key, text, aadhaar_data)
+
         return aadhaar_data
     
     except Exception as e:
@@ -1,26 +1,120 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Query, Header, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional, List, Callable, Tuple, Union
+import asyncio
+import json
+from datetime import datetime
+from functools import partial
+import zipfile
 import logging
 
+from app.core.config import settings
 from app.core.database import get_database
+from app.core.export import RecordExporter, parse_columns, stream_export
+from app.core.job_queue import get_job_queue, JOB_PENDING
+from app.core.uploads import SpooledUpload, UploadTooLargeError, read_bounded, spool_upload, spool_stream
 from app.crud.aadhaar import get_aadhaar_crud
 from app.schemas.aadhaar import (
     AadhaarSubmissionResponse, 
     AadhaarRetrievalResponse, 
     ErrorResponse,
-    AadhaarData
+    AadhaarData,
+    AadhaarDataCreate,
+    JobSubmissionResponse
 )
-from app.ocr_parser import process_aadhaar_file
+from app.ocr_parser import process_aadhaar_file, resolve_wanted_fields
+from app.file_validation import inspect_document_head, validate_document
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/form", tags=["Aadhaar Forms"])
 
-@router.post("/submit", response_model=AadhaarSubmissionResponse)
+ALLOWED_EXTENSIONS = ['.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
+
+def get_file_extension(filename: str) -> str:
+    """Lowercase extension of a filename including the dot, or empty string"""
+    return '.' + filename.split('.')[-1].lower() if '.' in filename else ''
+
+def validate_file_type(filename: str):
+    """Reject filenames whose extension is not a supported document type"""
+    if get_file_extension(filename) not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
+def parse_optional_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split the comma separated fields form value"""
+    return [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+async def process_and_store(
+    file_content: Union[bytes, SpooledUpload],
+    filename: str,
+    password: Optional[str],
+    optional_fields: Optional[List[str]],
+    database
+) -> AadhaarSubmissionResponse:
+    """Extract Aadhaar details from a document and save them"""
+    aadhaar_data: AadhaarDataCreate = await process_aadhaar_file(file_content, filename, password, optional_fields)
+
+    crud = get_aadhaar_crud(database)
+    record, created = await crud.upsert_aadhaar_record(aadhaar_data)
+
+    if not record:
+        raise RuntimeError("Failed to save Aadhaar data")
+
+    return AadhaarSubmissionResponse(
+        success=True,
+        message="Aadhaar data submitted successfully" if created else "Aadhaar data updated successfully",
+        data=AadhaarData(**record),
+        aadhaar_number=aadhaar_data.aadhaar_number
+    )
+
+async def submit_spooled_document(
+    upload: SpooledUpload,
+    filename: str,
+    password: Optional[str],
+    fields: Optional[str],
+    run_async: bool,
+    database
+) -> Union[AadhaarSubmissionResponse, JSONResponse]:
+    """Process a spooled upload now, or queue it when async mode is requested"""
+    if upload.size == 0:
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+
+    # Page count and image headers beyond the first bytes, still without decoding
+    await asyncio.to_thread(validate_document, upload.path, filename)
+    optional_fields = parse_optional_fields(fields)
+
+    if run_async:
+        # Reject bad options now rather than in a failed job
+        resolve_wanted_fields(optional_fields)
+        file_content = await asyncio.to_thread(upload.read_bytes)
+        job_id = await get_job_queue().enqueue(filename, file_content, {"fields": optional_fields}, password)
+        logger.info(f"Queued file {filename} as job {job_id}")
+        job = JobSubmissionResponse(
+            success=True,
+            message="Aadhaar document queued for processing",
+            job_id=job_id,
+            status=JOB_PENDING,
+            status_url=f"/api/jobs/{job_id}"
+        )
+        return JSONResponse(status_code=202, content=job.model_dump())
+
+    # Process the file and extract Aadhaar details
+    logger.info(f"Processing file: {filename} ({upload.size} bytes)")
+    return await process_and_store(upload, filename, password, optional_fields, database)
+
+@router.post(
+    "/submit",
+    response_model=AadhaarSubmissionResponse,
+    responses={202: {"model": JobSubmissionResponse}}
+)
 async def submit_aadhaar_form(
     file: UploadFile = File(..., description="Aadhaar PDF or image file"),
     password: Optional[str] = Form(None, description="Password for protected PDF files"),
+    fields: Optional[str] = Form(None, description="Comma separated optional fields to wait for in multi-page PDFs"),
+    run_async: bool = Query(False, alias="async", description="Queue the file and return a job id at once"),
     database = Depends(get_database)
 ):
     """
@@ -28,60 +122,23 @@ async def submit_aadhaar_form(
     
     - **file**: PDF or image file containing Aadhaar details
     - **password**: Optional password for password-protected PDF files
+    - **fields**: Optional fields (e.g. `dob,address`) that must be found before
+      reading of a multi-page PDF stops; the Aadhaar number and name are always required
+    - **async**: When true the file is queued and a job id is returned with
+      status 202; poll `/api/jobs/{job_id}` for the result
     
     Returns extracted and stored Aadhaar data
     """
     try:
-        # Validate file type
-        allowed_extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff']
-        file_extension = '.' + file.filename.split('.')[-1].lower() if '.' in file.filename else ''
-        
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}"
-            )
-        
-        # Read file content
-        file_content = await file.read()
-        
-        if len(file_content) == 0:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
-        
-        # Process the file and extract Aadhaar details
-        logger.info(f"Processing file: {file.filename}")
-        aadhaar_data = await process_aadhaar_file(file_content, file.filename, password)
-        
-        # Get CRUD instance
-        crud = get_aadhaar_crud(database)
-        
-        # Check if Aadhaar number already exists
-        existing_record = await crud.get_aadhaar_by_number(aadhaar_data.aadhaar_number)
-        
-        if existing_record:
-            # Update existing record
-            updated_record = await crud.update_aadhaar_record(aadhaar_data.aadhaar_number, aadhaar_data)
-            if updated_record:
-                return AadhaarSubmissionResponse(
-                    success=True,
-                    message="Aadhaar data updated successfully",
-                    data=AadhaarData(**updated_record),
-                    aadhaar_number=aadhaar_data.aadhaar_number
-                )
-        else:
-            # Create new record
-            created_record = await crud.create_aadhaar_record(aadhaar_data)
-            if created_record:
-                return AadhaarSubmissionResponse(
-                    success=True,
-                    message="Aadhaar data submitted successfully",
-                    data=AadhaarData(**created_record),
-                    aadhaar_number=aadhaar_data.aadhaar_number
-                )
-        
-        # If we reach here, something went wrong
-        raise HTTPException(status_code=500, detail="Failed to save Aadhaar data")
+        validate_file_type(file.filename)
+        upload = await spool_upload(file, inspect_head=partial(inspect_document_head, filename=file.filename))
+        try:
+            return await submit_spooled_document(upload, file.filename, password, fields, run_async, database)
+        finally:
+            upload.close()
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except HTTPException:
         raise
     except ValueError as e:
@@ -91,6 +148,239 @@ async def submit_aadhaar_form(
         logger.error(f"Unexpected error in submit_aadhaar_form: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error occurred while processing the file")
 
+@router.post(
+    "/submit-raw",
+    response_model=AadhaarSubmissionResponse,
+    responses={202: {"model": JobSubmissionResponse}}
+)
+async def submit_aadhaar_raw(
+    request: Request,
+    filename: str = Query(..., description="Original filename, used to detect the file type"),
+    fields: Optional[str] = Query(None, description="Comma separated optional fields to wait for in multi-page PDFs"),
+    run_async: bool = Query(False, alias="async", description="Queue the file and return a job id at once"),
+    password: Optional[str] = Header(None, alias="X-Document-Password", description="Password for protected PDF files"),
+    database = Depends(get_database)
+):
+    """
+    Upload and process an Aadhaar document sent as the raw request body
+    
+    Same as `/submit` without multipart parsing: send the file with
+    `Content-Type: application/octet-stream`, the filename as a query
+    parameter and the PDF password, if any, in the `X-Document-Password` header.
+    The body is spooled to disk as it arrives and rejected once it exceeds the size limit.
+    """
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.split(";")[0].strip().lower() != "application/octet-stream":
+            raise HTTPException(status_code=415, detail="Content-Type must be application/octet-stream")
+        validate_file_type(filename)
+
+        content_length = request.headers.get("content-length")
+        if settings.upload_max_bytes and content_length and content_length.isdigit() \
+                and int(content_length) > settings.upload_max_bytes:
+            raise UploadTooLargeError(settings.upload_max_bytes)
+
+        upload = await spool_stream(request.stream(), inspect_head=partial(inspect_document_head, filename=filename))
+        try:
+            return await submit_spooled_document(upload, filename, password, fields, run_async, database)
+        finally:
+            upload.close()
+
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in submit_aadhaar_raw: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error occurred while processing the file")
+
+def read_zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Read one zip member, rejecting it from its declared size before decompressing and
+    from the bytes actually decompressed, since the declared size can be forged"""
+    max_bytes = settings.upload_max_bytes
+    if max_bytes and info.file_size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    try:
+        with archive.open(info) as member:
+            return read_bounded(member, max_bytes)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Corrupt zip member {info.filename}: {e}")
+
+def collect_batch_documents(files: List[UploadFile]) -> List[Tuple[str, Callable[[], bytes]]]:
+    """List (filename, reader) pairs for uploaded files and the members of uploaded zip archives
+
+    Readers are called lazily, so zip members are only decompressed when their OCR slot opens.
+    """
+    documents = []
+    for upload in files:
+        if get_file_extension(upload.filename) == '.zip':
+            try:
+                archive = zipfile.ZipFile(upload.file)
+            except zipfile.BadZipFile:
+                raise ValueError(f"Invalid zip archive: {upload.filename}")
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                documents.append((info.filename, partial(read_zip_member, archive, info)))
+        else:
+            documents.append((upload.filename, partial(read_bounded, upload.file)))
+
+        if len(documents) > settings.batch_max_files:
+            raise ValueError(f"Too many documents in batch (maximum {settings.batch_max_files})")
+    return documents
+
+@router.post("/submit-batch")
+async def submit_aadhaar_batch(
+    files: List[UploadFile] = File(..., description="Aadhaar PDF/image files or zip archives of them"),
+    password: Optional[str] = Form(None, description="Password for protected PDF files"),
+    database = Depends(get_database)
+):
+    """
+    Upload and process many Aadhaar documents in one request
+    
+    - **files**: PDF or image files, or zip archives containing them
+    - **password**: Optional password applied to protected PDF files
+    
+    Streams one NDJSON line per document as soon as its OCR finishes, then
+    saves every extracted record with one bulk upsert and ends with a summary line
+    """
+    try:
+        documents = await asyncio.to_thread(collect_batch_documents, files)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not documents:
+        raise HTTPException(status_code=400, detail="No documents uploaded")
+
+    crud = get_aadhaar_crud(database)
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+    async def process_document(filename: str, reader: Callable[[], bytes]) -> dict:
+        async with semaphore:
+            try:
+                if get_file_extension(filename) not in ALLOWED_EXTENSIONS:
+                    raise ValueError(f"Unsupported file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}")
+                file_content = await asyncio.to_thread(reader)
+                if len(file_content) == 0:
+                    raise ValueError("Empty file uploaded")
+                await asyncio.to_thread(validate_document, file_content, filename)
+                aadhaar_data = await process_aadhaar_file(file_content, filename, password)
+                return {"filename": filename, "success": True, "aadhaar_number": aadhaar_data.aadhaar_number,
+                        "data": aadhaar_data}
+            except (ValueError, UploadTooLargeError) as e:
+                return {"filename": filename, "success": False, "error": str(e)}
+            except Exception as e:
+                logger.error(f"Unexpected error processing {filename} in batch: {str(e)}")
+                return {"filename": filename, "success": False, "error": "Internal error while processing the file"}
+
+    async def stream_results():
+        extracted = []
+        tasks = [asyncio.create_task(process_document(name, reader)) for name, reader in documents]
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                if result["success"]:
+                    extracted.append(result["data"])
+                    result["data"] = result["data"].model_dump()
+                yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        summary = {"total": len(documents), "succeeded": len(extracted),
+                   "failed": len(documents) - len(extracted), "saved": 0}
+        try:
+            if extracted:
+                saved = await crud.bulk_upsert(extracted)
+                summary.update(saved=saved["created"] + saved["updated"], created=saved["created"],
+                               updated=saved["updated"], save_failed=saved["failed"],
+                               rows_per_second=saved["rows_per_second"])
+                save_errors = [{"aadhaar_number": outcome["aadhaar_number"], "error": outcome["error"]}
+                               for outcome in saved["results"] if outcome["status"] == "failed"]
+                if save_errors:
+                    summary["save_errors"] = save_errors
+        except Exception as e:
+            logger.error(f"Error saving batch records: {str(e)}")
+            summary["error"] = "Failed to save Aadhaar data"
+        yield json.dumps({"summary": summary}) + "\n"
+
+    logger.info(f"Processing batch of {len(documents)} document(s)")
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.get("/export")
+async def export_aadhaar_records(
+    export_format: str = Query("ndjson", alias="format", description="ndjson, csv or parquet"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns (default: all)"),
+    since: Optional[datetime] = Query(None, description="Only records created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only records created before this time"),
+    compression: str = Query("none", description="none or zstd"),
+    database = Depends(get_database)
+):
+    """
+    Stream every stored record as NDJSON, CSV or Parquet
+
+    Records are read and encoded one batch (EXPORT_BATCH_SIZE rows) at a time, oldest first,
+    so memory use does not depend on the table size.
+    """
+    try:
+        exporter = RecordExporter(export_format, parse_columns(columns), compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    crud = get_aadhaar_crud(database)
+
+    async def stream_records():
+        try:
+            async for chunk in stream_export(crud.iter_export_batches(since, until, settings.export_batch_size), exporter):
+                yield chunk
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated download
+            logger.error(f"Error exporting Aadhaar records: {str(e)}")
+            raise
+
+    filename = f"aadhaar_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{exporter.file_extension}"
+    logger.info(f"Exporting Aadhaar records as {export_format} (compression: {compression})")
+    return StreamingResponse(
+        stream_records(),
+        media_type=exporter.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/search", response_model=dict)
+async def search_aadhaar_records(
+    q: str = Query(..., min_length=1, description="Words to find in the name, Tamil name, guardian name or address"),
+    limit: int = Query(10, ge=1),
+    cursor: Optional[str] = None,
+    database = Depends(get_database)
+):
+    """
+    Full-text search of stored records, best match first
+
+    - **q**: Every word must match the start of a word in the name, name_tamil, guardian_name or address
+    - **limit**: Maximum number of records to return (default: 10, capped by LIST_MAX_PAGE_SIZE)
+    - **cursor**: The next_cursor of the previous page; omit for the first page
+    """
+    try:
+        crud = get_aadhaar_crud(database)
+        result = await crud.search_records(q, min(limit, settings.list_max_page_size), cursor)
+
+        return {
+            "success": True,
+            "message": f"Found {len(result['data'])} records",
+            "data": result['data'],
+            "next_cursor": result['next_cursor']
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching Aadhaar records: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error occurred while searching records")
+
 @router.get("/{aadhaar_number}", response_model=AadhaarRetrievalResponse)
 async def get_aadhaar_data(
     aadhaar_number: str,
@@ -145,27 +435,36 @@ async def get_aadhaar_data(
 
 @router.get("/", response_model=dict)
 async def list_all_aadhaar_records(
-    limit: int = 10,
-    offset: int = 0,
+    limit: int = Query(10, ge=1),
+    cursor: Optional[str] = None,
+    offset: Optional[int] = Query(None, ge=0, deprecated=True, description="Replaced by cursor; only 0 is accepted"),
     database = Depends(get_database)
 ):
     """
-    List all Aadhaar records (for testing purposes)
+    List all Aadhaar records, newest first (for testing purposes)
 
-    - **limit**: Maximum number of records to return (default: 10)
-    - **offset**: Number of records to skip (default: 0)
+    - **limit**: Maximum number of records to return (default: 10, capped by LIST_MAX_PAGE_SIZE)
+    - **cursor**: The next_cursor of the previous page; omit for the first page
+    - **offset**: Deprecated. `offset=0` still returns the first page; any other offset
+      is rejected, pass the `next_cursor` of the previous page as `cursor` instead
     """
+    if offset:
+        raise HTTPException(status_code=400, detail="offset pagination is no longer supported; "
+                                                    "pass the next_cursor of the previous page as cursor")
     try:
         crud = get_aadhaar_crud(database)
-        result = await crud.list_all_records(limit, offset)
+        result = await crud.list_all_records(min(limit, settings.list_max_page_size), cursor)
 
         return {
             "success": True,
             "message": f"Retrieved {len(result['data'])} records",
             "data": result['data'],
-            "total_count": result['total_count']
+            "total_count": result['total_count'],
+            "next_cursor": result['next_cursor']
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing Aadhaar records: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error occurred while listing records")
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+import logging
+
+from app.core.job_queue import get_job_queue
+from app.schemas.aadhaar import JobStatusResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["OCR Jobs"])
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """
+    Get the status of an asynchronous OCR job
+    
+    - **job_id**: Id returned by `POST /api/form/submit?async=true`
+    
+    Returns the job status, and the stored Aadhaar data once the job is done
+    """
+    try:
+        job = await get_job_queue().get(job_id)
+    except Exception as e:
+        logger.error(f"Error retrieving job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error occurred while retrieving the job")
+
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job found with id: {job_id}")
+
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        filename=job["filename"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        result=job["result"],
+        error=job["error"]
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import Optional, Dict, Any
 from datetime import datetime
 import re
 
@@ -75,6 +75,22 @@ class AadhaarRetrievalResponse(BaseModel):
     message: str
     data: Optional[AadhaarData] = None
 
+class JobSubmissionResponse(BaseModel):
+    success: bool
+    message: str
+    job_id: str
+    status: str
+    status_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    filename: str
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
 class ErrorResponse(BaseModel):
     success: bool = False
     message: str
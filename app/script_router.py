@@ -0,0 +1,73 @@
+"""
+Script-aware OCR language routing
+Runs the fast primary-language model everywhere and re-reads only the lines it
+cannot read (low confidence) with the configured Indic language packs
+"""
+
+import logging
+from typing import List
+from PIL import Image
+
+from app.core.config import settings
+from app.core.ocr_pool import get_ocr_thread_pool
+from app.ocr_engine import OCRLine, ocr_image, ocr_image_lines, detect_script
+
+logger = logging.getLogger(__name__)
+
+SINGLE_LINE_PSM = 7
+
+# Tesseract OSD script names and the traineddata pack that reads them
+SCRIPT_LANGUAGES = {
+    "Tamil": "tam",
+    "Devanagari": "hin",
+    "Telugu": "tel",
+    "Kannada": "kan",
+    "Malayalam": "mal",
+    "Bengali": "ben",
+    "Gujarati": "guj",
+    "Gurmukhi": "pan",
+    "Oriya": "ori",
+}
+
+def _indic_language_for(image: Image.Image) -> str:
+    """Pick the Indic pack(s) to re-read a line with"""
+    languages = settings.get_ocr_indic_languages()
+    if len(languages) > 1:
+        detected = SCRIPT_LANGUAGES.get(detect_script(image) or "")
+        if detected in languages:
+            return detected
+    return "+".join(languages)
+
+def _is_primary_script(line: OCRLine) -> bool:
+    return line.confidence >= settings.ocr_script_confidence
+
+def _reread_line(image: Image.Image, line: OCRLine) -> str:
+    """OCR one low-confidence line with the Indic model"""
+    crop = image.crop(line.bbox)
+    lang = _indic_language_for(crop)
+    text = ocr_image(crop, lang=f"{lang}+{settings.ocr_primary_language}", psm=SINGLE_LINE_PSM).strip()
+    logger.debug(f"Re-read line with {lang}: {text!r}")
+    return text or line.text
+
+def ocr_image_routed(image: Image.Image, psm: int = 6) -> str:
+    """OCR an image in the primary language, routing non-Latin lines to Indic models"""
+    lines: List[OCRLine] = ocr_image_lines(image, lang=settings.ocr_primary_language, psm=psm)
+    if not settings.get_ocr_indic_languages():
+        return "\n".join(line.text for line in lines)
+
+    foreign = [i for i, line in enumerate(lines) if not _is_primary_script(line)]
+    if foreign:
+        pool = get_ocr_thread_pool("lines", settings.ocr_region_workers)
+        rereads = pool.map(lambda i: _reread_line(image, lines[i]), foreign)
+        texts = [line.text for line in lines]
+        for i, text in zip(foreign, rereads):
+            texts[i] = text
+        logger.info(f"Routed {len(foreign)} of {len(lines)} line(s) to Indic OCR")
+        return "\n".join(texts)
+
+    return "\n".join(line.text for line in lines)
+
+def ocr_regions_routed(regions: List[Image.Image], psm: int = SINGLE_LINE_PSM) -> List[str]:
+    """OCR several single-line regions concurrently, each with language routing"""
+    pool = get_ocr_thread_pool("regions", settings.ocr_region_workers)
+    return list(pool.map(lambda region: ocr_image_routed(region, psm=psm), regions))
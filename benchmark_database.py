@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent reads and writes against the local SQLite database
+Runs several worker processes (as `run.py prod` does) with a few threads each, and
+compares the old connect-per-call rollback-journal access with the persistent WAL
+connections of LocalDatabase: reads/s, writes/s and "database is locked" errors
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+from app.core.local_database import LocalDatabase, RECORD_FIELDS
+
+class LegacyLocalDatabase:
+    """The previous access pattern: a new connection per call, rollback journal"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS aadhaar_forms (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {', '.join(f'{field} TEXT' for field in RECORD_FIELDS)},
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(aadhaar_number)
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def create_record(self, data):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            f"INSERT INTO aadhaar_forms ({', '.join(RECORD_FIELDS)}, created_at, updated_at) "
+            f"VALUES ({', '.join('?' for _ in RECORD_FIELDS)}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)",
+            [data.get(field) for field in RECORD_FIELDS]
+        )
+        cursor.execute("SELECT * FROM aadhaar_forms WHERE id = ?", (cursor.lastrowid,))
+        record = dict(cursor.fetchone())
+        conn.commit()
+        conn.close()
+        return record
+
+    def get_by_aadhaar_number(self, aadhaar_number):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM aadhaar_forms WHERE aadhaar_number = ?", (aadhaar_number,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def update_record(self, aadhaar_number, data):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE aadhaar_forms SET {', '.join(f'{key} = ?' for key in data)}, "
+            f"updated_at = CURRENT_TIMESTAMP WHERE aadhaar_number = ?",
+            [*data.values(), aadhaar_number]
+        )
+        cursor.execute("SELECT * FROM aadhaar_forms WHERE aadhaar_number = ?", (aadhaar_number,))
+        record = cursor.fetchone()
+        conn.commit()
+        conn.close()
+        return dict(record) if record else None
+
+def make_number(n: int) -> str:
+    digits = f"{n:012d}"
+    return f"{digits[:4]} {digits[4:8]} {digits[8:]}"
+
+def make_record(n: int) -> dict:
+    return {"aadhaar_number": make_number(n), "name": f"Person {n}", "dob": "01/01/1990",
+            "gender": "Male", "address": f"{n} Main Road", "state": "Tamil Nadu", "pincode": "600001"}
+
+def open_database(kind: str, db_path: str):
+    return LegacyLocalDatabase(db_path) if kind == "legacy" else LocalDatabase(db_path)
+
+def worker(kind: str, db_path: str, worker_id: int, threads: int, seconds: float,
+           write_ratio: float, seeded: int, results):
+    """One API worker process: `threads` threads issuing mixed requests for `seconds`"""
+    db = open_database(kind, db_path)
+    counts = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def run(thread_id: int):
+        rng = random.Random(worker_id * 1000 + thread_id)
+        next_new = 10 ** 11 + (worker_id * 1000 + thread_id) * 10 ** 6
+        local = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+        while time.perf_counter() < deadline:
+            try:
+                if rng.random() < write_ratio:
+                    if rng.random() < 0.5:
+                        next_new += 1
+                        db.create_record(make_record(next_new))
+                    else:
+                        db.update_record(make_number(rng.randrange(seeded)), {"phone": f"{rng.randrange(10 ** 10):010d}"})
+                    local["writes"] += 1
+                else:
+                    db.get_by_aadhaar_number(make_number(rng.randrange(seeded)))
+                    local["reads"] += 1
+            except sqlite3.OperationalError as e:
+                local["locked" if "locked" in str(e) else "errors"] += 1
+            except Exception:
+                local["errors"] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    pool = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put(counts)
+
+def run_benchmark(kind: str, workers: int, threads: int, seconds: float, write_ratio: float, seeded: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="aadhaar-bench-")
+    db_path = os.path.join(directory, f"{kind}.db")
+    db = open_database(kind, db_path)
+    for n in range(seeded):
+        db.create_record(make_record(n))
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(kind, db_path, i, threads, seconds, write_ratio, seeded, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for process in processes:
+        process.join()
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SQLite concurrency benchmark")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (run.py prod uses 4)")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per worker")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of requests that write")
+    parser.add_argument("--records", type=int, default=1000, help="Records seeded before the run")
+    args = parser.parse_args()
+
+    print(f"📊 {args.workers} processes x {args.threads} threads, {args.seconds:.0f}s, "
+          f"{args.write_ratio:.0%} writes, {args.records} seeded records")
+    rates = {}
+    for kind in ("legacy", "pooled"):
+        totals = run_benchmark(kind, args.workers, args.threads, args.seconds, args.write_ratio, args.records)
+        rates[kind] = (totals["reads"] / args.seconds, totals["writes"] / args.seconds)
+        print(f"\n🔄 {kind}")
+        print(f"  reads/s: {rates[kind][0]:.0f}  writes/s: {rates[kind][1]:.0f}  "
+              f"'database is locked': {totals['locked']}  other errors: {totals['errors']}")
+
+    print(f"\n✅ pooled vs legacy: reads {rates['pooled'][0] / max(rates['legacy'][0], 1):.2f}x, "
+          f"writes {rates['pooled'][1] / max(rates['legacy'][1], 1):.2f}x")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark and fuzz check for the Aadhaar field extractor
+Compares parse_aadhaar_details with the previous multi-regex parser on sample
+and random OCR output, and checks that parsing time stays linear on
+pathological input
+"""
+
+import re
+import sys
+import time
+import random
+import logging
+import argparse
+
+from app.schemas.aadhaar import AadhaarDataCreate
+from app.ocr_parser import parse_aadhaar_details
+
+logging.disable(logging.INFO)
+
+SAMPLE_TEXTS = {
+    "e-aadhaar letter": """Unique Identification Authority of India
+Government of India
+Enrolment No.: 1111/22222/33333
+To
+ரவி குமார்
+Ravi Kumar
+S/O: Ramesh Kumar, 12, Main Road,
+Anna Nagar, Chennai
+PO: Anna Nagar
+District: Chennai
+State: Tamil Nadu
+600040
+9876543210
+Your Aadhaar No. :
+1234 5678 9012
+VID : 9123 4567 8901 2345
+ரவி குமார்
+Ravi Kumar
+பிறந்த நாள்/DOB: 01/01/1990
+ஆண்/ MALE
+1234 5678 9012
+Address:
+S/O: Ramesh Kumar, 12, Main Road,
+Anna Nagar, Chennai, Tamil Nadu
+600040
+Digitally signed by DS Unique
+""",
+    "card front": """Government of India
+Priya Sharma
+DOB: 15-08-1985
+Female
+2345 6789 0123
+""",
+    "card back": """Address: W/O Arun Sharma, 45 Lake View,
+Koramangala, VTC: Bengaluru, PO: Koramangala,
+Sub District: Bengaluru South, District: Bengaluru Urban,
+State: Karnataka, 560034
+""",
+}
+
+def legacy_extract_name_from_text(lines):
+    """Extract name from text lines with filtering"""
+    unwanted_phrases = [
+        "Digitally signed by DS Unique",
+        "Identification Authority of India",
+        "Government of India",
+        "Signature Not Verified",
+        "Date of Issue",
+        "Download Date"
+    ]
+
+    for line in lines:
+        clean_line = line.strip()
+        # Allow common characters in names (alphabets, spaces, apostrophes, hyphens)
+        if (
+            re.match(r'^[A-Za-z\s\'-]+$', clean_line)
+            and len(clean_line.split()) > 1
+            and all(phrase.lower() not in clean_line.lower() for phrase in unwanted_phrases)
+        ):
+            # Split on guardian prefixes (S/O, C/O, etc.) and take the first part
+            name_part = re.split(r'\s*(?:S/O|C/O|W/O|D/O)\s*', clean_line, flags=re.IGNORECASE)[0]
+            # Remove trailing single letters (C, W, S, D) followed by whitespace
+            name_part = re.sub(r'\s+[CWSD]\s*$', '', name_part).strip()
+            # Clean any extra spaces
+            name_part = re.sub(r'\s+', ' ', name_part)
+            if len(name_part) > 2:  # Ensure name is meaningful
+                return name_part
+    return ""
+
+def legacy_parse_aadhaar_details(text: str) -> AadhaarDataCreate:
+    """Previous multi-regex parser, kept as the reference for comparisons"""
+    try:
+        data = AadhaarDataCreate(
+            aadhaar_number="",
+            name=""
+        )
+        lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+        # Extract Aadhaar Number
+        aadhaar_match = re.search(r'\b(\d{4}\s\d{4}\s\d{4})\b', text)
+        if aadhaar_match:
+            data.aadhaar_number = aadhaar_match.group(1)
+        
+        # Extract VID (Virtual ID)
+        vid_match = re.search(r'VID[:\s]*(\d{4}\s\d{4}\s\d{4}\s\d{4})', text)
+        if vid_match:
+            data.vid = vid_match.group(1)
+
+        # Extract Name (Tamil and English)
+        tamil_name_match = re.search(r'([\u0B80-\u0BFF\s]+)\n([A-Za-z\s\'-]+)', text)
+        if tamil_name_match:
+            data.name_tamil = tamil_name_match.group(1).strip()
+            data.name = tamil_name_match.group(2).strip().replace("\n", " ")
+            # Process to remove guardian prefixes and trailing letters
+            data.name = re.split(r'\s*(?:S/O|C/O|W/O|D/O)\s*', data.name, flags=re.IGNORECASE)[0].strip()
+            data.name = re.sub(r'\s+[CWSD]\s*$', '', data.name).strip()
+            data.name = re.sub(r'\s+', ' ', data.name)
+        
+        # **Backup:** If English name is still missing, find the first proper English name
+        if not data.name:
+            data.name = legacy_extract_name_from_text(lines)
+
+        # Extract Guardian Name (S/O, W/O, C/O, D/O)
+        guardian_match = re.search(r'(S/o|C/o|D/o|W/o)[.:]?\s*([A-Za-z\s\'-]+)', text, re.IGNORECASE)
+        if guardian_match:
+            data.guardian_name = guardian_match.group(2).strip()
+
+        # Extract DOB
+        dob_match = re.search(r'(DOB|Date of Birth|D\.O\.B)[:\s]*?(\d{1,2}[-/]\d{1,2}[-/]\d{4})', text, re.IGNORECASE)
+        if dob_match:
+            data.dob = dob_match.group(2).replace('-', '/')
+
+        # Extract Gender
+        gender_match = re.search(r'\b(Male|Female|Transgender|M|F|T)\b', text, re.IGNORECASE)
+        if gender_match:
+            gender = gender_match.group(1).capitalize()
+            if gender in ['M']:
+                data.gender = 'Male'
+            elif gender in ['F']:
+                data.gender = 'Female'
+            elif gender in ['T']:
+                data.gender = 'Transgender'
+            else:
+                data.gender = gender
+
+        # Extract Address
+        address_match = re.search(r'(?i)address[:\s]*(.*?)(?=\nDistrict|\nState|\n\d{6}|\nVID|\nDigitally|$)', text, re.DOTALL)
+        if address_match:
+            address_text = re.sub(r'(S/o|C/o|D/o|W/o)[.:]?\s*[A-Za-z\s\'-]+', '', address_match.group(1).strip(), flags=re.IGNORECASE)
+            address_text = re.sub(r'\b\d{4}\s\d{4}\s\d{4}\b', '', address_text)
+            address_text = re.sub(r'PO:.*?,', '', address_text)
+            address_text = re.sub(r'(?i)\b(dist|state)\b.*', '', address_text)
+            address_text = re.sub(r'\n+', ' ', address_text).strip()
+            address_text = re.sub(r'\s+', ' ', address_text).strip()
+            data.address = address_text.lstrip(',').strip()
+
+        # Extract VTC (Village/Town/City)
+        vtc_match = re.search(r'VTC[:\s]*(.*)', text, re.IGNORECASE)
+        if vtc_match:
+            data.vtc = vtc_match.group(1).strip()
+        
+        # Extract PO (Post Office)
+        po_match = re.search(r'PO[:\s]*(.*)', text, re.IGNORECASE)
+        if po_match:
+            data.po = po_match.group(1).strip()
+        
+        # Extract Sub District
+        sub_district_match = re.search(r'Sub District[:\s]*(.*)', text, re.IGNORECASE)
+        if sub_district_match:
+            data.sub_district = sub_district_match.group(1).strip()
+
+        # Extract District
+        district_match = re.search(r'District[:\s]*(.*)', text, re.IGNORECASE)
+        if district_match:
+            data.district = district_match.group(1).strip().replace(',', '')
+        
+        # Extract State
+        state_match = re.search(r'State[:\s]*(.*)', text, re.IGNORECASE)
+        if state_match:
+            data.state = state_match.group(1).strip()
+
+        # Extract Pincode
+        pincode_match = re.search(r'\b(\d{6})\b', text)
+        if pincode_match:
+            data.pincode = pincode_match.group(1)
+
+        # Extract Phone Number
+        phone_match = re.search(r'\b(\d{10})\b', text)
+        if phone_match:
+            data.phone = phone_match.group(1)
+
+        return data
+    
+    except Exception:
+        raise
+
+def compare_samples() -> bool:
+    """Check that both parsers agree on the sample texts"""
+    ok = True
+    for label, text in SAMPLE_TEXTS.items():
+        new = parse_aadhaar_details(text).model_dump()
+        old = legacy_parse_aadhaar_details(text).model_dump()
+        diffs = {k: (old[k], new[k]) for k in new if old[k] != new[k]}
+        if diffs:
+            ok = False
+            print(f"⚠️  {label}: fields differ (old, new): {diffs}")
+        else:
+            print(f"✅ {label}: identical ({new['aadhaar_number']}, {new['name']})")
+    return ok
+
+def time_call(func, text: str, runs: int) -> float:
+    """Best-of-runs time for one call in milliseconds"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def microbenchmark(runs: int):
+    """Per-call latency of both parsers on each sample"""
+    print("\n📊 Parse latency (best of %d)" % runs)
+    for label, text in SAMPLE_TEXTS.items():
+        old_ms = time_call(legacy_parse_aadhaar_details, text, runs)
+        new_ms = time_call(parse_aadhaar_details, text, runs)
+        print(f"  {label:18s} old {old_ms * 1000:8.1f} µs   new {new_ms * 1000:8.1f} µs   ({old_ms / new_ms:.1f}x)")
+
+def pathological_inputs(size: int, rng: random.Random) -> dict:
+    """OCR-like garbage that makes backtracking regexes blow up"""
+    tamil = "".join(chr(c) for c in range(0x0B85, 0x0B95))
+    return {
+        "whitespace run": " " * size + "x",
+        "tamil and spaces": "".join(rng.choice(tamil + "  ") for _ in range(size)) + "1",
+        "repeated PO:": "Address: " + "PO:" * (size // 3),
+        "address without end": "address" + ":\n" * (size // 2),
+        "guardian chain": "S/o " * (size // 4),
+        "long single line": "".join(rng.choice("abcdefghij 0123456789:/-") for _ in range(size)),
+        "many short lines": "\n".join(rng.choice(["VID", "DOB", "PO", "S/O", "ஆ", " ", "1234"]) for _ in range(size // 3)),
+    }
+
+OCR_TOKENS = (
+    "VID", "VID :", "S/O:", "C/o", "W/O.", "d/o", "DOB:", "Date of Birth", "D.O.B", "Address:",
+    "address", "VTC:", "PO:", "Sub District:", "District", "State:", "Digitally signed by DS Unique",
+    "Government of India", "Ravi Kumar", "Priya", "Sharma", "Anna Nagar", "ரவி", "குமார்", "ஆண்/",
+    "1234 5678 9012", "9123 4567 8901 2345", "600040", "9876543210", "01/02/1990", "15-08-1985",
+    "Male", "FEMALE", "M", "T", ",", ":", "-", "12,", "Report", "Statement",
+)
+OCR_SEPARATORS = (" ", "", ", ", "  ", "\n", "\t")
+
+def random_ocr_text(rng: random.Random, max_lines: int = 12) -> str:
+    """OCR-like text built from Aadhaar labels, values and noise, for differential checks"""
+    lines = []
+    for _ in range(rng.randint(1, max_lines)):
+        tokens = [rng.choice(OCR_TOKENS) for _ in range(rng.randint(0, 4))]
+        line = ""
+        for token in tokens:
+            line += rng.choice(OCR_SEPARATORS) + token
+        lines.append(rng.choice(("", " ", "  ")) + line + rng.choice(("", " ", ":")))
+    return "\n".join(lines) + rng.choice(("", "\n"))
+
+def differential(count: int, seed: int) -> bool:
+    """Parse random OCR-like texts with both parsers; every field must agree"""
+    rng = random.Random(seed)
+    mismatches = {}
+    for _ in range(count):
+        text = random_ocr_text(rng)
+        new = parse_aadhaar_details(text).model_dump()
+        old = legacy_parse_aadhaar_details(text).model_dump()
+        for field in new:
+            if old[field] != new[field]:
+                mismatches.setdefault(field, repr(text))
+    print(f"\n🔀 Differential: {count} random texts (seed {seed})")
+    for field, text in mismatches.items():
+        print(f"❌ {field} differs, e.g. on {text}")
+    if not mismatches:
+        print("✅ all fields identical")
+    return not mismatches
+
+def fuzz(size: int, seed: int) -> bool:
+    """Parse pathological inputs of size n and 4n; time must grow roughly linearly"""
+    rng = random.Random(seed)
+    small = pathological_inputs(size, rng)
+    large = pathological_inputs(size * 4, rng)
+    ok = True
+    print(f"\n🧪 Fuzz: n={size} vs 4n")
+    for label in small:
+        try:
+            t_small = time_call(parse_aadhaar_details, small[label], 3)
+            t_large = time_call(parse_aadhaar_details, large[label], 3)
+        except Exception as e:
+            print(f"❌ {label}: raised {e!r}")
+            ok = False
+            continue
+        ratio = t_large / max(t_small, 1e-6)
+        # Linear work gives ~4x; quadratic would give ~16x
+        status = "✅" if ratio < 8 else "❌"
+        ok = ok and ratio < 8
+        print(f"{status} {label:20s} {t_small:8.2f} ms -> {t_large:8.2f} ms  ({ratio:.1f}x)")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Aadhaar field extractor benchmark")
+    parser.add_argument("--runs", type=int, default=200, help="Timed runs per sample")
+    parser.add_argument("--fuzz-size", type=int, default=20000, help="Base size of fuzz inputs")
+    parser.add_argument("--seed", type=int, default=1234, help="Fuzz random seed")
+    parser.add_argument("--diff-count", type=int, default=5000, help="Random texts for the differential check")
+    args = parser.parse_args()
+
+    same = compare_samples()
+    microbenchmark(args.runs)
+    agree = differential(args.diff_count, args.seed)
+    linear = fuzz(args.fuzz_size, args.seed)
+    return 0 if same and agree and linear else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark worker cold start and memory with and without the preloaded OCR stack
+Starts N workers the way `run.py prod` does (fresh interpreters that each import and
+warm the OCR stack) and the way `run.py prod --preload` does (forked from a parent
+that warmed it once), then reports per-worker start-up time, RSS and PSS
+"""
+
+import sys
+import time
+import argparse
+import multiprocessing
+
+from app.core.warmup import warm_ocr_stack, process_memory_mb
+
+def worker(results, release):
+    """Warm the OCR stack, report timing and memory, then stay alive until measured"""
+    before = process_memory_mb()
+    start = time.perf_counter()
+    warm_ocr_stack()
+    elapsed = time.perf_counter() - start
+    after = process_memory_mb()
+    results.put({"pid": multiprocessing.current_process().pid, "seconds": elapsed,
+                 "rss_before": before["rss"], "rss_after": after["rss"]})
+    release.wait()
+
+def run_workers(method: str, count: int) -> list:
+    """Start `count` workers with the given start method and measure them while all are alive"""
+    context = multiprocessing.get_context(method)
+    results = context.Queue()
+    release = context.Event()
+    processes = [context.Process(target=worker, args=(results, release)) for _ in range(count)]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    all_ready = time.perf_counter() - start
+
+    # PSS is only meaningful while every worker sharing the pages is alive
+    for report in reports:
+        report["pss"] = process_memory_mb(str(report["pid"]))["pss"]
+
+    release.set()
+    for process in processes:
+        process.join()
+
+    print(f"  all {count} workers warm after {all_ready:.2f}s")
+    return reports
+
+def print_reports(reports: list):
+    print(f"  {'pid':>7} {'warm-up s':>10} {'RSS before':>11} {'RSS after':>10} {'PSS':>8}")
+    for report in reports:
+        pss = f"{report['pss']:.1f}" if report["pss"] is not None else "n/a"
+        print(f"  {report['pid']:>7} {report['seconds']:>10.3f} {report['rss_before']:>10.1f}M "
+              f"{report['rss_after']:>9.1f}M {pss:>7}M")
+    pss_values = [report["pss"] for report in reports if report["pss"] is not None]
+    if pss_values:
+        print(f"  total PSS: {sum(pss_values):.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold start and memory benchmark")
+    parser.add_argument("--workers", type=int, default=4, help="Workers to start (run.py prod uses 4)")
+    args = parser.parse_args()
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        print("❌ Preload mode needs fork, which this platform does not support")
+        return 1
+
+    print(f"🥶 Cold: {args.workers} fresh interpreters, each importing and warming the OCR stack")
+    cold = run_workers("spawn", args.workers)
+    print_reports(cold)
+
+    print(f"\n🔥 Preloaded: parent warms once, then forks {args.workers} workers")
+    parent_before = process_memory_mb()["rss"]
+    start = time.perf_counter()
+    warm_ocr_stack()
+    print(f"  parent warm-up: {time.perf_counter() - start:.2f}s "
+          f"(RSS {parent_before:.1f} -> {process_memory_mb()['rss']:.1f} MB)")
+    preloaded = run_workers("fork", args.workers)
+    print_reports(preloaded)
+
+    cold_start = max(report["seconds"] for report in cold)
+    warm_start = max(report["seconds"] for report in preloaded)
+    print(f"\n✅ Slowest worker warm-up: {cold_start:.3f}s cold vs {warm_start:.3f}s preloaded")
+    cold_pss = [report["pss"] for report in cold if report["pss"] is not None]
+    warm_pss = [report["pss"] for report in preloaded if report["pss"] is not None]
+    if cold_pss and warm_pss:
+        print(f"✅ Total worker PSS: {sum(cold_pss):.1f} MB cold vs {sum(warm_pss):.1f} MB preloaded")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,8 @@ import requests
 import json
 from dotenv import load_dotenv
 
+from app.core.init_db import CREATE_SEARCH_INDEX, CREATE_BULK_UPSERT_FUNCTION
+
 # Load environment variables
 load_dotenv()
 
@@ -63,6 +65,7 @@ CREATE TABLE IF NOT EXISTS aadhaar_forms (
 CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_aadhaar_number ON aadhaar_forms(aadhaar_number);
 CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_vid ON aadhaar_forms(vid);
 CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_created_at ON aadhaar_forms(created_at);
+CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_created_at_id ON aadhaar_forms(created_at, id);
 
 -- Create a function to automatically update the updated_at column
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -79,7 +82,7 @@ CREATE TRIGGER update_aadhaar_forms_updated_at
     BEFORE UPDATE ON aadhaar_forms
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
-"""
+""" + CREATE_SEARCH_INDEX + CREATE_BULK_UPSERT_FUNCTION
     
     print("🔄 Creating database table in Supabase...")
     
@@ -161,65 +164,9 @@ def test_database_connection(supabase_url, supabase_key):
 
 def migrate_local_data_to_supabase(supabase_url, supabase_key):
     """Migrate existing local data to Supabase"""
-    try:
-        print("\n🔄 Migrating local data to Supabase...")
-        
-        # Import local database
-        import sqlite3
-        from supabase import create_client
-        
-        # Connect to local database
-        local_conn = sqlite3.connect('aadhaar_data.db')
-        local_conn.row_factory = sqlite3.Row
-        local_cursor = local_conn.cursor()
-        
-        # Get all records from local database
-        local_cursor.execute("SELECT * FROM aadhaar_forms")
-        local_records = local_cursor.fetchall()
-        
-        if not local_records:
-            print("📭 No local data to migrate.")
-            local_conn.close()
-            return True
-        
-        # Connect to Supabase
-        supabase = create_client(supabase_url, supabase_key)
-        
-        migrated_count = 0
-        skipped_count = 0
-        
-        for record in local_records:
-            try:
-                # Convert record to dict and remove id (let Supabase auto-generate)
-                data = dict(record)
-                data.pop('id', None)  # Remove local ID
-                
-                # Insert into Supabase
-                result = supabase.table('aadhaar_forms').insert(data).execute()
-                
-                if result.data:
-                    migrated_count += 1
-                    print(f"✅ Migrated: {data.get('aadhaar_number', 'Unknown')}")
-                else:
-                    skipped_count += 1
-                    print(f"⚠️  Skipped: {data.get('aadhaar_number', 'Unknown')} (may already exist)")
-                    
-            except Exception as e:
-                skipped_count += 1
-                aadhaar_num = dict(record).get('aadhaar_number', 'Unknown')
-                print(f"⚠️  Skipped: {aadhaar_num} - {str(e)}")
-        
-        local_conn.close()
-        
-        print(f"\n📊 Migration Summary:")
-        print(f"✅ Migrated: {migrated_count} records")
-        print(f"⚠️  Skipped: {skipped_count} records")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Migration failed: {e}")
-        return False
+    # Streams, batches and checkpoints; see migrate_to_supabase.py
+    from migrate_to_supabase import run_migration
+    return run_migration(supabase_url, supabase_key, 'aadhaar_data.db')
 
 def main():
     """Main function"""
@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for preload mode (python run.py prod --preload)
+The master imports the app and warms the OCR stack once, then forks the
+Uvicorn workers so they share that memory copy-on-write
+"""
+
+import os
+import logging
+
+# Set before the app's settings are loaded: each worker sizes its OCR pool to its
+# share of the CPU cores (OCR_POOL_SIZE overrides this)
+os.environ.setdefault("WEB_CONCURRENCY", "4")
+
+from app.core.warmup import preload_ocr_stack, process_memory_mb  # noqa: E402
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.environ["WEB_CONCURRENCY"])
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+logger = logging.getLogger("gunicorn.error")
+
+def on_starting(server):
+    """Runs once in the master, after the app was imported and before any fork"""
+    preload_ocr_stack()
+
+def post_fork(server, worker):
+    memory = process_memory_mb()
+    logger.info(f"Worker {worker.pid} forked from the preloaded master (RSS {memory['rss']:.0f} MB)")
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Migrate the local SQLite database to Supabase
+Reads the local table in id order, a chunk at a time, and sends chunked array upserts
+(on aadhaar_number) several at a time over one keep-alive connection pool. Progress is
+checkpointed after every chunk, so an interrupted migration resumes where it stopped,
+and a later run only sends rows added or updated since the previous one.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from postgrest.exceptions import APIError
+
+from app.core.config import settings
+from app.core.local_database import RECORD_FIELDS
+from app.core.supabase_client import SupabaseRestClient
+
+TABLE_NAME = "aadhaar_forms"
+# Local columns copied to Supabase; the local id is not, Supabase assigns its own
+MIGRATED_COLUMNS = RECORD_FIELDS + ["created_at", "updated_at"]
+RETRIES = 3
+
+def load_checkpoint(path: str, db_path: str) -> Dict[str, Any]:
+    """Checkpoint of the previous run, or a fresh one"""
+    fresh = {
+        "source": os.path.abspath(db_path),
+        "cursor_id": 0,          # rows up to this id are done in the current pass
+        "pass_watermark": None,  # MAX(updated_at) when the current pass started
+        "watermark": None,       # updated_at covered by the last completed pass
+        "max_id": 0,             # highest id copied by the last completed pass
+        "failed": {},            # id -> error of rows that could not be sent
+        "migrated": 0,
+        "updated_at": None,
+    }
+    if not os.path.exists(path):
+        return fresh
+
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("source") != fresh["source"]:
+        raise ValueError(f"Checkpoint {path} belongs to {checkpoint.get('source')}, not {fresh['source']}")
+    return {**fresh, **checkpoint}
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    """Write the checkpoint atomically, so a crash never leaves a partial file"""
+    checkpoint["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+class LocalReader:
+    """Reads pending rows in id order with short keyset queries, so the running app
+    keeps writing and checkpointing its WAL while the migration runs"""
+
+    def __init__(self, db_path: str, checkpoint: Dict[str, Any]):
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        watermark = checkpoint["watermark"]
+        # First pass: every row. Later passes: rows added or updated since the last one
+        if watermark is None:
+            self.filter, self.params = "", []
+        else:
+            self.filter, self.params = "AND (id > ? OR updated_at >= ?)", [checkpoint["max_id"], watermark]
+
+    def count_pending(self, after_id: int) -> int:
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM {TABLE_NAME} WHERE id > ? {self.filter}", [after_id, *self.params]
+        ).fetchone()[0]
+
+    def max_updated_at(self) -> Optional[str]:
+        return self.conn.execute(f"SELECT MAX(updated_at) FROM {TABLE_NAME}").fetchone()[0]
+
+    def read_chunk(self, after_id: int, size: int) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            f"SELECT id, {', '.join(MIGRATED_COLUMNS)} FROM {TABLE_NAME} "
+            f"WHERE id > ? {self.filter} ORDER BY id LIMIT ?",
+            [after_id, *self.params, size]
+        ).fetchall()
+
+    def read_ids(self, ids: List[int]) -> List[sqlite3.Row]:
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows.extend(self.conn.execute(
+                f"SELECT id, {', '.join(MIGRATED_COLUMNS)} FROM {TABLE_NAME} "
+                f"WHERE id IN ({', '.join('?' for _ in chunk)}) ORDER BY id", chunk
+            ).fetchall())
+        return rows
+
+    def close(self):
+        self.conn.close()
+
+def to_payload(row: sqlite3.Row) -> Dict[str, Any]:
+    return {column: row[column] for column in MIGRATED_COLUMNS}
+
+def is_row_error(error: Exception) -> bool:
+    """Data or constraint violations (SQLSTATE class 22/23) are caused by a row and
+    will not go away on retry; anything else is a transport or server problem"""
+    return isinstance(error, APIError) and str(error.code or "")[:2] in ("22", "23")
+
+async def upsert_rows(client: SupabaseRestClient, rows: List[sqlite3.Row]) -> Dict[int, str]:
+    """Upsert rows as one request, retrying transient errors with backoff. A chunk a row
+    rejects is split into single rows; returns id -> error for the rejected rows.
+    Raises if Supabase keeps failing, so the run stops at its last checkpoint."""
+    payload = [to_payload(row) for row in rows]
+    for attempt in range(RETRIES):
+        try:
+            await client.table(TABLE_NAME).upsert(payload, on_conflict="aadhaar_number").execute()
+            return {}
+        except Exception as e:
+            if is_row_error(e):
+                error = e
+                break
+            if attempt == RETRIES - 1:
+                raise
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+    if len(rows) == 1:
+        return {rows[0]["id"]: str(error)}
+
+    failed: Dict[int, str] = {}
+    for row in rows:
+        failed.update(await upsert_rows(client, [row]))
+    return failed
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.start = time.perf_counter()
+        self.last_report = 0.0
+
+    def advance(self, rows: int, force: bool = False):
+        self.done += rows
+        now = time.perf_counter()
+        if not force and now - self.last_report < 1.0:
+            return
+        self.last_report = now
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = (self.total - self.done) / rate if rate > 0 else 0.0
+        percent = self.done / self.total * 100 if self.total else 100.0
+        print(f"🔄 {self.done}/{self.total} rows ({percent:.1f}%), {rate:.0f} rows/s, ~{remaining:.0f}s left")
+
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+async def migrate(supabase_url: str, supabase_key: str, db_path: str = "aadhaar_data.db",
+                  checkpoint_path: str = "migration_checkpoint.json", chunk_size: int = settings.bulk_upsert_chunk_size,
+                  concurrency: int = settings.bulk_upsert_concurrency, restart: bool = False) -> Dict[str, Any]:
+    """Copy pending local rows to Supabase; returns a summary"""
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = load_checkpoint(checkpoint_path, db_path)
+    reader = LocalReader(db_path, checkpoint)
+    client = SupabaseRestClient(supabase_url, supabase_key)
+    in_flight: List[tuple] = []
+
+    try:
+        if checkpoint["pass_watermark"] is None:
+            # Rows updated while this pass runs are picked up by the next one
+            checkpoint["pass_watermark"] = reader.max_updated_at()
+            save_checkpoint(checkpoint_path, checkpoint)
+
+        retry_ids = sorted(int(row_id) for row_id in checkpoint["failed"])
+        progress = Progress(reader.count_pending(checkpoint["cursor_id"]) + len(retry_ids))
+        if checkpoint["cursor_id"]:
+            print(f"⏩ Resuming after id {checkpoint['cursor_id']}")
+        print(f"📊 {progress.total} rows to migrate "
+              f"({chunk_size} per request, {concurrency} requests in flight)")
+
+        # Rows that failed last time go first
+        if retry_ids:
+            rows = reader.read_ids(retry_ids)
+            checkpoint["failed"] = {}
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                failed = await upsert_rows(client, chunk)
+                checkpoint["failed"].update({str(row_id): error for row_id, error in failed.items()})
+                checkpoint["migrated"] += len(chunk) - len(failed)
+                progress.advance(len(chunk))
+            save_checkpoint(checkpoint_path, checkpoint)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(chunk: List[sqlite3.Row]) -> Dict[int, str]:
+            try:
+                return await upsert_rows(client, chunk)
+            finally:
+                semaphore.release()
+
+        # Chunks finish out of order; the checkpoint only moves past a chunk once
+        # every chunk before it is done too
+        after_id = checkpoint["cursor_id"]
+        max_id = checkpoint["max_id"]
+        exhausted = False
+        while not exhausted or in_flight:
+            if not exhausted:
+                await semaphore.acquire()
+                chunk = await asyncio.to_thread(reader.read_chunk, after_id, chunk_size)
+                if chunk:
+                    after_id = chunk[-1]["id"]
+                    max_id = max(max_id, after_id)
+                    in_flight.append((asyncio.create_task(send(chunk)), chunk))
+                else:
+                    semaphore.release()
+                    exhausted = True
+
+            while in_flight and (in_flight[0][0].done() or exhausted):
+                task, chunk = in_flight.pop(0)
+                failed = await task
+                checkpoint["failed"].update({str(row_id): error for row_id, error in failed.items()})
+                checkpoint["migrated"] += len(chunk) - len(failed)
+                checkpoint["cursor_id"] = chunk[-1]["id"]
+                save_checkpoint(checkpoint_path, checkpoint)
+                progress.advance(len(chunk))
+
+        # Pass complete: the next run only sends what changes after this point
+        checkpoint.update(cursor_id=0, watermark=checkpoint["pass_watermark"] or checkpoint["watermark"],
+                          pass_watermark=None, max_id=max_id)
+        save_checkpoint(checkpoint_path, checkpoint)
+        progress.advance(0, force=True)
+
+        return {
+            "sent": progress.done,
+            "failed": len(checkpoint["failed"]),
+            "migrated_total": checkpoint["migrated"],
+            "seconds": round(time.perf_counter() - progress.start, 2),
+            "rows_per_second": round(progress.rows_per_second(), 1),
+            "checkpoint": checkpoint_path,
+        }
+    finally:
+        for task, _ in in_flight:
+            task.cancel()
+        await asyncio.gather(*(task for task, _ in in_flight), return_exceptions=True)
+        reader.close()
+        await client.aclose()
+
+def run_migration(supabase_url: str, supabase_key: str, db_path: str = "aadhaar_data.db", **options) -> bool:
+    """Run the migration and print its summary; returns False if it failed"""
+    print("\n🔄 Migrating local data to Supabase...")
+    try:
+        summary = asyncio.run(migrate(supabase_url, supabase_key, db_path, **options))
+    except KeyboardInterrupt:
+        print("\n⏸️  Migration interrupted, run it again to resume")
+        return False
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        print("Run it again to resume from the last checkpoint")
+        return False
+
+    print("\n📊 Migration Summary:")
+    print(f"✅ Sent: {summary['sent']} rows in {summary['seconds']}s ({summary['rows_per_second']} rows/s)")
+    if summary["failed"]:
+        print(f"⚠️  Failed: {summary['failed']} rows (see {summary['checkpoint']}, retried on the next run)")
+    return summary["failed"] == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the local SQLite database to Supabase")
+    parser.add_argument("--db", default="aadhaar_data.db", help="Local SQLite database")
+    parser.add_argument("--checkpoint", default="migration_checkpoint.json", help="Resumable progress file")
+    parser.add_argument("--chunk-size", type=int, default=settings.bulk_upsert_chunk_size, help="Rows per upsert request")
+    parser.add_argument("--concurrency", type=int, default=settings.bulk_upsert_concurrency, help="Upsert requests in flight")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and copy every row again")
+    args = parser.parse_args()
+
+    if not settings.supabase_url or not settings.supabase_key:
+        print("❌ SUPABASE_URL and SUPABASE_KEY must be set in .env")
+        return 1
+    if not os.path.exists(args.db):
+        print(f"📭 No local database found at {args.db}")
+        return 0
+
+    ok = run_migration(settings.supabase_url, settings.supabase_key, args.db, checkpoint_path=args.checkpoint,
+                       chunk_size=args.chunk_size, concurrency=args.concurrency, restart=args.restart)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,21 +25,52 @@ def run_development():
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to start application: {e}")
 
-def run_production():
+def run_production(preload: bool = False):
     """Run the application in production mode"""
+    if preload:
+        run_production_preloaded()
+        return
+
     print("🚀 Starting Aadhaar OCR API in production mode...")
+    # The workers read it too, to split the CPU cores between their OCR pools
+    workers = os.getenv("WEB_CONCURRENCY", "4")
     try:
         subprocess.run([
             sys.executable, "-m", "uvicorn", 
             "app.main:app", 
             "--host", "0.0.0.0", 
             "--port", "8000",
-            "--workers", "4"
+            "--workers", workers
+        ], check=True, env={**os.environ, "WEB_CONCURRENCY": workers})
+    except KeyboardInterrupt:
+        print("\n👋 Application stopped by user")
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Failed to start application: {e}")
+
+def run_production_preloaded():
+    """Run production workers forked from a master that has already warmed the OCR stack"""
+    print("🚀 Starting Aadhaar OCR API in production mode (preloaded OCR stack)...")
+    try:
+        subprocess.run([
+            sys.executable, "-m", "gunicorn",
+            "app.main:app",
+            "--config", "gunicorn_conf.py"
         ], check=True)
     except KeyboardInterrupt:
         print("\n👋 Application stopped by user")
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to start application: {e}")
+        print("Preload mode needs gunicorn: pip install gunicorn")
+
+def run_worker():
+    """Run OCR job workers without the API"""
+    print("⚙️  Starting Aadhaar OCR job worker...")
+    try:
+        subprocess.run([sys.executable, "-m", "app.job_worker"], check=True)
+    except KeyboardInterrupt:
+        print("\n👋 Job worker stopped by user")
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Failed to start job worker: {e}")
 
 def run_docker():
     """Run the application using Docker"""
@@ -60,6 +91,18 @@ def show_database_setup():
         print("❌ Could not import database setup module")
         print("Make sure you have installed the dependencies: pip install -r requirements.txt")
 
+def run_migration(restart: bool = False):
+    """Copy the local SQLite data to Supabase, resuming from the last checkpoint"""
+    command = [sys.executable, "migrate_to_supabase.py"]
+    if restart:
+        command.append("--restart")
+    try:
+        subprocess.run(command, check=True)
+    except KeyboardInterrupt:
+        pass
+    except subprocess.CalledProcessError:
+        print("❌ Migration did not complete, run it again to resume")
+
 def check_health():
     """Check if the application is running"""
     import requests
@@ -77,20 +120,34 @@ def main():
     parser = argparse.ArgumentParser(description="Aadhaar OCR API Runner")
     parser.add_argument(
         "command", 
-        choices=["dev", "prod", "docker", "db-setup", "health"],
+        choices=["dev", "prod", "worker", "docker", "db-setup", "migrate", "health"],
         help="Command to run"
     )
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="prod: warm the OCR stack once and fork workers from it (needs gunicorn)"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="migrate: ignore the checkpoint and copy every row again"
+    )
     
     args = parser.parse_args()
     
     if args.command == "dev":
         run_development()
     elif args.command == "prod":
-        run_production()
+        run_production(args.preload)
+    elif args.command == "worker":
+        run_worker()
     elif args.command == "docker":
         run_docker()
     elif args.command == "db-setup":
         show_database_setup()
+    elif args.command == "migrate":
+        run_migration(args.restart)
     elif args.command == "health":
         check_health()
 
@@ -15,6 +15,7 @@ def setup_database():
     """Automatically set up the database table in Supabase"""
     try:
         from supabase import create_client
+        from app.core.init_db import CREATE_SEARCH_INDEX, CREATE_BULK_UPSERT_FUNCTION
         
         # Get Supabase credentials
         supabase_url = os.getenv("SUPABASE_URL")
@@ -56,6 +57,7 @@ def setup_database():
         CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_aadhaar_number ON aadhaar_forms(aadhaar_number);
         CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_vid ON aadhaar_forms(vid);
         CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_created_at ON aadhaar_forms(created_at);
+        CREATE INDEX IF NOT EXISTS idx_aadhaar_forms_created_at_id ON aadhaar_forms(created_at, id);
 
         -- Create a function to automatically update the updated_at column
         CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -72,7 +74,7 @@ def setup_database():
             BEFORE UPDATE ON aadhaar_forms
             FOR EACH ROW
             EXECUTE FUNCTION update_updated_at_column();
-        """
+        """ + CREATE_SEARCH_INDEX + CREATE_BULK_UPSERT_FUNCTION
         
         print("📊 Creating database table and indexes...")
         
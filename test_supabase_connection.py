@@ -4,7 +4,6 @@ Test Supabase database connection and migrate local data
 """
 
 import os
-import sqlite3
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,70 +32,19 @@ def test_supabase_connection():
 
 def migrate_local_to_supabase():
     """Migrate local SQLite data to Supabase"""
-    try:
-        # Test Supabase connection first
-        supabase = test_supabase_connection()
-        if not supabase:
-            return False
-        
-        # Check if local database exists
-        if not os.path.exists('aadhaar_data.db'):
-            print("📭 No local database found to migrate.")
-            return True
-        
-        print("\n🔄 Migrating local data to Supabase...")
-        
-        # Connect to local database
-        conn = sqlite3.connect('aadhaar_data.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Get all records
-        cursor.execute("SELECT * FROM aadhaar_forms")
-        records = cursor.fetchall()
-        
-        if not records:
-            print("📭 No local data to migrate.")
-            conn.close()
-            return True
-        
-        print(f"📊 Found {len(records)} records to migrate...")
-        
-        migrated = 0
-        skipped = 0
-        
-        for record in records:
-            try:
-                # Convert to dict and remove local ID
-                data = dict(record)
-                data.pop('id', None)  # Let Supabase auto-generate ID
-                
-                # Insert into Supabase
-                result = supabase.table('aadhaar_forms').insert(data).execute()
-                
-                if result.data:
-                    migrated += 1
-                    print(f"✅ Migrated: {data.get('name', 'Unknown')} ({data.get('aadhaar_number', 'N/A')})")
-                else:
-                    skipped += 1
-                    print(f"⚠️  Skipped: {data.get('name', 'Unknown')} (may already exist)")
-                    
-            except Exception as e:
-                skipped += 1
-                name = dict(record).get('name', 'Unknown')
-                print(f"⚠️  Skipped: {name} - {str(e)}")
-        
-        conn.close()
-        
-        print(f"\n📊 Migration Summary:")
-        print(f"✅ Successfully migrated: {migrated} records")
-        print(f"⚠️  Skipped: {skipped} records")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Migration failed: {e}")
+    # Test Supabase connection first
+    supabase = test_supabase_connection()
+    if not supabase:
         return False
+    
+    # Check if local database exists
+    if not os.path.exists('aadhaar_data.db'):
+        print("📭 No local database found to migrate.")
+        return True
+    
+    # Streams, batches and checkpoints; see migrate_to_supabase.py
+    from migrate_to_supabase import run_migration
+    return run_migration(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"), 'aadhaar_data.db')
 
 def main():
     """Main function"""
@@ -0,0 +1,32 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.crud import aadhaar as aadhaar_crud
+from app.crud.aadhaar import HybridAadhaarCRUD
+from app.core.local_database import LocalDatabase
+from app.core.sql_database import SQLDatabase
+
+@pytest.fixture(params=["local", "sql"])
+def open_crud(request, tmp_path, monkeypatch):
+    """Opens a HybridAadhaarCRUD on an empty local (sqlite3) or SQL (aiosqlite) database, without the record cache"""
+    monkeypatch.setattr(aadhaar_crud, "_total_counts", {})
+    monkeypatch.setattr(aadhaar_crud, "get_record_cache", lambda: None)
+
+    @asynccontextmanager
+    async def opened():
+        if request.param == "local":
+            database = LocalDatabase(str(tmp_path / "local.db"))
+            try:
+                yield HybridAadhaarCRUD(database)
+            finally:
+                database.close()
+        else:
+            database = SQLDatabase(f"sqlite+aiosqlite:///{tmp_path / 'sql.db'}")
+            await database.init_database()
+            try:
+                yield HybridAadhaarCRUD(database)
+            finally:
+                await database.close()
+
+    return opened
@@ -0,0 +1,55 @@
+import io
+import struct
+import zipfile
+
+import pytest
+from fastapi import UploadFile
+
+from app.core.uploads import UploadTooLargeError
+from app.routers import form
+
+def zip_with(content: bytes, declared_size: int = None) -> zipfile.ZipFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("card.png", content)
+    data = bytearray(buffer.getvalue())
+    if declared_size is not None:
+        # Forge the uncompressed size in the local header and the central directory
+        struct.pack_into("<I", data, data.find(b"PK\x03\x04") + 22, declared_size)
+        struct.pack_into("<I", data, data.find(b"PK\x01\x02") + 24, declared_size)
+    return zipfile.ZipFile(io.BytesIO(bytes(data)))
+
+@pytest.fixture
+def max_bytes(monkeypatch):
+    monkeypatch.setattr(form.settings, "upload_max_bytes", 1024 * 1024)
+    monkeypatch.setattr(form.settings, "upload_chunk_size", 64 * 1024)
+    return 1024 * 1024
+
+def test_reads_a_member_within_the_limit(max_bytes):
+    archive = zip_with(b"x" * 1000)
+    assert form.read_zip_member(archive, archive.infolist()[0]) == b"x" * 1000
+
+def test_rejects_a_member_from_its_declared_size(max_bytes):
+    archive = zip_with(b"\0" * (max_bytes + 1))
+    with pytest.raises(UploadTooLargeError):
+        form.read_zip_member(archive, archive.infolist()[0])
+
+def test_rejects_a_member_whose_declared_size_is_forged(max_bytes):
+    archive = zip_with(b"\0" * (5 * max_bytes), declared_size=100)
+    with pytest.raises(ValueError):
+        form.read_zip_member(archive, archive.infolist()[0])
+
+def test_reads_a_plain_batch_file_within_the_limit(max_bytes):
+    upload = UploadFile(io.BytesIO(b"x" * 1000), filename="card.png")
+    [(filename, reader)] = form.collect_batch_documents([upload])
+
+    assert filename == "card.png"
+    assert reader() == b"x" * 1000
+
+def test_rejects_a_plain_batch_file_over_the_limit(max_bytes):
+    # No size is known up front, as with a chunked multipart part
+    upload = UploadFile(io.BytesIO(b"\0" * (max_bytes + 1)), filename="card.png")
+    [(_, reader)] = form.collect_batch_documents([upload])
+
+    with pytest.raises(UploadTooLargeError):
+        reader()
@@ -0,0 +1,96 @@
+import asyncio
+
+from postgrest.exceptions import APIError
+
+from app.crud.aadhaar import HybridAadhaarCRUD
+from app.core.supabase_client import SupabaseRestClient
+from app.schemas.aadhaar import AadhaarDataCreate
+
+def test_outcomes_and_unset_fields_keep_their_stored_value(open_crud):
+    async def scenario():
+        async with open_crud() as crud:
+            await crud.bulk_upsert([AadhaarDataCreate(aadhaar_number="123456789012", name="Ravi",
+                                                      address="12 Main Road", gender="Male")])
+            return await crud.bulk_upsert([
+                AadhaarDataCreate(aadhaar_number="123456789012", name="Ravi Kumar", dob="01/01/1990"),
+                AadhaarDataCreate(aadhaar_number="234567890123", name="Priya"),
+                AadhaarDataCreate(aadhaar_number="234567890123", name="Priya Sharma"),
+            ])
+
+    result = asyncio.run(scenario())
+    assert (result["created"], result["updated"], result["failed"]) == (1, 1, 0)
+    ravi, priya = result["results"]
+    assert ravi["status"] == "updated"
+    assert {key: ravi["record"][key] for key in ("name", "dob", "address", "gender")} == {
+        "name": "Ravi Kumar", "dob": "01/01/1990", "address": "12 Main Road", "gender": "Male"}
+    # The last copy of a repeated Aadhaar number wins
+    assert priya["status"] == "created" and priya["record"]["name"] == "Priya Sharma"
+
+def test_a_bad_record_fails_alone(open_crud):
+    async def scenario():
+        async with open_crud() as crud:
+            return await crud.bulk_upsert([
+                AadhaarDataCreate(aadhaar_number="123456789012", name="Ravi"),
+                # Skips validation, like a record the database itself rejects
+                AadhaarDataCreate.model_construct(aadhaar_number="234567890123", name=None),
+            ])
+
+    result = asyncio.run(scenario())
+    assert [outcome["status"] for outcome in result["results"]] == ["created", "failed"]
+
+class FakeSupabase(SupabaseRestClient):
+    """Answers bulk_upsert_aadhaar_forms calls like the Postgres function does"""
+
+    def __init__(self):
+        self.calls = []
+        self.stored = {"1234 5678 9012": {"id": 1, "aadhaar_number": "1234 5678 9012", "name": "Ravi",
+                                          "address": "12 Main Road", "gender": "Male"}}
+
+    def rpc(self, function, params):
+        self.calls.append((function, params))
+        fake = self
+
+        class Request:
+            async def execute(self):
+                rows = []
+                for data in params["records"]:
+                    if data.get("name") is None and data["aadhaar_number"] not in fake.stored:
+                        raise APIError({"code": "23502", "message": "null value in column \"name\""})
+                for data in params["records"]:
+                    existing = fake.stored.get(data["aadhaar_number"])
+                    merged = {**(existing or {"id": len(fake.stored) + 1}),
+                              **{key: value for key, value in data.items() if value is not None}}
+                    fake.stored[data["aadhaar_number"]] = merged
+                    rows.append({"record": merged, "inserted": existing is None})
+                return type("Result", (), {"data": rows})()
+
+        return Request()
+
+def test_supabase_sends_only_set_fields_and_keeps_stored_values():
+    client = FakeSupabase()
+    crud = HybridAadhaarCRUD(client)
+    crud.cache = None
+
+    result = asyncio.run(crud.bulk_upsert([
+        AadhaarDataCreate(aadhaar_number="123456789012", name="Ravi Kumar", dob="01/01/1990"),
+        AadhaarDataCreate(aadhaar_number="234567890123", name="Priya"),
+    ]))
+
+    (function, params), = client.calls
+    assert function == "bulk_upsert_aadhaar_forms"
+    assert params["records"][0] == {"aadhaar_number": "1234 5678 9012", "name": "Ravi Kumar", "dob": "01/01/1990"}
+    assert [outcome["status"] for outcome in result["results"]] == ["updated", "created"]
+    assert result["results"][0]["record"]["address"] == "12 Main Road"
+
+def test_supabase_chunk_with_a_bad_record_is_retried_record_by_record():
+    client = FakeSupabase()
+    crud = HybridAadhaarCRUD(client)
+    crud.cache = None
+
+    result = asyncio.run(crud.bulk_upsert([
+        AadhaarDataCreate(aadhaar_number="234567890123", name="Priya"),
+        AadhaarDataCreate.model_construct(aadhaar_number="345678901234", name=None),
+    ]))
+
+    assert [outcome["status"] for outcome in result["results"]] == ["created", "failed"]
+    assert len(client.calls) == 3
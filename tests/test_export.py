@@ -0,0 +1,104 @@
+import asyncio
+import csv
+import io
+import json
+
+import httpx
+import pytest
+
+from app.core.export import RecordExporter, parse_columns, stream_export
+from app.core.supabase_client import SupabaseRestClient
+from app.crud.aadhaar import HybridAadhaarCRUD
+from app.schemas.aadhaar import AadhaarDataCreate
+
+async def export(crud, exporter: RecordExporter, batch_size: int) -> bytes:
+    return b"".join([chunk async for chunk in stream_export(crud.iter_export_batches(batch_size=batch_size), exporter)])
+
+def stored(crud_factory, count: int, exporter: RecordExporter, batch_size: int = 4) -> bytes:
+    async def scenario():
+        async with crud_factory() as crud:
+            await crud.bulk_upsert([AadhaarDataCreate(aadhaar_number=f"{n:012d}", name=f"பெயர் {n}")
+                                    for n in range(1, count + 1)])
+            return await export(crud, exporter, batch_size)
+    return asyncio.run(scenario())
+
+def test_ndjson_has_every_record_once_oldest_first(open_crud):
+    data = stored(open_crud, 10, RecordExporter("ndjson", ["id", "name"]))
+
+    rows = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    assert [row["id"] for row in rows] == list(range(1, 11))
+    assert rows[0] == {"id": 1, "name": "பெயர் 1"}
+
+def test_csv_has_one_header_across_batches(open_crud):
+    data = stored(open_crud, 10, RecordExporter("csv", ["aadhaar_number", "name"]))
+
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    assert rows[0] == ["aadhaar_number", "name"]
+    assert len(rows) == 11
+
+def test_empty_csv_export_still_has_its_header(open_crud):
+    assert stored(open_crud, 0, RecordExporter("csv", ["id"])) == b"id\r\n"
+
+def test_zstd_ndjson_decompresses_to_the_plain_export(open_crud):
+    zstandard = pytest.importorskip("zstandard")
+    plain = stored(open_crud, 10, RecordExporter("ndjson"))
+    compressed = stored(open_crud, 10, RecordExporter("ndjson", compression="zstd"))
+
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(compressed))
+    assert [json.loads(line)["id"] for line in reader.read().splitlines()] == \
+           [json.loads(line)["id"] for line in plain.splitlines()]
+
+def test_parquet_has_one_row_group_per_batch(open_crud):
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = stored(open_crud, 10, RecordExporter("parquet", compression="zstd"), batch_size=4)
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("id").to_pylist() == list(range(1, 11))
+    assert table.schema.field("created_at").type.tz == "UTC"
+
+def test_rejects_unknown_columns_and_formats():
+    with pytest.raises(ValueError):
+        parse_columns("id,password")
+    with pytest.raises(ValueError):
+        RecordExporter("xlsx")
+
+class RecordingSupabase(SupabaseRestClient):
+    """Serves canned batches of rows and keeps the query string of every request"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.requests = []
+        super().__init__("http://supabase.test", "key")
+
+    def create_session(self, base_url, headers, timeout):
+        def respond(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request.url.params)
+            return httpx.Response(200, json=self.batches.pop(0) if self.batches else [])
+        return httpx.AsyncClient(base_url=base_url, headers=headers, transport=httpx.MockTransport(respond))
+
+async def supabase_export(client: RecordingSupabase) -> list:
+    return [batch async for batch in HybridAadhaarCRUD(client).iter_export_batches(batch_size=2)]
+
+def test_supabase_export_continues_after_a_re_serialized_timestamp(monkeypatch):
+    monkeypatch.setattr("app.crud.aadhaar.get_record_cache", lambda: None)
+    client = RecordingSupabase([
+        [{"id": 1, "created_at": "2024-05-01T10:20:30+00:00"}, {"id": 2, "created_at": "2024-05-01T10:20:30.5+00:00"}],
+        [{"id": 3, "created_at": "2024-05-02T08:00:00+00:00"}],
+    ])
+
+    batches = asyncio.run(supabase_export(client))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert "or" not in client.requests[0]
+    assert client.requests[1]["or"] == ('(created_at.gt."2024-05-01 10:20:30.500000+00:00",'
+                                        'and(created_at.eq."2024-05-01 10:20:30.500000+00:00",id.gt.2))')
+
+def test_supabase_export_never_puts_a_non_timestamp_in_the_filter(monkeypatch):
+    monkeypatch.setattr("app.crud.aadhaar.get_record_cache", lambda: None)
+    client = RecordingSupabase([[{"id": 1, "created_at": "x"}, {"id": 2, "created_at": '2024",id.gt.0)'}]])
+
+    with pytest.raises(ValueError):
+        asyncio.run(supabase_export(client))
+    assert len(client.requests) == 1
@@ -0,0 +1,161 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+import app.job_worker as job_worker
+from app.core import job_queue
+from app.core.job_queue import SQLiteJobQueue, RedisJobQueue, JOB_DONE, JOB_FAILED, JOB_PROCESSING
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "job_poll_interval", 0)
+    monkeypatch.setattr(job_queue.settings, "job_secret_key", "")
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"))
+
+def stored_row(queue, job_id):
+    conn = sqlite3.connect(queue.db_path)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM ocr_jobs WHERE id = ?", (job_id,)).fetchone()
+    conn.close()
+    return dict(row)
+
+def test_password_is_never_stored_in_plaintext(queue):
+    job_id = asyncio.run(queue.enqueue("card.pdf", b"%PDF", {"fields": None}, "s3cret-pw"))
+
+    row = stored_row(queue, job_id)
+    assert "s3cret-pw" not in repr(row)
+    assert row["secret"] is not None
+
+def test_password_is_deleted_when_the_job_is_claimed(queue):
+    job_id = asyncio.run(queue.enqueue("card.pdf", b"%PDF", {"fields": None}, "s3cret-pw"))
+
+    job = asyncio.run(queue.claim())
+    assert queue.open_password(job["secret"]) == "s3cret-pw"
+    assert stored_row(queue, job_id)["secret"] is None
+
+def test_processes_sharing_the_queue_share_the_password_key(queue):
+    asyncio.run(queue.enqueue("card.pdf", b"%PDF", {"fields": None}, "s3cret-pw"))
+
+    other_process = SQLiteJobQueue(queue.db_path)
+    job = asyncio.run(other_process.claim())
+    assert other_process.open_password(job["secret"]) == "s3cret-pw"
+
+def test_only_the_lease_holder_can_finish_a_job(queue, monkeypatch):
+    job_id = asyncio.run(queue.enqueue("card.png", b"png", {"fields": None}))
+    first = asyncio.run(queue.claim())
+
+    # The first worker stalls past its lease and a second worker takes the job over
+    monkeypatch.setattr(job_queue.settings, "job_lease_seconds", -1)
+    second = asyncio.run(queue.claim())
+    assert second["id"] == job_id and second["lease"] != first["lease"]
+
+    assert asyncio.run(queue.renew(job_id, first["lease"])) is False
+    assert asyncio.run(queue.complete(job_id, first["lease"], {"from": "first"})) is False
+    assert asyncio.run(queue.complete(job_id, second["lease"], {"from": "second"})) is True
+    assert asyncio.run(queue.get(job_id))["result"] == {"from": "second"}
+
+def test_renewed_lease_keeps_the_job_from_being_claimed_again(queue, monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "job_lease_seconds", 1)
+    job_id = asyncio.run(queue.enqueue("card.png", b"png", {"fields": None}))
+    job = asyncio.run(queue.claim())
+
+    time.sleep(0.6)
+    assert asyncio.run(queue.renew(job_id, job["lease"])) is True
+    time.sleep(0.6)
+    assert asyncio.run(queue.claim()) is None
+    assert stored_row(queue, job_id)["status"] == JOB_PROCESSING
+
+def test_worker_runs_the_job_with_its_password(queue, monkeypatch):
+    seen = {}
+
+    class FakeResponse:
+        def model_dump(self):
+            return {"success": True}
+
+    async def fake_process_and_store(content, filename, password, fields, database):
+        seen["password"] = password
+        return FakeResponse()
+
+    monkeypatch.setattr(job_worker, "get_job_queue", lambda: queue)
+    monkeypatch.setattr(job_worker, "get_database", lambda: None)
+    monkeypatch.setattr(job_worker, "process_and_store", fake_process_and_store)
+    job_id = asyncio.run(queue.enqueue("card.pdf", b"%PDF", {"fields": None}, "s3cret-pw"))
+
+    asyncio.run(job_worker.run_job(asyncio.run(queue.claim())))
+    assert seen["password"] == "s3cret-pw"
+    assert asyncio.run(queue.get(job_id))["status"] == JOB_DONE
+    assert stored_row(queue, job_id)["content"] is None
+
+def test_interrupted_password_job_fails_instead_of_running_without_it(queue, monkeypatch):
+    monkeypatch.setattr(job_worker, "get_job_queue", lambda: queue)
+    job_id = asyncio.run(queue.enqueue("card.pdf", b"%PDF", {"fields": None}, "s3cret-pw"))
+    asyncio.run(queue.claim())
+
+    # The worker died; the job is handed out again without its password
+    monkeypatch.setattr(job_queue.settings, "job_lease_seconds", -1)
+    asyncio.run(job_worker.run_job(asyncio.run(queue.claim())))
+    job = asyncio.run(queue.get(job_id))
+    assert job["status"] == JOB_FAILED
+    assert "password" in job["error"]
+
+@pytest.fixture
+def redis_queue(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(job_queue.aioredis, "from_url", lambda url: fakeredis.aioredis.FakeRedis(server=server))
+    monkeypatch.setattr(job_queue.settings, "job_poll_interval", 0.01)
+    monkeypatch.setattr(job_queue.settings, "job_secret_key", "shared secret")
+    return RedisJobQueue("redis://shared")
+
+def test_redis_queue_requires_a_shared_secret_key(monkeypatch):
+    pytest.importorskip("redis")
+    monkeypatch.setattr(job_queue.settings, "job_secret_key", "")
+
+    with pytest.raises(RuntimeError, match="JOB_SECRET_KEY"):
+        RedisJobQueue("redis://shared")
+
+def test_redis_password_is_deleted_when_the_job_is_claimed(redis_queue):
+    async def scenario():
+        job_id = await redis_queue.enqueue("card.pdf", b"%PDF", {"fields": None}, "s3cret-pw")
+        stored = await redis_queue.client.hgetall(redis_queue._job_key(job_id))
+        job = await redis_queue.claim()
+        return stored, job, await redis_queue.client.hgetall(redis_queue._job_key(job_id))
+
+    stored, job, after_claim = asyncio.run(scenario())
+    assert b"s3cret-pw" not in b"".join(stored.values())
+    assert redis_queue.open_password(job["secret"]) == "s3cret-pw"
+    assert b"secret" not in after_claim
+
+def test_redis_only_the_lease_holder_can_finish_a_job(redis_queue, monkeypatch):
+    async def scenario():
+        job_id = await redis_queue.enqueue("card.png", b"png", {"fields": None})
+        first = await redis_queue.claim()
+        # The first worker stalls past its lease and a second worker takes the job over
+        monkeypatch.setattr(job_queue.settings, "job_lease_seconds", -1)
+        assert await redis_queue.requeue_stale() == 1
+        second = await redis_queue.claim()
+        assert second["id"] == job_id and second["lease"] != first["lease"]
+
+        assert await redis_queue.renew(job_id, first["lease"]) is False
+        assert await redis_queue.complete(job_id, first["lease"], {"from": "first"}) is False
+        assert await redis_queue.complete(job_id, second["lease"], {"from": "second"}) is True
+        return await redis_queue.get(job_id)
+
+    job = asyncio.run(scenario())
+    assert job["status"] == JOB_DONE
+    assert job["result"] == {"from": "second"}
+
+def test_redis_renewed_lease_is_not_requeued(redis_queue, monkeypatch):
+    async def scenario():
+        await redis_queue.enqueue("card.png", b"png", {"fields": None})
+        job = await redis_queue.claim()
+        monkeypatch.setattr(job_queue.settings, "job_lease_seconds", 1)
+        await asyncio.sleep(0.6)
+        assert await redis_queue.renew(job["id"], job["lease"]) is True
+        await asyncio.sleep(0.6)
+        return await redis_queue.requeue_stale()
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+import app.ocr_parser as ocr_parser
+from app.core.ocr_cache import OCRResultCache
+from app.schemas.aadhaar import AadhaarDataCreate
+
+@pytest.fixture
+def parsed_calls(monkeypatch, tmp_path):
+    """Route process_aadhaar_file through a fresh disk-backed cache and a fake OCR run"""
+    calls = []
+
+    async def fake_run_ocr_task(func, source, filename, password, fields):
+        calls.append(filename)
+        return "OCR text", AadhaarDataCreate(aadhaar_number="123456789012", name="Ravi Kumar", dob="01/01/1990")
+
+    monkeypatch.setattr(ocr_parser, "run_ocr_task", fake_run_ocr_task)
+    monkeypatch.setattr(ocr_parser, "ocr_cache", OCRResultCache(cache_dir=str(tmp_path)))
+    monkeypatch.setattr(ocr_parser.settings, "ocr_cache_enabled", True)
+    return calls
+
+def upsert_payload(data: AadhaarDataCreate) -> dict:
+    # What HybridAadhaarCRUD.upsert_aadhaar_record writes
+    return data.model_dump(exclude_unset=True)
+
+def test_memory_hit_gives_the_same_upsert_payload_as_a_miss(parsed_calls):
+    miss = asyncio.run(ocr_parser.process_aadhaar_file(b"same document", "card.png"))
+    hit = asyncio.run(ocr_parser.process_aadhaar_file(b"same document", "card.png"))
+
+    assert parsed_calls == ["card.png"]
+    assert upsert_payload(miss) == {"aadhaar_number": "1234 5678 9012", "name": "Ravi Kumar", "dob": "01/01/1990"}
+    assert upsert_payload(hit) == upsert_payload(miss)
+
+def test_disk_hit_gives_the_same_upsert_payload_as_a_miss(parsed_calls, monkeypatch, tmp_path):
+    miss = asyncio.run(ocr_parser.process_aadhaar_file(b"same document", "card.png"))
+    # Another worker only sees the disk tier
+    monkeypatch.setattr(ocr_parser, "ocr_cache", OCRResultCache(cache_dir=str(tmp_path)))
+    hit = asyncio.run(ocr_parser.process_aadhaar_file(b"same document", "card.png"))
+
+    assert parsed_calls == ["card.png"]
+    assert ocr_parser.ocr_cache.stats()["disk_hits"] == 1
+    assert upsert_payload(hit) == upsert_payload(miss)
+
+def test_unset_fields_are_not_cached_as_none(tmp_path):
+    cache = OCRResultCache(cache_dir=str(tmp_path))
+    cache.set("key", "text", AadhaarDataCreate(aadhaar_number="123456789012", name="Ravi Kumar"))
+
+    _, data = cache.get("key")
+    assert data.model_fields_set == {"aadhaar_number", "name"}
+
+def test_cache_io_runs_off_the_event_loop_thread(parsed_calls, monkeypatch):
+    threads = []
+    cache = ocr_parser.ocr_cache
+    for name in ("get", "set"):
+        method = getattr(cache, name)
+        monkeypatch.setattr(cache, name, lambda *args, method=method: threads.append(threading.current_thread()) or method(*args))
+
+    asyncio.run(ocr_parser.process_aadhaar_file(b"document", "card.png"))
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+def test_disk_budget_is_kept_without_rescanning_on_every_write(tmp_path, monkeypatch):
+    data = AadhaarDataCreate(aadhaar_number="123456789012", name="Ravi Kumar")
+    OCRResultCache(cache_dir=str(tmp_path / "probe")).set("probe", "x" * 1000, data)
+    entry_size = os.path.getsize(tmp_path / "probe" / "probe.json")
+
+    cache = OCRResultCache(cache_dir=str(tmp_path / "cache"), max_disk_bytes=int(entry_size * 2.5))
+    scans = []
+    evict = cache._evict_to_budget
+    monkeypatch.setattr(cache, "_evict_to_budget", lambda: scans.append(1) or evict())
+
+    for index in range(5):
+        cache.set(f"key{index}", "x" * 1000, data)
+
+    # The first write learns the size of the directory; after that only writes that go over the cap rescan it
+    assert len(scans) == 4
+    assert sorted(os.listdir(tmp_path / "cache")) == ["key3.json", "key4.json"]
+    assert cache.stats()["disk_evictions"] == 3
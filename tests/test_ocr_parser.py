@@ -0,0 +1,67 @@
+import random
+import re
+import time
+
+import pytest
+
+from app.ocr_parser import extract_fields, find_tamil_name, parse_aadhaar_details
+from benchmark_parser import SAMPLE_TEXTS, legacy_parse_aadhaar_details, pathological_inputs, random_ocr_text
+
+LEGACY_TAMIL_NAME_RE = re.compile(r'([\u0B80-\u0BFF\s]+)\n([A-Za-z\s\'-]+)')
+
+def best_time(text: str, runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        extract_fields(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+@pytest.mark.parametrize("label", sorted(SAMPLE_TEXTS))
+def test_matches_the_previous_parser(label):
+    text = SAMPLE_TEXTS[label]
+    assert parse_aadhaar_details(text).model_dump() == legacy_parse_aadhaar_details(text).model_dump()
+
+def test_matches_the_previous_parser_on_random_ocr_text():
+    rng = random.Random(1234)
+    for _ in range(2000):
+        text = random_ocr_text(rng)
+        assert parse_aadhaar_details(text).model_dump() == legacy_parse_aadhaar_details(text).model_dump(), text
+
+def test_tamil_name_matches_the_previous_pattern():
+    rng = random.Random(99)
+    for _ in range(5000):
+        text = "".join(rng.choice(["ர", "வி", " ", "\n", "\t", "Ravi", "-", "1", ","]) for _ in range(rng.randint(0, 12)))
+        match = LEGACY_TAMIL_NAME_RE.search(text)
+        assert find_tamil_name(text) == (match.groups() if match else None), repr(text)
+
+def test_extracts_the_e_aadhaar_letter():
+    data = parse_aadhaar_details(SAMPLE_TEXTS["e-aadhaar letter"])
+
+    assert data.aadhaar_number == "1234 5678 9012"
+    assert data.vid == "9123 4567 8901 2345"
+    assert data.name == "Ravi Kumar"
+    assert data.name_tamil == "ரவி குமார்"
+    assert data.guardian_name == "Ramesh Kumar"
+    assert data.dob == "01/01/1990"
+    assert data.gender == "Male"
+    assert data.pincode == "600040"
+    assert data.phone == "9876543210"
+
+def test_only_found_fields_are_set():
+    data = parse_aadhaar_details(SAMPLE_TEXTS["card front"])
+
+    assert data.model_dump(exclude_unset=True) == {
+        "aadhaar_number": "2345 6789 0123",
+        "name": "Priya Sharma",
+        "dob": "15/08/1985",
+        "gender": "Female",
+    }
+
+@pytest.mark.parametrize("label", sorted(pathological_inputs(8, random.Random(0))))
+def test_time_grows_linearly_on_pathological_input(label):
+    small = pathological_inputs(5000, random.Random(1234))[label]
+    large = pathological_inputs(20000, random.Random(1234))[label]
+
+    # 4x the input: linear work takes ~4x as long, quadratic ~16x
+    assert best_time(large) / max(best_time(small), 1e-6) < 8
@@ -0,0 +1,23 @@
+import asyncio
+import os
+
+import pytest
+
+from app.core import ocr_pool
+from app.core.config import Settings
+
+@pytest.mark.parametrize("web_concurrency, expected", [(1, 8), (4, 2), (16, 1)])
+def test_default_pool_size_splits_the_cores_between_api_workers(web_concurrency, expected, monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    assert Settings(ocr_pool_size=0, web_concurrency=web_concurrency).get_ocr_pool_size() == expected
+
+def test_omp_limit_reaches_the_ocr_workers_but_not_the_api_process(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setattr(ocr_pool.settings, "ocr_execution_mode", "process")
+    monkeypatch.setattr(ocr_pool.settings, "ocr_pool_size", 1)
+    monkeypatch.setattr(ocr_pool.settings, "ocr_omp_thread_limit", 3)
+    try:
+        assert asyncio.run(ocr_pool.run_ocr_task(os.getenv, "OMP_THREAD_LIMIT")) == "3"
+    finally:
+        ocr_pool.shutdown_ocr_pool()
+    assert "OMP_THREAD_LIMIT" not in os.environ
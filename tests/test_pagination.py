@@ -0,0 +1,101 @@
+import asyncio
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_database
+from app.core.local_database import LocalDatabase
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud import aadhaar as aadhaar_crud
+from app.main import app
+from app.schemas.aadhaar import AadhaarDataCreate
+
+def record(n: int) -> AadhaarDataCreate:
+    return AadhaarDataCreate(aadhaar_number=f"{n:012d}", name=f"Person {n}")
+
+async def all_pages(crud, limit: int):
+    pages, cursor = [], None
+    while True:
+        page = await crud.list_all_records(limit, cursor)
+        pages.append([row["id"] for row in page["data"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages, page["total_count"]
+
+def test_pages_cover_every_record_once_newest_first(open_crud):
+    async def scenario():
+        async with open_crud() as crud:
+            # One batch: many rows share a created_at, so the id breaks the ties
+            await crud.bulk_upsert([record(n) for n in range(1, 26)])
+            return await all_pages(crud, 10)
+
+    pages, total_count = asyncio.run(scenario())
+    ids = [row_id for page in pages for row_id in page]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 25
+    assert total_count == 25
+
+def test_rows_added_while_paging_do_not_shift_later_pages(open_crud):
+    async def scenario():
+        async with open_crud() as crud:
+            await crud.bulk_upsert([record(n) for n in range(1, 16)])
+            first = await crud.list_all_records(5)
+            await crud.bulk_upsert([record(n) for n in range(100, 110)])
+            second = await crud.list_all_records(5, first["next_cursor"])
+            return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [row["id"] for row in second["data"]] == [row["id"] - 5 for row in first["data"]]
+
+def test_rejects_a_cursor_it_did_not_make(open_crud):
+    async def scenario():
+        async with open_crud() as crud:
+            await crud.list_all_records(10, "not-a-cursor")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+
+def test_cursor_timestamps_are_re_serialized():
+    cursor = encode_cursor({"created_at": "2024-05-01T10:20:30.5+00:00", "id": 7})
+
+    assert decode_cursor(cursor) == ("2024-05-01 10:20:30.500000+00:00", 7)
+
+def forged_cursor(created_at) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, 1]).encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("created_at", ['2024-01-01",id.gt.0)', "2024-01-01T00:00:00,or(id.gt.0)", 20240101])
+def test_a_forged_cursor_gets_a_400(created_at, tmp_path, monkeypatch):
+    monkeypatch.setattr(aadhaar_crud, "_total_counts", {})
+    monkeypatch.setattr(aadhaar_crud, "get_record_cache", lambda: None)
+    database = LocalDatabase(str(tmp_path / "local.db"))
+    app.dependency_overrides[get_database] = lambda: database
+    try:
+        response = TestClient(app).get("/api/form/", params={"cursor": forged_cursor(created_at)})
+    finally:
+        app.dependency_overrides.clear()
+        database.close()
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+def test_offset_is_deprecated_and_only_zero_is_accepted(tmp_path, monkeypatch):
+    monkeypatch.setattr(aadhaar_crud, "_total_counts", {})
+    monkeypatch.setattr(aadhaar_crud, "get_record_cache", lambda: None)
+    database = LocalDatabase(str(tmp_path / "local.db"))
+    database.create_record({"aadhaar_number": "1234 5678 9012", "name": "Ravi Kumar"})
+    app.dependency_overrides[get_database] = lambda: database
+    try:
+        client = TestClient(app)
+        first_page = client.get("/api/form/", params={"limit": 10, "offset": 0})
+        skipped = client.get("/api/form/", params={"limit": 10, "offset": 20})
+    finally:
+        app.dependency_overrides.clear()
+        database.close()
+
+    assert first_page.status_code == 200
+    assert first_page.json()["total_count"] == 1
+    assert skipped.status_code == 400
+    assert "cursor" in skipped.json()["detail"]
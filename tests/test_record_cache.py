@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.core import record_cache
+from app.core.record_cache import RecordCache, MISSING
+
+OLD = {"aadhaar_number": "1234 5678 9012", "name": "Old Name"}
+NEW = {"aadhaar_number": "1234 5678 9012", "name": "New Name"}
+KEY = OLD["aadhaar_number"]
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Three worker processes' caches sharing one Redis server"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(record_cache.aioredis, "from_url",
+                        lambda url: fakeredis.aioredis.FakeRedis(server=server))
+    return [RecordCache(shared_url="redis://shared") for _ in range(3)]
+
+def test_lookup_that_raced_a_write_in_this_worker_is_not_cached():
+    async def scenario():
+        cache = RecordCache()
+        token = await cache.write_token(KEY)
+        await cache.invalidate(KEY)
+        await cache.set(KEY, OLD, token)
+        return await cache.get(KEY)
+
+    assert asyncio.run(scenario()) is MISSING
+
+def test_lookup_that_raced_a_write_in_another_worker_is_not_shared(workers):
+    a, b, c = workers
+
+    async def scenario():
+        # Worker A reads the row, worker B updates it, then A tries to cache its copy
+        token = await a.write_token(KEY)
+        await b.set(KEY, NEW)
+        await a.set(KEY, OLD, token)
+        return await c.get(KEY)
+
+    assert asyncio.run(scenario()) is MISSING
+
+def test_lookup_that_raced_an_invalidation_in_another_worker_is_not_shared(workers):
+    a, b, c = workers
+
+    async def scenario():
+        token = await a.write_token(KEY)
+        await b.invalidate(KEY)
+        await a.set(KEY, OLD, token)
+        return await c.get(KEY)
+
+    assert asyncio.run(scenario()) is MISSING
+
+def test_lookup_without_a_concurrent_write_is_shared(workers):
+    a, b, c = workers
+
+    async def scenario():
+        await b.invalidate(KEY)
+        token = await a.write_token(KEY)
+        await a.set(KEY, NEW, token)
+        return await c.get(KEY)
+
+    assert asyncio.run(scenario()) == NEW
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.core.search import fts5_match, search_terms, tsquery
+from app.schemas.aadhaar import AadhaarDataCreate
+
+PEOPLE = [
+    AadhaarDataCreate(aadhaar_number="111122223333", name="Ravi Kumar", name_tamil="ரவி குமார்",
+                      address="Anna Nagar"),
+    AadhaarDataCreate(aadhaar_number="222233334444", name="Priya Sharma", guardian_name="Ravi Sharma"),
+    AadhaarDataCreate(aadhaar_number="333344445555", name="Kumaran", address="Ravi Street"),
+    AadhaarDataCreate(aadhaar_number="444455556666", name="Meena", name_tamil="மீனா"),
+]
+# bm25 needs search words to be rare in the table to rank by field weight
+OTHERS = [AadhaarDataCreate(aadhaar_number=f"9{n:011d}", name="Other Person") for n in range(40)]
+
+def search(open_crud, *queries, changes=None):
+    async def scenario():
+        async with open_crud() as crud:
+            await crud.bulk_upsert(PEOPLE + OTHERS)
+            if changes is not None:
+                await changes(crud)
+            return [[row["name"] for row in (await crud.search_records(q, 10))["data"]] for q in queries]
+    return asyncio.run(scenario())
+
+def test_name_matches_rank_above_guardian_and_address(open_crud):
+    names, = search(open_crud, "ravi")
+    assert names == ["Ravi Kumar", "Priya Sharma", "Kumaran"]
+
+def test_every_word_must_match_and_the_last_one_is_a_prefix(open_crud):
+    assert search(open_crud, "kumar ravi", "ravi anna", "ravi kum", "kum") == [
+        ["Ravi Kumar"], ["Ravi Kumar"], ["Ravi Kumar", "Kumaran"], ["Kumaran", "Ravi Kumar"]]
+
+def test_tamil_words_match_whole_and_by_prefix(open_crud):
+    assert search(open_crud, "ரவி", "மீ", "குமார்") == [["Ravi Kumar"], ["Meena"], ["Ravi Kumar"]]
+
+def test_query_syntax_is_not_interpreted(open_crud):
+    # Quotes, operators and stars are plain words or separators
+    assert search(open_crud, "ravi OR meena", "NEAR(ravi)", '"meena', "mee*") == [[], [], ["Meena"], ["Meena"]]
+
+def test_index_follows_updates_and_deletes(open_crud):
+    async def changes(crud):
+        await crud.bulk_upsert([AadhaarDataCreate(aadhaar_number="111122223333", name="Ravindran")])
+        await crud.delete_aadhaar_record("3333 4444 5555")
+
+    assert search(open_crud, "ravindran", "kumaran", changes=changes) == [["Ravindran"], []]
+
+def test_pages_follow_the_ranking(open_crud):
+    async def scenario():
+        async with open_crud() as crud:
+            await crud.bulk_upsert(PEOPLE + OTHERS)
+            first = await crud.search_records("ravi", 2)
+            second = await crud.search_records("ravi", 2, first["next_cursor"])
+            return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [row["name"] for row in first["data"] + second["data"]] == ["Ravi Kumar", "Priya Sharma", "Kumaran"]
+    assert second["next_cursor"] is None
+
+def test_query_builders():
+    assert search_terms("  ravi   kumar ") == ["ravi", "kumar"]
+    with pytest.raises(ValueError):
+        search_terms("   ")
+    assert fts5_match(['ra"vi', "ku"]) == '"ra""vi" "ku"*'
+    assert tsquery(["o'brien", "ku"]) == "'o''brien' & 'ku':*"
@@ -0,0 +1,56 @@
+import asyncio
+import hashlib
+import threading
+
+import pytest
+
+from app.core import uploads
+from app.core.uploads import SpooledUpload, UploadTooLargeError, spool_stream
+
+async def chunks_of(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+@pytest.fixture
+def file_writes(monkeypatch):
+    """Thread of every write to a spool file"""
+    threads = []
+    write = SpooledUpload.write
+
+    def recording_write(self, chunk):
+        if self.rolls_over(chunk):
+            threads.append(threading.current_thread())
+        write(self, chunk)
+
+    monkeypatch.setattr(SpooledUpload, "write", recording_write)
+    monkeypatch.setattr(uploads.settings, "upload_spool_memory_bytes", 64 * 1024)
+    return threads
+
+@pytest.mark.parametrize("size", [0, 1000, 64 * 1024, 300 * 1024])
+def test_spooled_file_has_the_upload_and_its_digest(size, file_writes):
+    data = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+    upload = asyncio.run(spool_stream(chunks_of(data, 16 * 1024), max_bytes=0))
+    try:
+        assert upload.read_bytes() == data
+        assert upload.size == size
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    finally:
+        upload.close()
+
+def test_writes_past_the_memory_buffer_run_off_the_event_loop(file_writes):
+    upload = asyncio.run(spool_stream(chunks_of(b"x" * (320 * 1024), 16 * 1024), max_bytes=0))
+    upload.close()
+
+    # 20 chunks, the first 4 of which fill the 64 KB memory buffer
+    assert len(file_writes) == 16
+    assert threading.main_thread() not in file_writes
+
+def test_a_small_upload_never_writes_a_chunk_to_the_file(file_writes):
+    upload = asyncio.run(spool_stream(chunks_of(b"x" * 1000, 100), max_bytes=0))
+    upload.close()
+
+    assert file_writes == []
+
+def test_rejects_an_upload_over_the_size_cap(file_writes):
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_stream(chunks_of(b"x" * (200 * 1024), 16 * 1024), max_bytes=100 * 1024))
@@ -4,9 +4,13 @@ Script to view all stored Aadhaar data from the local database
 """
 
 import sqlite3
-import json
+import argparse
 from datetime import datetime
 
+from app.core.config import settings
+from app.core.export import RecordExporter, EXPORT_FORMATS, EXPORT_COMPRESSIONS, parse_columns
+from app.core.local_database import LocalDatabase
+
 def view_all_data():
     """View all stored Aadhaar data"""
     try:
@@ -58,26 +62,28 @@ def view_all_data():
     except Exception as e:
         print(f"❌ Error: {e}")
 
-def export_to_json():
-    """Export all data to JSON file"""
+def export_data(export_format='ndjson', columns=None, since=None, until=None, compression='none', output=None):
+    """Stream all data to an NDJSON, CSV or Parquet file, one batch at a time"""
     try:
-        conn = sqlite3.connect('aadhaar_data.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM aadhaar_forms ORDER BY created_at DESC")
-        records = cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        data = [dict(record) for record in records]
-        
-        # Export to JSON file
-        filename = f"aadhaar_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-        
-        print(f"✅ Data exported to: {filename}")
-        conn.close()
+        exporter = RecordExporter(export_format, parse_columns(columns), compression)
+        db = LocalDatabase('aadhaar_data.db')
+        
+        filename = output or f"aadhaar_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{exporter.file_extension}"
+        exported = 0
+        after = None
+        with open(filename, 'wb') as f:
+            while True:
+                batch = db.export_batch(settings.export_batch_size, after, since, until)
+                if batch:
+                    f.write(exporter.write(batch))
+                    exported += len(batch)
+                if len(batch) < settings.export_batch_size:
+                    break
+                after = (batch[-1]['created_at'], batch[-1]['id'])
+            f.write(exporter.finish())
+        
+        print(f"✅ Exported {exported} record(s) to: {filename}")
+        db.close()
         
     except Exception as e:
         print(f"❌ Export error: {e}")
@@ -114,13 +120,28 @@ def get_database_info():
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="View or export the local Aadhaar database")
+    subparsers = parser.add_subparsers(dest="command")
+    export_parser = subparsers.add_parser("export", help="Stream all records to a file")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export_parser.add_argument("--columns", help="Comma-separated columns (default: all)")
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="Only records created at or after this time")
+    export_parser.add_argument("--until", type=datetime.fromisoformat, help="Only records created before this time")
+    export_parser.add_argument("--compression", choices=EXPORT_COMPRESSIONS, default="none")
+    export_parser.add_argument("-o", "--output", help="Output file (default: aadhaar_data_export_<timestamp>.<format>)")
+    args = parser.parse_args()
+    
+    if args.command == "export":
+        export_data(args.format, args.columns, args.since, args.until, args.compression, args.output)
+        return
+    
     print("🔍 Aadhaar Data Viewer")
     print("=" * 50)
     
     while True:
         print("\nChoose an option:")
         print("1. View all stored data")
-        print("2. Export data to JSON")
+        print("2. Export data to NDJSON")
         print("3. Database information")
         print("4. Exit")
         
@@ -129,7 +150,7 @@ def main():
         if choice == '1':
             view_all_data()
         elif choice == '2':
-            export_to_json()
+            export_data()
         elif choice == '3':
             get_database_info()
         elif choice == '4':